@@ -0,0 +1,34 @@
+"""add normalized room labels
+
+Revision ID: 1a7e3f5c9b20
+Revises: c058d462a21d
+Create Date: 2019-11-12 10:14:32.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '1a7e3f5c9b20'
+down_revision = 'c058d462a21d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('rooms', sa.Column('normalized_room_labels', postgresql.ARRAY(sa.String()), nullable=True))
+    op.execute("""
+        UPDATE rooms SET normalized_room_labels = ARRAY(
+            SELECT lower(trim(label)) FROM unnest(room_labels) AS label
+            WHERE trim(label) <> ''
+        )::varchar[]
+        WHERE room_labels IS NOT NULL
+    """)
+    op.create_index('ix_rooms_normalized_room_labels', 'rooms', ['normalized_room_labels'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_rooms_normalized_room_labels', table_name='rooms')
+    op.drop_column('rooms', 'normalized_room_labels')
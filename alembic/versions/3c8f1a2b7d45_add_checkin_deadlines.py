@@ -0,0 +1,39 @@
+"""add checkin deadlines
+
+Revision ID: 3c8f1a2b7d45
+Revises: 9d2e5a7c4b16
+Create Date: 2019-12-03 09:41:07.215530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8f1a2b7d45'
+down_revision = '9d2e5a7c4b16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'checkin_deadlines',
+        sa.Column('date_created', sa.DateTime(),
+                  server_default=sa.text('now()'), nullable=True),
+        sa.Column('date_updated', sa.DateTime(),
+                  server_default=sa.text('now()'), nullable=True),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('deadline', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('event_id')
+    )
+    op.create_index('ix_checkin_deadlines_deadline', 'checkin_deadlines',
+                    ['deadline'])
+
+
+def downgrade():
+    op.drop_index('ix_checkin_deadlines_deadline',
+                  table_name='checkin_deadlines')
+    op.drop_table('checkin_deadlines')
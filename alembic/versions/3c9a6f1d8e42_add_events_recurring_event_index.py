@@ -0,0 +1,26 @@
+"""add index on recurring event occurrences
+
+Revision ID: 3c9a6f1d8e42
+Revises: b7e1d9c3a5f2
+Create Date: 2019-11-22 14:05:31.902771
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9a6f1d8e42'
+down_revision = 'b7e1d9c3a5f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_events_recurring_event_id_start_time', 'events',
+        ['recurring_event_id', 'start_time'])
+
+
+def downgrade():
+    op.drop_index(
+        'ix_events_recurring_event_id_start_time', table_name='events')
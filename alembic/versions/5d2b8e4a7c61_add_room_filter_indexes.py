@@ -0,0 +1,28 @@
+"""add room filter indexes
+
+Revision ID: 5d2b8e4a7c61
+Revises: 1a7e3f5c9b20
+Create Date: 2019-11-14 08:41:05.271936
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2b8e4a7c61'
+down_revision = '1a7e3f5c9b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_rooms_location_id', 'rooms', ['location_id'], unique=False)
+    op.create_index('ix_room_tags_room_id', 'room_tags', ['room_id'], unique=False)
+    op.create_index('ix_devices_room_id', 'devices', ['room_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_devices_room_id', table_name='devices')
+    op.drop_index('ix_room_tags_room_id', table_name='room_tags')
+    op.drop_index('ix_rooms_location_id', table_name='rooms')
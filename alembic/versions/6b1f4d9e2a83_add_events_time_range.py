@@ -0,0 +1,54 @@
+"""add indexed time range to events
+
+Revision ID: 6b1f4d9e2a83
+Revises: e4a8b2c6d1f7
+Create Date: 2019-11-27 16:02:45.730912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '6b1f4d9e2a83'
+down_revision = 'e4a8b2c6d1f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'events', sa.Column('time_range', postgresql.TSTZRANGE(),
+                            nullable=True))
+    op.execute(
+        '''CREATE OR REPLACE FUNCTION events_set_time_range()
+           RETURNS trigger AS $$
+           BEGIN
+               NEW.time_range := tstzrange(
+                   NEW.start_time::timestamptz, NEW.end_time::timestamptz,
+                   '[)');
+               RETURN NEW;
+           EXCEPTION WHEN others THEN
+               NEW.time_range := NULL;
+               RETURN NEW;
+           END
+           $$ LANGUAGE plpgsql'''
+    )
+    op.execute(
+        '''CREATE TRIGGER events_set_time_range
+           BEFORE INSERT OR UPDATE OF start_time, end_time ON events
+           FOR EACH ROW EXECUTE PROCEDURE events_set_time_range()'''
+    )
+    # fires the trigger for the existing rows
+    op.execute('UPDATE events SET start_time = start_time')
+    op.create_index(
+        'ix_events_time_range', 'events', ['time_range'],
+        postgresql_using='gist')
+
+
+def downgrade():
+    op.drop_index('ix_events_time_range', table_name='events')
+    op.execute('DROP TRIGGER IF EXISTS events_set_time_range ON events')
+    op.execute('DROP FUNCTION IF EXISTS events_set_time_range()')
+    op.drop_column('events', 'time_range')
@@ -0,0 +1,48 @@
+"""count events without time range
+
+Revision ID: 7e2b9c4f1a58
+Revises: 3c8f1a2b7d45
+Create Date: 2019-12-04 11:27:53.604119
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e2b9c4f1a58'
+down_revision = '3c8f1a2b7d45'
+branch_labels = None
+depends_on = None
+
+
+def set_time_range_function(on_error):
+    op.execute(
+        '''CREATE OR REPLACE FUNCTION events_set_time_range()
+           RETURNS trigger AS $$
+           BEGIN
+               NEW.time_range := tstzrange(
+                   NEW.start_time::timestamptz, NEW.end_time::timestamptz,
+                   '[)');
+               RETURN NEW;
+           EXCEPTION WHEN others THEN
+               {}
+               NEW.time_range := NULL;
+               RETURN NEW;
+           END
+           $$ LANGUAGE plpgsql'''.format(on_error)
+    )
+
+
+def upgrade():
+    set_time_range_function(
+        '''RAISE WARNING 'Event % has no time range from % to %: %',
+                   NEW.event_id, NEW.start_time, NEW.end_time, SQLERRM;''')
+    op.create_index(
+        'ix_events_without_time_range', 'events', ['id'],
+        postgresql_where=sa.text('time_range IS NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_events_without_time_range', table_name='events')
+    set_time_range_function('')
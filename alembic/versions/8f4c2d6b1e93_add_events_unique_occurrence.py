@@ -0,0 +1,32 @@
+"""add unique constraint on event occurrences
+
+Revision ID: 8f4c2d6b1e93
+Revises: 5d2b8e4a7c61
+Create Date: 2019-11-18 10:12:44.508317
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8f4c2d6b1e93'
+down_revision = '5d2b8e4a7c61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        '''DELETE FROM events duplicate USING events original
+           WHERE duplicate.event_id = original.event_id
+           AND duplicate.start_time = original.start_time
+           AND duplicate.id > original.id'''
+    )
+    op.create_unique_constraint(
+        'uq_events_event_id_start_time', 'events',
+        ['event_id', 'start_time'])
+
+
+def downgrade():
+    op.drop_constraint(
+        'uq_events_event_id_start_time', 'events', type_='unique')
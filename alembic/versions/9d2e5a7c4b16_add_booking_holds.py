@@ -0,0 +1,55 @@
+"""add booking holds
+
+Revision ID: 9d2e5a7c4b16
+Revises: 6b1f4d9e2a83
+Create Date: 2019-11-29 10:14:22.418306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateSequence, DropSequence, Sequence
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2e5a7c4b16'
+down_revision = '6b1f4d9e2a83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(CreateSequence(Sequence('booking_holds_id_seq')))
+    op.create_table(
+        'booking_holds',
+        sa.Column('date_created', sa.DateTime(),
+                  server_default=sa.text('now()'), nullable=True),
+        sa.Column('date_updated', sa.DateTime(),
+                  server_default=sa.text('now()'), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False,
+                  server_default=sa.text(
+                      "nextval('booking_holds_id_seq')")),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('time_range', postgresql.TSTZRANGE(), nullable=False),
+        sa.Column('confirmed', sa.Boolean(), nullable=False,
+                  server_default='false'),
+        sa.Column('event_id', sa.String(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_booking_holds_expires_at', 'booking_holds', ['expires_at'])
+    op.execute(
+        '''ALTER TABLE booking_holds ADD CONSTRAINT booking_holds_no_overlap
+           EXCLUDE USING gist (
+               int4range(room_id, room_id, '[]') WITH =,
+               time_range WITH &&)'''
+    )
+
+
+def downgrade():
+    op.drop_index('ix_booking_holds_expires_at', table_name='booking_holds')
+    op.drop_table('booking_holds')
+    op.execute(DropSequence(Sequence('booking_holds_id_seq')))
@@ -0,0 +1,63 @@
+"""add device health status and transitions
+
+Revision ID: b7e1d9c3a5f2
+Revises: 8f4c2d6b1e93
+Create Date: 2019-11-20 09:41:12.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e1d9c3a5f2'
+down_revision = '8f4c2d6b1e93'
+branch_labels = None
+depends_on = None
+
+device_health_type = postgresql.ENUM(
+    'online', 'stale', 'offline', name='devicehealthtype')
+
+
+def upgrade():
+    device_health_type.create(op.get_bind(), checkfirst=True)
+    health_status = postgresql.ENUM(
+        'online', 'stale', 'offline', name='devicehealthtype',
+        create_type=False)
+    op.add_column('devices', sa.Column(
+        'health_status', health_status, nullable=False,
+        server_default='online'))
+    op.create_index(
+        'ix_devices_health_status', 'devices', ['health_status'])
+    op.create_index(
+        'ix_devices_lower_location', 'devices', [sa.text('lower(location)')])
+    op.create_table(
+        'device_health_transitions',
+        sa.Column('date_created', sa.DateTime(),
+                  server_default=sa.text('now()'), nullable=True),
+        sa.Column('date_updated', sa.DateTime(),
+                  server_default=sa.text('now()'), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('device_id', sa.Integer(), nullable=False),
+        sa.Column('previous_status', health_status, nullable=True),
+        sa.Column('status', health_status, nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['device_id'], ['devices.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_device_health_transitions_device_id',
+        'device_health_transitions', ['device_id'])
+
+
+def downgrade():
+    op.drop_index(
+        'ix_device_health_transitions_device_id',
+        table_name='device_health_transitions')
+    op.drop_table('device_health_transitions')
+    op.drop_index('ix_devices_lower_location', table_name='devices')
+    op.drop_index('ix_devices_health_status', table_name='devices')
+    op.drop_column('devices', 'health_status')
+    device_health_type.drop(op.get_bind(), checkfirst=True)
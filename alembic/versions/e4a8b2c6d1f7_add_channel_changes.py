@@ -0,0 +1,52 @@
+"""add channel change log
+
+Revision ID: e4a8b2c6d1f7
+Revises: 3c9a6f1d8e42
+Create Date: 2019-11-25 11:37:08.214419
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.schema import CreateSequence, DropSequence, Sequence
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a8b2c6d1f7'
+down_revision = '3c9a6f1d8e42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(CreateSequence(Sequence('channel_changes_version_seq')))
+    op.create_table(
+        'channel_changes',
+        sa.Column('date_created', sa.DateTime(),
+                  server_default=sa.text('now()'), nullable=True),
+        sa.Column('date_updated', sa.DateTime(),
+                  server_default=sa.text('now()'), nullable=True),
+        sa.Column('version', sa.BigInteger(), nullable=False,
+                  server_default=sa.text(
+                      "nextval('channel_changes_version_seq')")),
+        sa.Column('calendar_id', sa.String(), nullable=False),
+        sa.Column('firebase_token', sa.String(), nullable=True),
+        sa.Column('removed', sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint('version')
+    )
+    op.create_index(
+        'ix_channel_changes_calendar_id_version', 'channel_changes',
+        ['calendar_id', 'version'])
+    op.execute(
+        '''INSERT INTO channel_changes (calendar_id, firebase_token, removed)
+           SELECT calendar_id, firebase_token, false FROM rooms
+           WHERE state = 'active' AND calendar_id IS NOT NULL
+           ORDER BY id'''
+    )
+
+
+def downgrade():
+    op.drop_index(
+        'ix_channel_changes_calendar_id_version',
+        table_name='channel_changes')
+    op.drop_table('channel_changes')
+    op.execute(DropSequence(Sequence('channel_changes_version_seq')))
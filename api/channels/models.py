@@ -0,0 +1,56 @@
+from sqlalchemy import Column, String, BigInteger, Boolean, Index, func, text
+from sqlalchemy.schema import Sequence
+
+from helpers.database import Base, db_session
+
+# Key of the advisory lock that makes channel versions commit in order
+CHANNEL_VERSION_LOCK = 7263
+
+
+class ChannelChange(Base):
+    """
+    Append-only log of notification channel changes. Every change gets
+    the next version, so a poller only asks for versions it has not seen
+    """
+    __tablename__ = 'channel_changes'
+    version = Column(BigInteger, Sequence('channel_changes_version_seq', start=1, increment=1), primary_key=True) # noqa
+    calendar_id = Column(String, nullable=False)
+    firebase_token = Column(String, nullable=True)
+    removed = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        Index('ix_channel_changes_calendar_id_version',
+              'calendar_id', 'version'),
+    )
+
+
+def record_channel_changes(connection, changes):
+    """
+    Logs channel changes within the transaction of the room write.
+    The transaction-scoped advisory lock is taken before the versions
+    are drawn, so versions become visible in the order they were drawn
+    and a poller never skips a change committed late
+    :params connection: connection of the flush
+    :params changes: list of dicts with calendar_id, firebase_token
+    and removed
+    """
+    connection.execute(
+        text('SELECT pg_advisory_xact_lock(:key)'), key=CHANNEL_VERSION_LOCK)
+    connection.execute(ChannelChange.__table__.insert(), changes)
+
+
+def current_channel_version():
+    return db_session.query(
+        func.coalesce(func.max(ChannelChange.version), 0)).scalar()
+
+
+def channel_changes_since(version):
+    """
+    Returns the latest change of every channel changed after a version
+    :params version: last version the poller has seen
+    """
+    return db_session.query(ChannelChange).filter(
+        ChannelChange.version > version
+    ).order_by(
+        ChannelChange.calendar_id, ChannelChange.version.desc()
+    ).distinct(ChannelChange.calendar_id).all()
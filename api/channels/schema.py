@@ -1,6 +1,5 @@
 import graphene
-from api.room.models import Room as RoomModel
-from api.room.schema import Room
+from helpers.room.channel_feed import channel_feed
 
 
 class Channel(graphene.ObjectType):
@@ -14,9 +13,13 @@ class Channel(graphene.ObjectType):
 class Channels(graphene.ObjectType):
     """
         Generates return type of Channels
-        a list of all channels
+        a list of all channels, or of the channels changed since
+        a version, with the calendar ids of removed channels and
+        the version the list reflects
     """
     channels = graphene.List(Channel)
+    removed_channels = graphene.List(graphene.String)
+    version = graphene.Int()
 
 
 class Query(graphene.ObjectType):
@@ -25,20 +28,15 @@ class Query(graphene.ObjectType):
     """
     all_channels = graphene.Field(
         Channels,
-        description="Returns a list of all notification channels"
-    )
-
-    def resolve_all_channels(self, info):
-        all_rooms = Room.get_query(info).filter(RoomModel.state == "active")
-
-        all_channels = []
-
-        for room in all_rooms:
-            channel = Channel(
-                calendar_id=room.calendar_id,
-                firebase_token=room.firebase_token
-            )
-
-            all_channels.append(channel)
-
-        return Channels(channels=all_channels)
+        since_version=graphene.Int(),
+        description="Returns a list of all notification channels\
+            and accepts the argument\
+            \n- since_version: Only return the channels added, changed\
+            or removed after this version")
+
+    def resolve_all_channels(self, info, since_version=None):
+        feed = channel_feed(since_version)
+        return Channels(
+            channels=[Channel(**channel) for channel in feed['channels']],
+            removed_channels=feed['removed_channels'],
+            version=feed['version'])
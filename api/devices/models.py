@@ -1,12 +1,21 @@
-from sqlalchemy import (Column, String, Integer, DateTime, ForeignKey, Enum)
+from sqlalchemy import (
+    Column, String, Integer, DateTime, ForeignKey, Enum, Index, func
+)
 from sqlalchemy.schema import Sequence
 from sqlalchemy.orm import relationship
+import enum
 
 from helpers.database import Base
 from utilities.validations import validate_empty_fields
 from utilities.utility import Utility, StateType
 
 
+class DeviceHealthType(enum.Enum):
+    online = "online"
+    stale = "stale"
+    offline = "offline"
+
+
 class Devices(Base, Utility):
     __tablename__ = 'devices'
     id = Column(Integer, Sequence('devices_id_seq', start=1, increment=1), primary_key=True) # noqa
@@ -19,6 +28,15 @@ class Devices(Base, Utility):
     room = relationship('Room')
     state = Column(Enum(StateType), nullable=False, default="active")
     last_activity = Column(String, nullable=True)
+    health_status = Column(
+        Enum(DeviceHealthType), nullable=False, default="online",
+        server_default="online")
+
+    __table_args__ = (
+        Index('ix_devices_room_id', 'room_id'),
+        Index('ix_devices_health_status', 'health_status'),
+        Index('ix_devices_lower_location', func.lower(location)),
+    )
 
     def __init__(self, **kwargs):
         validate_empty_fields(**kwargs)
@@ -29,3 +47,19 @@ class Devices(Base, Utility):
         self.last_seen = kwargs['last_seen']
         self.location = kwargs['location']
         self.room_id = kwargs.get('room_id')
+
+
+class DeviceHealthTransition(Base):
+    __tablename__ = 'device_health_transitions'
+    id = Column(Integer, Sequence('device_health_transitions_id_seq', start=1, increment=1), primary_key=True) # noqa
+    device_id = Column(
+        Integer, ForeignKey('devices.id', ondelete="CASCADE"),
+        nullable=False)
+    previous_status = Column(Enum(DeviceHealthType), nullable=True)
+    status = Column(Enum(DeviceHealthType), nullable=False)
+    changed_at = Column(DateTime, nullable=False)
+    device = relationship('Devices')
+
+    __table_args__ = (
+        Index('ix_device_health_transitions_device_id', 'device_id'),
+    )
@@ -2,18 +2,24 @@ import graphene
 from graphql import GraphQLError
 from datetime import datetime
 from graphene_sqlalchemy import SQLAlchemyObjectType
-from sqlalchemy import func, String, cast
+from sqlalchemy import func
 
 from api.devices.models import Devices as DevicesModel
 from helpers.auth.authentication import Auth
 from api.room.models import Room as RoomModel
+from api.room.schema import RoomLabelMatch
 from api.location.schema import Location as LocationSchema
 from api.location.models import Location as LocationModel
 from utilities.validations import validate_empty_fields
 from utilities.utility import update_entity_fields
-from helpers.room_filter.room_filter import location_join_room
+from helpers.room_filter.room_filter import (
+    location_join_room,
+    filter_room_labels
+)
 from helpers.auth.user_details import get_user_from_db
 from helpers.auth.admin_roles import admin_roles
+from helpers.devices.device_activity import merge_pending_activity
+from helpers.devices.devices import device_health_summary
 
 
 class Devices(SQLAlchemyObjectType):
@@ -26,6 +32,17 @@ class Devices(SQLAlchemyObjectType):
         model = DevicesModel
 
 
+class DeviceHealthSummary(graphene.ObjectType):
+    """
+        Returns the number of online, stale and offline devices
+        of a location together with the devices that are not online
+    """
+    online = graphene.Int()
+    stale = graphene.Int()
+    offline = graphene.Int()
+    unhealthy_devices = graphene.List(Devices)
+
+
 class CreateDevice(graphene.Mutation):
     """
         Returns the device payload after creating
@@ -115,9 +132,11 @@ class Query(graphene.ObjectType):
     all_devices = graphene.List(
         Devices,
         device_labels=graphene.String(),
+        label_match=graphene.Argument(RoomLabelMatch),
         description="Query that returns a list of all devices,\
         if device_labels is passed, it filters devices with the device labels\
-        \n- device_labels: A string of labels to filter with")
+        \n- device_labels: A string of labels to filter with\
+        \n- label_match: ALL (default) or ANY of the device labels")
 
     specific_device = graphene.Field(
         Devices,
@@ -133,6 +152,14 @@ class Query(graphene.ObjectType):
             \n- device_name: The name of the device"
     )
 
+    device_health_summary = graphene.Field(
+        DeviceHealthSummary,
+        location_id=graphene.Int(required=True),
+        description="Returns the device health counts of a location and the\
+            devices that are stale or offline, accepts the argument\
+            \n- location_id: A unique identifier of the location[required]"
+    )
+
     def resolve_all_devices(self, info, **kwargs):
         device_labels = kwargs.get('device_labels')
         query = Devices.get_query(info)
@@ -147,12 +174,10 @@ class Query(graphene.ObjectType):
             DevicesModel.state == "active")
 
         if device_labels:
-            all_devices = all_devices.join(RoomModel)
-            for device_label in device_labels.split(','):
-                all_devices = all_devices.filter(
-                    cast(RoomModel.room_labels, String)
-                    .ilike(f'%{device_label.strip()}%'))
-        return all_devices
+            all_devices = filter_room_labels(
+                all_devices.join(RoomModel), device_labels,
+                kwargs.get('label_match'))
+        return merge_pending_activity(all_devices.all())
 
     @Auth.user_roles('Admin', 'Super Admin')
     def resolve_specific_device(self, info, device_id):
@@ -162,7 +187,7 @@ class Query(graphene.ObjectType):
         if not device:
             raise GraphQLError("Device not found")
 
-        return device
+        return merge_pending_activity([device])[0]
 
     @Auth.user_roles('Admin', 'Super Admin')
     def resolve_device_by_name(self, info, device_name):
@@ -175,7 +200,18 @@ class Query(graphene.ObjectType):
             exact_name = ''.join(device.name.split()).lower()
             if device_name in exact_name:
                 found_devices.append(device)
-        return found_devices
+        return merge_pending_activity(found_devices)
+
+    @Auth.user_roles('Admin', 'Super Admin')
+    def resolve_device_health_summary(self, info, location_id):
+        location_query = LocationSchema.get_query(info)
+        exact_location = location_query.filter(
+            LocationModel.state == "active",
+            LocationModel.id == location_id).first()
+        if not exact_location:
+            raise GraphQLError("Location not found")
+        return DeviceHealthSummary(
+            **device_health_summary(exact_location.name))
 
 
 class Mutation(graphene.ObjectType):
@@ -1,4 +1,8 @@
-from sqlalchemy import (Column, String, Integer, Boolean, ForeignKey, Enum)
+from sqlalchemy import (
+    Column, String, Integer, Boolean, ForeignKey, Enum, Index,
+    UniqueConstraint, DDL, DateTime, event
+)
+from sqlalchemy.dialects.postgresql import TSTZRANGE
 from sqlalchemy.orm import relationship
 from sqlalchemy.schema import Sequence
 from graphql import GraphQLError
@@ -29,6 +33,97 @@ class Events(Base, Utility):
     meeting_end_time = Column(String, nullable=True)
     auto_cancelled = Column(Boolean, nullable=True, default=False)
     app_booking = Column(Boolean, nullable=True, default=False)
+    # maintained by the events_set_time_range trigger from the start and
+    # end times, NULL with a warning when they cannot be parsed, such
+    # events are counted in /metrics
+    time_range = Column(TSTZRANGE, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint(
+            'event_id', 'start_time', name='uq_events_event_id_start_time'),
+        Index(
+            'ix_events_recurring_event_id_start_time',
+            'recurring_event_id', 'start_time'),
+        Index('ix_events_time_range', 'time_range', postgresql_using='gist'),
+        Index('ix_events_without_time_range', 'id',
+              postgresql_where=time_range.is_(None)),
+    )
+
+
+events_time_range_function = DDL('''
+CREATE OR REPLACE FUNCTION events_set_time_range() RETURNS trigger AS $$
+BEGIN
+    NEW.time_range := tstzrange(
+        NEW.start_time::timestamptz, NEW.end_time::timestamptz, '[)');
+    RETURN NEW;
+EXCEPTION WHEN others THEN
+    RAISE WARNING 'Event %% has no time range from %% to %%: %%',
+        NEW.event_id, NEW.start_time, NEW.end_time, SQLERRM;
+    NEW.time_range := NULL;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql''')
+
+events_time_range_trigger = DDL('''
+CREATE TRIGGER events_set_time_range
+BEFORE INSERT OR UPDATE OF start_time, end_time ON events
+FOR EACH ROW EXECUTE PROCEDURE events_set_time_range()''')
+
+for ddl in (events_time_range_function, events_time_range_trigger):
+    event.listen(
+        Events.__table__, 'after_create',
+        ddl.execute_if(dialect='postgresql'))
+
+
+class BookingHold(Base):
+    """
+    Reservation of a room for a period, taken while a booking is written
+    to the calendar. An exclusion constraint stops two holds of a room
+    from overlapping; unconfirmed holds lapse at expires_at and confirmed
+    ones when the booking ends
+    """
+    __tablename__ = 'booking_holds'
+    id = Column(Integer, Sequence('booking_holds_id_seq', start=1, increment=1), primary_key=True)  # noqa
+    room_id = Column(
+        Integer, ForeignKey('rooms.id', ondelete="CASCADE"), nullable=False)
+    time_range = Column(TSTZRANGE, nullable=False)
+    confirmed = Column(Boolean, nullable=False, default=False,
+                       server_default='false')
+    event_id = Column(String, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('ix_booking_holds_expires_at', 'expires_at'),
+    )
+
+
+# the room is compared as a one point range so that the constraint needs
+# only the built in range operator classes and not btree_gist
+booking_holds_no_overlap = DDL('''
+ALTER TABLE booking_holds ADD CONSTRAINT booking_holds_no_overlap
+EXCLUDE USING gist (
+    int4range(room_id, room_id, '[]') WITH =, time_range WITH &&)''')
+
+event.listen(
+    BookingHold.__table__, 'after_create',
+    booking_holds_no_overlap.execute_if(dialect='postgresql'))
+
+
+class CheckInDeadline(Base):
+    """
+    Check-in deadline of an event occurrence, queued in the database when
+    no Redis is configured so that the Celery worker sees the deadlines
+    scheduled by every process
+    """
+    __tablename__ = 'checkin_deadlines'
+    event_id = Column(
+        Integer, ForeignKey('events.id', ondelete="CASCADE"),
+        primary_key=True)
+    deadline = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('ix_checkin_deadlines_deadline', 'deadline'),
+    )
 
 
 def filter_event(start_date, end_date, room_id=None):
@@ -3,7 +3,6 @@ from graphene_sqlalchemy import SQLAlchemyObjectType
 from graphql import GraphQLError
 import pytz
 from dateutil import parser
-from datetime import timedelta
 from graphene import String
 
 from api.events.models import Events as EventsModel
@@ -11,7 +10,8 @@ from api.room.models import Room as RoomModel
 from api.events.models import (
     filter_event
 )
-from helpers.calendar.events import RoomSchedules, CalendarEvents
+from helpers.calendar.events import CalendarEvents
+from helpers.event_booking.event_booking import book_room
 from helpers.email.email import notification
 from helpers.calendar.credentials import (
     get_single_calendar_event,
@@ -19,7 +19,11 @@ from helpers.calendar.credentials import (
 )
 from helpers.auth.authentication import Auth
 from helpers.pagination.paginate import ListPaginate
-from helpers.devices.devices import update_device_last_activity
+from helpers.event_checkin.event_checkin import (
+    check_in_event,
+    cancel_event,
+    end_event
+)
 from helpers.events_filter.events_filter import (
     sort_events_by_date,
     validate_page_and_per_page,
@@ -39,6 +43,7 @@ class Events(SQLAlchemyObjectType):
     """
     class Meta:
         model = EventsModel
+        exclude_fields = ('time_range',)
 
 
 class BookEvent(graphene.Mutation):
@@ -92,6 +97,14 @@ class BookEvent(graphene.Mutation):
 
         start_date, end_date = calendar_dates_format(
             kwargs['start_date'], kwargs['start_time'], duration)
+        room_model = RoomModel.query.filter_by(
+            name=room, state='active').first()
+        if not room_model:
+            raise GraphQLError('Room not found')
+        try:
+            zone = pytz.timezone(time_zone)
+        except pytz.UnknownTimeZoneError:
+            raise GraphQLError('Invalid time zone')
 
         attendees = attendees.replace(" ", "").split(",")
         guests = []
@@ -117,8 +130,13 @@ class BookEvent(graphene.Mutation):
             }
         }
         service = credentials.set_api_credentials()
-        service.events().insert(calendarId='primary', body=event,
-                                sendNotifications=True).execute()
+        book_room(
+            room_model.id,
+            zone.localize(parser.parse(start_date)),
+            zone.localize(parser.parse(end_date)),
+            service.events().insert(calendarId='primary', body=event,
+                                    sendNotifications=True).execute
+        )
         return BookEvent(response='Event created successfully')
 
 
@@ -137,21 +155,7 @@ class EventCheckin(graphene.Mutation):
     event = graphene.Field(Events)
 
     def mutate(self, info, **kwargs):
-        room_id, event = check_event_in_db(self, info, "checked_in", **kwargs)
-        if kwargs.get('check_in_time'):
-            update_device_last_activity(
-                info, room_id, kwargs['check_in_time'], 'check in')
-        if not event:
-            event = EventsModel(
-                event_id=kwargs['event_id'],
-                room_id=room_id,
-                event_title=kwargs['event_title'],
-                start_time=kwargs['start_time'],
-                end_time=kwargs['end_time'],
-                number_of_participants=kwargs['number_of_participants'],
-                checked_in=True,
-                cancelled=False)
-            event.save()
+        event = check_in_event(**kwargs)
         return EventCheckin(event=event)
 
 
@@ -170,26 +174,7 @@ class CancelEvent(graphene.Mutation):
 
     def mutate(self, info, **kwargs):
         # mutation to create an event
-        room_id, event = check_event_in_db(self, info, "cancelled", **kwargs)
-        try:
-            device_last_seen = parser.parse(
-                kwargs['start_time']) + timedelta(minutes=10)
-        except ValueError:
-            raise GraphQLError("Invalid start time")
-        update_device_last_activity(
-            info, room_id, device_last_seen, 'cancel meeting')
-        if not event:
-            event = EventsModel(
-                event_id=kwargs['event_id'],
-                room_id=room_id,
-                event_title=kwargs['event_title'],
-                start_time=kwargs['start_time'],
-                end_time=kwargs['end_time'],
-                number_of_participants=kwargs['number_of_participants'],
-                checked_in=False,
-                cancelled=True,
-                auto_cancelled=True)
-            event.save()
+        event = cancel_event(**kwargs)
         calendar_event = get_single_calendar_event(
             kwargs['calendar_id'],
             kwargs['event_id']
@@ -197,7 +182,7 @@ class CancelEvent(graphene.Mutation):
         event_reject_reason = 'after 10 minutes'
         if not notification.event_cancellation_notification(
             calendar_event,
-            room_id,
+            event.room_id,
             event_reject_reason
         ):
             raise GraphQLError("Event cancelled but email not sent")
@@ -218,16 +203,7 @@ class EndEvent(graphene.Mutation):
     event = graphene.Field(Events)
 
     def mutate(self, info, **kwargs):
-        room_id, event = check_event_in_db(self, info, "ended", **kwargs)
-        if kwargs.get('meeting_end_time'):
-            update_device_last_activity(
-                info, room_id, kwargs['meeting_end_time'], 'end meeting')
-        if not event:
-            event = EventsModel(
-                event_id=kwargs['event_id'],
-                meeting_end_time=kwargs['meeting_end_time']
-            )
-            event.save()
+        event = end_event(**kwargs)
 
         return EndEvent(event=event)
 
@@ -261,33 +237,6 @@ class MrmNotification(graphene.Mutation):
         return MrmNotification(message="success")
 
 
-def check_event_in_db(instance, info, event_check, **kwargs):
-    room_id = RoomSchedules().check_event_status(info, **kwargs)
-    event = EventsModel.query.filter_by(
-        start_time=kwargs['start_time'],
-        event_id=kwargs['event_id']).scalar()
-    if event and event_check == 'cancelled':
-        event.cancelled = True
-        event.auto_cancelled = True
-        event.save()
-        return room_id, event
-    elif event and event_check == 'checked_in':
-        event.checked_in = True
-        if 'check_in_time' in kwargs:
-            event.check_in_time = kwargs['check_in_time']
-        else:
-            event.check_in_time = None
-        event.save()
-        return room_id, event
-    elif event and event_check == 'ended':
-        if event.meeting_end_time:
-            raise GraphQLError("Event has already ended")
-        event.meeting_end_time = kwargs['meeting_end_time']
-        event.save()
-        return room_id, event
-    return room_id, event
-
-
 class Mutation(graphene.ObjectType):
     event_checkin = EventCheckin.Field()
     cancel_event = CancelEvent.Field()
@@ -13,7 +13,7 @@ from helpers.room_filter.room_filter import (
     lagos_office_join_location)
 from helpers.auth.admin_roles import admin_roles
 from helpers.auth.error_handler import SaveContextManager
-from helpers.pagination.paginate import Paginate, validate_page
+from helpers.pagination.paginate import Paginate
 from helpers.email.email import notification
 from helpers.auth.user_details import get_user_from_db
 
@@ -123,17 +123,13 @@ class PaginateOffices(Paginate):
 
     def resolve_offices(self, info, **kwargs):
         page = self.page
-        per_page = self.per_page
         query = Office.get_query(info)
         active_offices = query.filter(OfficeModel.state == "active")
         if not page:
             return active_offices.order_by(func.lower(OfficeModel.name)).all()
-        page = validate_page(page)
-        self.query_total = active_offices.count()
-        result = active_offices.order_by(
-            func.lower(OfficeModel.name)).limit(
-            per_page).offset(page * per_page)
-        if result.count() == 0:
+        result = self.paginate(
+            active_offices.order_by(func.lower(OfficeModel.name)))
+        if not result:
             return GraphQLError("No more offices")
         return result
 
@@ -151,9 +147,11 @@ class Query(graphene.ObjectType):
         PaginateOffices,
         page=graphene.Int(),
         per_page=graphene.Int(),
+        with_total=graphene.Boolean(),
         description="Returns a list of paginated offices and accepts the arguments\
             \n- page: The returned offices page\
-            \n- per_page: The number of offices per page")
+            \n- per_page: The number of offices per page\
+            \n- with_total: Whether to count the offices, defaults to true")
 
     def resolve_all_offices(self, info, **kwargs):
         # Returns the total number of offices
@@ -11,7 +11,7 @@ from utilities.validations import (
 from utilities.utility import update_entity_fields
 from helpers.auth.authentication import Auth
 from helpers.auth.error_handler import SaveContextManager
-from helpers.pagination.paginate import Paginate, validate_page
+from helpers.pagination.paginate import Paginate
 from helpers.questions_filter.questions_filter import (
     filter_questions_by_date_range
 )
@@ -76,15 +76,12 @@ class PaginatedQuestions(Paginate):
 
     def resolve_questions(self, info):
         page = self.page
-        per_page = self.per_page
         query = Question.get_query(info)
         active_questions = query.filter(QuestionModel.state == "active")
         if not page:
             return active_questions.all()
-        page = validate_page(page)
-        self.query_total = active_questions.count()
-        result = active_questions.limit(per_page).offset(page * per_page)
-        if result.count() == 0:
+        result = self.paginate(active_questions)
+        if not result:
             return GraphQLError("No questions found")
         return result
 
@@ -182,10 +179,12 @@ class Query(graphene.ObjectType):
         PaginatedQuestions,
         page=graphene.Int(),
         per_page=graphene.Int(),
+        with_total=graphene.Boolean(),
         description="Returns a list of paginated questions. Accepts arguments \
             \n- page: which is a particular page which is returned \
                 \n- per_page: the number of questions displayed \
-                within a particular page"
+                within a particular page \
+                \n- with_total: whether to count the questions (default true)"
     )
     question = graphene.Field(
         lambda: Question,
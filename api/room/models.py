@@ -2,7 +2,8 @@ from sqlalchemy import (
     Column, String, Integer, ForeignKey, event, Table, Enum, Index
 )
 from sqlalchemy.dialects import postgresql
-from sqlalchemy.orm import relationship
+from sqlalchemy import inspect
+from sqlalchemy.orm import relationship, validates
 from graphql import GraphQLError
 from sqlalchemy.schema import Sequence
 
@@ -13,12 +14,14 @@ from api.response.models import Response  # noqa: F401
 from api.tag.models import Tag  # noqa: F401
 from utilities.validator import verify_calendar_id
 from api.devices.models import Devices # noqa F4
+from api.channels.models import record_channel_changes
 
 tags = Table(
     'room_tags',
     Base.metadata,
     Column('tag_id', Integer, ForeignKey('tags.id')),
-    Column('room_id', Integer, ForeignKey('rooms.id'))
+    Column('room_id', Integer, ForeignKey('rooms.id')),
+    Index('ix_room_tags_room_id', 'room_id')
 )
 
 
@@ -40,6 +43,7 @@ class Room(Base, Utility):
     room_type = Column(String)
     capacity = Column(Integer, nullable=False)
     room_labels = Column(postgresql.ARRAY(String), default=[])
+    normalized_room_labels = Column(postgresql.ARRAY(String), default=[])
     image_url = Column(String)
     calendar_id = Column(String)
     location_id = Column(
@@ -72,8 +76,29 @@ class Room(Base, Utility):
                 'location_id',
                 unique=True,
                 postgresql_where=(state == 'active')),
+            Index('ix_rooms_location_id', 'location_id'),
+            Index(
+                'ix_rooms_normalized_room_labels',
+                'normalized_room_labels',
+                postgresql_using='gin'),
         )
 
+    @validates('room_labels')
+    def sync_normalized_room_labels(self, key, room_labels):
+        self.normalized_room_labels = normalize_room_labels(room_labels)
+        return room_labels
+
+
+def normalize_room_labels(room_labels):
+    """
+    Lower case and strip room labels so that they can be matched
+    with the array operators regardless of how they were entered
+    :param room_labels: list of labels
+    :return: list of normalized labels
+    """
+    return [label.strip().lower() for label in room_labels or []
+            if label and label.strip()]
+
 
 @event.listens_for(Room, 'before_insert')
 def receive_before_insert(mapper, connection, target):
@@ -84,6 +109,69 @@ def receive_before_insert(mapper, connection, target):
         pass
 
 
+def channel_changes(room):
+    """
+    Lists the notification channel changes a room write makes
+    :param room: room being flushed
+    :return: list of dicts with calendar_id, firebase_token and removed
+    """
+    room_state = inspect(room)
+    calendar_id = room_state.attrs.calendar_id.history
+    firebase_token = room_state.attrs.firebase_token.history
+    state = room_state.attrs.state.history
+    active = room.state in (None, 'active', StateType.active)
+    changes = []
+    for old_calendar_id in calendar_id.deleted or []:
+        if old_calendar_id and old_calendar_id != room.calendar_id:
+            changes.append({'calendar_id': old_calendar_id,
+                            'firebase_token': None, 'removed': True})
+    if not room.calendar_id:
+        return changes
+    if not active and state.has_changes():
+        changes.append({'calendar_id': room.calendar_id,
+                        'firebase_token': None, 'removed': True})
+    elif active and (calendar_id.has_changes() or
+                     firebase_token.has_changes() or state.has_changes()):
+        changes.append({'calendar_id': room.calendar_id,
+                        'firebase_token': room.firebase_token,
+                        'removed': False})
+    return changes
+
+
+@event.listens_for(Room, 'after_insert')
+@event.listens_for(Room, 'after_update')
+def receive_channel_change(mapper, connection, target):
+    changes = channel_changes(target)
+    if changes:
+        record_channel_changes(connection, changes)
+
+
+@event.listens_for(db_session, 'after_bulk_update')
+def receive_bulk_channel_change(update_context):
+    """
+    Logs the channel changes of rooms updated in bulk, e.g. archived
+    with their location, which the mapper events above never see.
+    Needs the update to be run with synchronize_session='fetch'
+    """
+    matched_rows = getattr(update_context, 'matched_rows', None)
+    if update_context.mapper.class_ is not Room or not matched_rows:
+        return
+    rooms = update_context.session.execute(
+        Room.__table__.select().where(Room.id.in_(
+            [row[0] for row in matched_rows]
+        )).where(Room.calendar_id.isnot(None))
+    )
+    changes = []
+    for room in rooms:
+        active = room.state in ('active', StateType.active)
+        changes.append({'calendar_id': room.calendar_id,
+                        'firebase_token': room.firebase_token if active
+                        else None,
+                        'removed': not active})
+    if changes:
+        record_channel_changes(update_context.session.connection(), changes)
+
+
 cascade_soft_delete(
     Room, 'events', 'room_id'
 )
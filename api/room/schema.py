@@ -16,8 +16,12 @@ from helpers.room import subscriber
 from utilities.validator import (
     verify_location_id,
     ErrorHandler)
-from helpers.room_filter.room_filter import room_filter, room_join_location
-from helpers.pagination.paginate import Paginate, validate_page
+from helpers.room_filter.room_filter import (
+    room_filter,
+    room_join_location,
+    LabelMatch
+)
+from helpers.pagination.paginate import Paginate
 
 
 class Room(SQLAlchemyObjectType):
@@ -26,6 +30,10 @@ class Room(SQLAlchemyObjectType):
     """
     class Meta:
         model = RoomModel
+        exclude_fields = ('normalized_room_labels',)
+
+
+RoomLabelMatch = graphene.Enum.from_enum(LabelMatch)
 
 
 def save_room_tags(room, room_tags):
@@ -152,18 +160,15 @@ class PaginatedRooms(Paginate):
 
     def resolve_rooms(self, info, **kwargs):
         page = self.page
-        per_page = self.per_page
         filter_data = self.filter_data
         query = Room.get_query(info)
         exact_query = room_filter(query, filter_data)
         active_rooms = exact_query.filter(RoomModel.state == "active")
         if not page:
             return active_rooms.order_by(func.lower(RoomModel.name)).all()
-        page = validate_page(page)
-        self.query_total = active_rooms.count()
-        result = active_rooms.order_by(func.lower(
-            RoomModel.name)).limit(per_page).offset(page*per_page)
-        if result.count() == 0:
+        result = self.paginate(
+            active_rooms.order_by(func.lower(RoomModel.name)))
+        if not result:
             return GraphQLError("No more resources")
         return result
 
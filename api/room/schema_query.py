@@ -5,7 +5,7 @@ from graphql import GraphQLError
 from helpers.calendar.analytics import RoomAnalytics  # noqa: E501
 from helpers.auth.authentication import Auth
 from helpers.auth.admin_roles import admin_roles
-from api.room.schema import (PaginatedRooms, Calendar, Room)
+from api.room.schema import (PaginatedRooms, Calendar, Room, RoomLabelMatch)
 from helpers.calendar.events import RoomSchedules
 from helpers.calendar.analytics import RoomStatistics  # noqa: E501
 from api.room.models import Room as RoomModel
@@ -15,15 +15,18 @@ from helpers.auth.user_details import get_user_from_db
 from helpers.remote_rooms.remote_rooms_location import (
     map_remote_room_location_to_filter
 )
-from helpers.calendar.credentials import (get_google_api_calendar_list,
-                                          credentials
-                                          )
+from helpers.calendar.credentials import get_google_api_calendar_list
 from helpers.events_filter.events_filter import (convert_date,
                                                  validate_date_input,
                                                  format_range_dates,
                                                  format_range_time,
-                                                 empty_string_checker
+                                                 empty_string_checker,
+                                                 parse_period
                                                  )
+from helpers.room.availability import (
+    available_rooms, booked_rooms, busy_calendars
+)
+from helpers.room.recommendation import rank_rooms, room_feature_index
 from api.room.schema import (RatioOfCheckinsAndCancellations,
                              BookingsAnalyticsCount)
 
@@ -126,6 +129,12 @@ class AllAvailableRooms(graphene.ObjectType):
     availableRoom = graphene.List(AvailableRooms)
 
 
+class RecommendedRoom(graphene.ObjectType):
+    room = graphene.Field(Room)
+    capacity_waste = graphene.Int()
+    extra_resources = graphene.Int()
+
+
 class Query(graphene.ObjectType):
     """
         Returns paginated rooms
@@ -133,22 +142,35 @@ class Query(graphene.ObjectType):
     all_rooms = graphene.Field(
         PaginatedRooms,
         room_labels=graphene.String(),
+        label_match=graphene.Argument(RoomLabelMatch),
         page=graphene.Int(),
         per_page=graphene.Int(),
+        with_total=graphene.Boolean(),
         capacity=graphene.Int(),
+        min_capacity=graphene.Int(),
+        max_capacity=graphene.Int(),
         resources=graphene.String(),
         location=graphene.String(),
         office=graphene.String(),
         devices=graphene.String(),
+        tags=graphene.String(),
+        structure_id=graphene.String(),
         description="Returns a list of paginated rooms. Accepts the arguments\
             \n- page: particular room page that is returned\
             \n- per_page: Lower limit responses per page\
+            \n- with_total: Whether to count the rooms, defaults to true\
             \n- capacity: number of users that a room can hold\
+            \n- min_capacity: Least number of users the room should hold\
+            \n- max_capacity: Most number of users the room should hold\
             \n- resources: Resuources found in the room\
             \n- location: Location of the room\
             \n- office: Office where the room is found\
             \n- devices: Devices that are in a room\
-            \n- room_labels: Labels to filter the rooms with"
+            \n- tags: Comma separated names of tags the room must have\
+            \n- structure_id: Office structure containing the room\
+            \n- room_labels: Labels to filter the rooms with\
+            \n- label_match: ALL (default) to return rooms with every label\
+            or ANY to return rooms with at least one of the labels"
     )
     get_room_by_id = graphene.Field(
         Room,
@@ -332,12 +354,15 @@ class Query(graphene.ObjectType):
         end_date=graphene.String(required=True),
         end_time=graphene.String(required=True),
         time_zone=graphene.String(required=True),
+        check_calendar=graphene.Boolean(),
         description="Returns available rooms in a given period \
             \n- start_time: Start time and date when you want to book room from\
             [required]\n- end_time: time and date you want to book room upto\
                 [required]\n time_zone: The time zone of the location\
                     [required]\n location: The location of the office's \
-                        room you want to book"
+                        room you want to book\
+            \n- check_calendar: Confirm that the available rooms are free\
+            in the calendar too"
     )
 
     @Auth.user_roles('Admin', 'Super Admin')
@@ -359,55 +384,78 @@ class Query(graphene.ObjectType):
                                 time_zone
                                 )
 
-        # list of all remote rooms in a user's location
-        locational_remote_rooms = Query.resolve_all_remote_rooms(
-            self, info, return_all=False)
-        all_rooms = []
-        for room in locational_remote_rooms.rooms:
-            all_rooms.append({
-                "id": room.calendar_id,
-                "name": room.name
-            })
-
-        # list of all remote rooms and
-        # for each room shows whether it is free or busy in a given period.
-        service = credentials.set_api_credentials()
-        all_calendars = get_google_api_calendar_list()['items']
-        all_remote_rooms = []
-        for room in all_calendars:
-            free_busy_rooms_request_object = {
-                "timeMin": start_time,
-                "timeMax": end_time,
-                "timeZone": time_zone,
-                "items": [
-                    {
-                        "id": room['id']
-                    }
-                ]
-            }
-            res = service.freebusy().query(
-                body=free_busy_rooms_request_object
-                ).execute()
-            all_remote_rooms.append(res[u'calendars'])
-
-        # all busy remote rooms in a given period
-        busy_rooms = [key for element in all_remote_rooms for key,
-                      value in element.items() if len(value["busy"]) != 0]
-
-        # all available rooms in a user's location in a given period
-        available_rooms = [room for room in all_rooms if room[
-            'id'
-            ] not in busy_rooms]
-        all_available_rooms = [AvailableRooms(room['id'],
-                                              room['name']
-                                              ) for room in available_rooms]
+        # rooms in the user's location without an overlapping booking
+        location_id = admin_roles.user_location_for_analytics_view()
+        free_rooms = available_rooms(location_id, start_time, end_time)
+        if kwargs.get('check_calendar'):
+            busy_rooms = busy_calendars(
+                [calendar_id for calendar_id, _ in free_rooms],
+                start_time, end_time, time_zone)
+            free_rooms = [room for room in free_rooms
+                          if room.calendar_id not in busy_rooms]
+        all_available_rooms = [AvailableRooms(calendar_id, name)
+                               for calendar_id, name in free_rooms]
 
         def raise_no_available_rooms():
             raise GraphQLError("No available rooms at the moment")
 
         return AllAvailableRooms(
             availableRoom=all_available_rooms
-        ) if available_rooms else raise_no_available_rooms()
+        ) if all_available_rooms else raise_no_available_rooms()
+
+    recommend_rooms = graphene.List(
+        RecommendedRoom,
+        start=graphene.String(required=True),
+        end=graphene.String(required=True),
+        attendees=graphene.Int(required=True),
+        required_resources=graphene.List(graphene.String),
+        labels=graphene.List(graphene.String),
+        location_id=graphene.Int(),
+        time_zone=graphene.String(),
+        limit=graphene.Int(),
+        description="Returns the available rooms that best fit a meeting, \
+            those with the fewest empty seats and unused resources first. \
+            Accepts the arguments\
+            \n- start: Start date and time of the meeting [required]\
+            \n- end: End date and time of the meeting [required]\
+            \n- attendees: Number of people attending [required]\
+            \n- required_resources: Names of resources the room must have\
+            \n- labels: Room labels or tag names the room must have\
+            \n- location_id: Location of the rooms, defaults to the user's\
+            \n- time_zone: Time zone of start and end when they have no\
+            UTC offset, defaults to UTC\
+            \n- limit: Number of rooms returned, defaults to 5"
+    )
+
+    @Auth.user_roles('Admin', 'Default User', 'Super Admin')
+    def resolve_recommend_rooms(self, info, start, end, attendees, **kwargs):
+        start_time, end_time = parse_period(
+            start, end, kwargs.get('time_zone') or 'UTC')
+        if attendees < 1:
+            raise GraphQLError("Attendees must be at least 1")
+        limit = kwargs.get('limit') or 5
+        if not 1 <= limit <= 50:
+            raise GraphQLError("Limit must be between 1 and 50")
+        location_id = kwargs.get('location_id') or \
+            admin_roles.user_location_for_analytics_view()
+        rooms = room_feature_index.rooms(location_id)
+        recommendations = rank_rooms(
+            rooms.values(), attendees,
+            kwargs.get('required_resources') or (),
+            kwargs.get('labels') or (),
+            booked_rooms(list(rooms), start_time, end_time),
+            limit)
+        if not recommendations:
+            raise GraphQLError("No rooms match the request")
+        room_models = {room.id: room for room in Room.get_query(info).filter(
+            RoomModel.id.in_([room.room_id for room in recommendations]))}
+        return [
+            RecommendedRoom(
+                room=room_models[recommendation.room_id],
+                capacity_waste=recommendation.capacity_waste,
+                extra_resources=recommendation.extra_resources
+            ) for recommendation in recommendations
+        ]
 
     @Auth.user_roles('Admin', 'Super Admin')
     def resolve_filter_rooms_by_tag(self, info, tagId):
@@ -1,18 +1,21 @@
 import graphene
 from graphene_sqlalchemy import SQLAlchemyObjectType
-from sqlalchemy import func, and_, String, cast
+from sqlalchemy import func, and_
 from graphql import GraphQLError
 
 from api.room_resource.models import Resource as ResourceModel
 from api.room.models import RoomResource as RoomResourceModel
 from api.room.models import Room as RoomModel
-from api.room.schema import Room as RoomSQLAlchemyObject
+from api.room.schema import Room as RoomSQLAlchemyObject, RoomLabelMatch
 from utilities.validations import validate_empty_fields
 from utilities.utility import update_entity_fields
 from helpers.auth.authentication import Auth
 from helpers.auth.error_handler import SaveContextManager
-from helpers.pagination.paginate import Paginate, validate_page
-from helpers.room_filter.room_filter import room_resources_join_room
+from helpers.pagination.paginate import Paginate
+from helpers.room_filter.room_filter import (
+    room_resources_join_room,
+    filter_room_labels
+)
 
 
 class Resource(SQLAlchemyObjectType):
@@ -142,28 +145,24 @@ class PaginatedResource(Paginate):
     def resolve_resources(self, info):
         # Function to get all room resources
         page = self.page
-        per_page = self.per_page
         unique = self.unique
         resource_labels = self.filter_data.get('resource_labels')
+        label_match = self.filter_data.get('label_match')
         active_resources = Resource.get_query(info).filter(
             ResourceModel.state == "active")
         if resource_labels:
-            active_resources_query = room_resources_join_room(active_resources)
-            for resourse_label in resource_labels.split(','):
-                active_resources = active_resources_query.filter(
-                    cast(RoomModel.room_labels, String)
-                    .ilike(f'%{resourse_label.strip()}%'))
+            active_resources = filter_room_labels(
+                room_resources_join_room(active_resources),
+                resource_labels, label_match)
 
         if not page:
             if unique:
                 return active_resources.distinct(ResourceModel.name).all()
             return active_resources.order_by(
                 func.lower(ResourceModel.name)).all()
-        page = validate_page(page)
-        self.query_total = active_resources.count()
-        result = active_resources.order_by(func.lower(
-            ResourceModel.name)).limit(per_page).offset(page*per_page)
-        if result.count() == 0:
+        result = self.paginate(
+            active_resources.order_by(func.lower(ResourceModel.name)))
+        if not result:
             return GraphQLError("No more resources")
         return result
 
@@ -249,13 +248,17 @@ class Query(graphene.ObjectType):
         PaginatedResource,
         page=graphene.Int(),
         per_page=graphene.Int(),
+        with_total=graphene.Boolean(),
         unique=graphene.Boolean(),
         resource_labels=graphene.String(),
+        label_match=graphene.Argument(RoomLabelMatch),
         description="Returns a list of paginated room resources and accepts the arguments\
             \n- page: Field for page of the room response\
             \n- per_page: Field for number of responses per page\
+            \n- with_total: Whether to count the resources, defaults to true\
             \n- unique: Boolean field for uniqueroom response\
-            \n- resource_labels: Labels to filter the resources with")
+            \n- resource_labels: Labels to filter the resources with\
+            \n- label_match: ALL (default) or ANY of the resource labels")
     get_resources_by_room_id = graphene.Field(
         lambda: RoomResources,
         room_id=graphene.Int(),
@@ -5,7 +5,7 @@ from api.user.schema import User
 from api.user.models import User as UserModel
 from helpers.auth.authentication import Auth
 from helpers.user_filter.user_filter import user_filter
-from helpers.pagination.paginate import Paginate, validate_page
+from helpers.pagination.paginate import Paginate
 
 
 class PaginatedUsers(Paginate):
@@ -16,17 +16,14 @@ class PaginatedUsers(Paginate):
 
     def resolve_users(self, info):
         page = self.page
-        per_page = self.per_page
         query = User.get_query(info)
         active_user = query.filter(UserModel.state == "active")
         exact_query = user_filter(active_user, self.filter_data)
         if not page:
             return exact_query.order_by(func.lower(UserModel.email)).all()
-        page = validate_page(page)
-        self.query_total = exact_query.count()
-        users = exact_query.order_by(
-            func.lower(UserModel.name)).limit(per_page).offset(page * per_page)
-        if users.count() == 0:
+        users = self.paginate(
+            exact_query.order_by(func.lower(UserModel.name)))
+        if not users:
             return GraphQLError("No users found")
         return users
 
@@ -38,12 +35,14 @@ class Query(graphene.ObjectType):
     users = graphene.Field(
         PaginatedUsers,
         per_page=graphene.Int(),
+        with_total=graphene.Boolean(),
         role_id=graphene.Int(),
         location_id=graphene.Int(),
         page=graphene.Int(),
         description="Returns a list of paginated users and accepts arguments\
             \n- page: Field with the users page\
             \n- per_page: Field indicating users per page\
+            \n- with_total: Whether to count the users, defaults to true\
             \n- location_id: Field with the unique key of user's location\
             \n- role_id: Field with the unique key of the user role"
     )
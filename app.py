@@ -1,26 +1,42 @@
-from flask import Flask, render_template, Response
+from flask import Flask, render_template, Response, jsonify, request
 from flask_graphql import GraphQLView
 from flask_cors import CORS
 from flask_json import FlaskJSON
 
 from flask_mail import Mail
 from config import config
-from helpers.database import db_session
+from helpers.database import (
+    all_engines, db_session, pool_stats, read_only
+)
 from schema import schema
 from healthcheck_schema import healthcheck_schema
 from helpers.auth.authentication import Auth
 from utilities.file_reader import read_log_file
+from api.channels.models import current_channel_version
+from helpers.room.channel_feed import channel_feed, channel_feed_etag
+from helpers.room.availability import events_without_time_range
+from helpers.graphql_view.graphql_view import MrmGraphQLView
+from helpers.metrics.metrics import instrument_engine, render_metrics
+from helpers.traffic.recorder import TrafficRecorder
+from helpers.profiling.profiling import profiles
 
 mail = Mail()
 
 
-def create_app(config_name):
+def create_app(config_name):  # noqa: C901
     app = Flask(__name__)
     CORS(app)
     FlaskJSON(app)
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
     mail.init_app(app)
+    for database_engine in all_engines():
+        instrument_engine(database_engine)
+    if app.config['TRAFFIC_RECORD_PATH']:
+        TrafficRecorder(
+            app.config['TRAFFIC_RECORD_PATH'],
+            app.config['TRAFFIC_RECORD_SECRET'] or app.config['SECRET_KEY'],
+            app.config['TRAFFIC_RECORD_SAMPLE_RATE']).install(app)
 
     @app.route("/", methods=['GET'])
     def index():
@@ -39,9 +55,38 @@ def create_app(config_name):
             response = Response(message, mimetype='text', status=404)
         return response
 
+    @app.route("/metrics", methods=['GET'])
+    @Auth.user_roles('Super Admin', 'REST')
+    def metrics():
+        return Response(
+            render_metrics(pool_stats(), events_without_time_range()),
+            mimetype='text/plain; version=0.0.4')
+
+    @app.route("/profiles/<profile_id>", methods=['GET'])
+    @Auth.user_roles('Super Admin', 'REST')
+    def profile(profile_id):
+        collapsed = profiles.get(profile_id)
+        if collapsed is None:
+            return Response('Profile was not found', mimetype='text',
+                            status=404)
+        return Response(collapsed, mimetype='text/plain')
+
+    @app.route("/channels", methods=['GET'])
+    def channels():
+        since_version = request.args.get('since_version', type=int)
+        with read_only():
+            version = current_channel_version()
+            etag = channel_feed_etag(since_version, version)
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = jsonify(channel_feed(since_version, version))
+        response.set_etag(etag)
+        return response
+
     app.add_url_rule(
         '/mrm',
-        view_func=GraphQLView.as_view(
+        view_func=MrmGraphQLView.as_view(
             'mrm',
             schema=schema,
             graphiql=True   # for having the GraphiQL interface
@@ -0,0 +1,133 @@
+"""
+Books one room from many threads at once over a few overlapping slots,
+first straight into a stand-in calendar as BookEvent used to, then
+through the reservation holds, and counts the double-bookings and the
+latency the holds add.
+
+Run it from the project root against a migrated database, e.g.
+    APP_SETTINGS=testing python -m benchmarks.booking_contention \\
+        --threads 16 --bookings 20
+
+The calendar call is simulated with a sleep. The report is printed as JSON.
+"""
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from graphql import GraphQLError
+
+from api.room.models import Room as RoomModel
+from helpers.database import db_session
+from helpers.event_booking.event_booking import book_room
+
+DAY = datetime(2099, 1, 5, 8, tzinfo=timezone.utc)
+
+
+def double_bookings(bookings):
+    """
+    Counts the pairs of overlapping bookings
+    """
+    bookings = sorted(bookings)
+    return sum(
+        1 for index, (start, end) in enumerate(bookings)
+        for other_start, _ in bookings[index + 1:] if other_start < end)
+
+
+def percentile(latencies, fraction):
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+
+def run(scenario, book, threads, bookings, slots, calendar_latency):
+    lock = threading.Lock()
+    booked = []
+    latencies = []
+    booked_latencies = []
+    rejected = [0]
+
+    def create_event():
+        time.sleep(calendar_latency)
+        return {'id': 'benchmark'}
+
+    def worker(seed):
+        choice = random.Random(seed)
+        for _ in range(bookings):
+            start = DAY + timedelta(minutes=15 * choice.randrange(slots))
+            end = start + timedelta(minutes=30)
+            started = time.perf_counter()
+            try:
+                book(start, end, create_event)
+                latency = time.perf_counter() - started
+                with lock:
+                    booked.append((start, end))
+                    booked_latencies.append(latency)
+            except GraphQLError:
+                latency = time.perf_counter() - started
+                with lock:
+                    rejected[0] += 1
+            with lock:
+                latencies.append(latency)
+        db_session.remove()
+
+    workers = [threading.Thread(target=worker, args=(seed,))
+               for seed in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return {
+        'scenario': scenario,
+        'attempts': threads * bookings,
+        'booked': len(booked),
+        'rejected': rejected[0],
+        'double_bookings': double_bookings(booked),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 2),
+        'booked_p50_ms': round(percentile(booked_latencies, 0.5) * 1000, 2),
+        'booked_p95_ms': round(percentile(booked_latencies, 0.95) * 1000, 2)
+    }
+
+
+def benchmark_booking_contention(room_id, threads, bookings, slots,
+                                 calendar_latency):
+    def calendar_only(start, end, create_event):
+        return create_event()
+
+    def with_holds(start, end, create_event):
+        return book_room(room_id, start, end, create_event)
+
+    clear = 'DELETE FROM booking_holds WHERE room_id = :room_id'
+    db_session.execute(clear, {'room_id': room_id})
+    db_session.commit()
+    try:
+        return [
+            run('calendar_only', calendar_only, threads, bookings, slots,
+                calendar_latency),
+            run('reservation_holds', with_holds, threads, bookings, slots,
+                calendar_latency)
+        ]
+    finally:
+        db_session.execute(clear, {'room_id': room_id})
+        db_session.commit()
+        db_session.remove()
+
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    arguments.add_argument('--room-id', type=int)
+    arguments.add_argument('--threads', type=int, default=16)
+    arguments.add_argument('--bookings', type=int, default=20)
+    arguments.add_argument('--slots', type=int, default=32)
+    arguments.add_argument('--calendar-latency', type=float, default=0.05)
+    options = arguments.parse_args()
+    room_id = options.room_id or db_session.query(RoomModel.id).filter_by(
+        state='active').order_by(RoomModel.id).limit(1).scalar()
+    print(json.dumps(benchmark_booking_contention(
+        room_id, options.threads, options.bookings, options.slots,
+        options.calendar_latency), indent=2))
@@ -0,0 +1,79 @@
+"""
+Measures how many tablet check-ins the API can record per second.
+
+Run it against a scratch database whose room has a device, e.g.
+    APP_SETTINGS=testing python -m benchmarks.checkin_throughput \
+        --calendar-id <room calendar id> --check-ins 2000 --workers 8
+
+Every worker checks into its own synthetic event occurrences, which are
+deleted again once the run finishes. The report is printed as JSON.
+"""
+import argparse
+import json
+import threading
+import time
+
+from api.events.models import Events as EventsModel
+from helpers.database import db_session
+from helpers.event_checkin.event_checkin import check_in_event
+
+EVENT_PREFIX = 'benchmark-checkin-'
+
+
+def run_worker(calendar_id, worker, check_ins, latencies):
+    try:
+        for occurrence in range(check_ins):
+            started = time.perf_counter()
+            check_in_event(
+                calendar_id=calendar_id,
+                event_id='{}{}-{}'.format(EVENT_PREFIX, worker, occurrence),
+                event_title='Check-in benchmark',
+                start_time='2019-01-01T09:00:00Z',
+                end_time='2019-01-01T09:30:00Z',
+                number_of_participants=1,
+                check_in_time='2019-01-01T09:00:00Z'
+            )
+            latencies.append(time.perf_counter() - started)
+    finally:
+        db_session.remove()
+
+
+def benchmark_check_ins(calendar_id, check_ins, workers):
+    latencies = []
+    per_worker = check_ins // workers
+    threads = [
+        threading.Thread(
+            target=run_worker,
+            args=(calendar_id, worker, per_worker, latencies))
+        for worker in range(workers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    EventsModel.query.filter(
+        EventsModel.event_id.like(EVENT_PREFIX + '%')
+    ).delete(synchronize_session=False)
+    db_session.commit()
+    latencies.sort()
+    return {
+        'scenario': 'check_in_throughput',
+        'workers': workers,
+        'check_ins': len(latencies),
+        'seconds': round(elapsed, 3),
+        'check_ins_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99)] * 1000, 2)
+    }
+
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument('--calendar-id', required=True)
+    arguments.add_argument('--check-ins', type=int, default=1000)
+    arguments.add_argument('--workers', type=int, default=4)
+    options = arguments.parse_args()
+    print(json.dumps(benchmark_check_ins(
+        options.calendar_id, options.check_ins, options.workers), indent=2))
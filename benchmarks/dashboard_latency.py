@@ -0,0 +1,76 @@
+"""
+Compares the latency of a dashboard operation whose top level fields
+wait on the Google Calendar API, resolved one after another and by the
+parallel field executor.
+
+Run it from the project root, e.g.
+    APP_SETTINGS=testing python -m benchmarks.dashboard_latency --fields 6
+
+Each field sleeps for --latency seconds in place of a Calendar request.
+The report is printed as JSON.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import graphene
+
+from app import create_app
+from helpers.graphql_view.executor import ParallelFieldExecutor
+
+
+def dashboard_schema(fields, latency):
+    def resolve(self, info):
+        time.sleep(latency)
+        return info.field_name
+
+    attributes = {
+        'field{}'.format(number): graphene.String(resolver=resolve)
+        for number in range(fields)
+    }
+    query = type('Dashboard', (graphene.ObjectType,), attributes)
+    operation = '{{ {} }}'.format(' '.join(attributes))
+    return graphene.Schema(query=query), operation, {
+        'Dashboard.' + name for name in attributes}
+
+
+def measure(scenario, schema, operation, executor, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        result = schema.execute(operation, executor=executor)
+        assert not result.errors, result.errors
+    elapsed = time.perf_counter() - started
+    return {
+        'scenario': scenario,
+        'requests': requests,
+        'ms_per_request': round(elapsed * 1000 / requests, 1)
+    }
+
+
+def benchmark_dashboard_latency(fields, latency, threads, requests):
+    schema, operation, parallel_fields = dashboard_schema(fields, latency)
+    pool = ThreadPoolExecutor(max_workers=threads)
+    app = create_app('testing')
+    try:
+        with app.test_request_context():
+            return [
+                measure('sequential', schema, operation, None, requests),
+                measure('parallel', schema, operation,
+                        ParallelFieldExecutor(pool, parallel_fields),
+                        requests)
+            ]
+    finally:
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument('--fields', type=int, default=6)
+    arguments.add_argument('--latency', type=float, default=0.15)
+    arguments.add_argument('--threads', type=int, default=8)
+    arguments.add_argument('--requests', type=int, default=10)
+    options = arguments.parse_args()
+    print(json.dumps(benchmark_dashboard_latency(
+        options.fields, options.latency, options.threads, options.requests),
+        indent=2))
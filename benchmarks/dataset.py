@@ -0,0 +1,279 @@
+"""
+Loads a deterministic synthetic dataset for the benchmarks with Postgres
+COPY: locations with their office structures and admins, rooms with a
+device each, events spread over several years, and room responses.
+
+Run it from the project root against a scratch database, e.g.
+    APP_SETTINGS=testing python -m benchmarks.dataset --reset \
+        --locations 5 --rooms 200 --events-per-room 10000 --years 3
+
+The same sizes and --seed always load the same rows. The row counts are
+printed as JSON.
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+import schema  # noqa: F401 registers every model on the metadata
+from helpers.database import Base, engine
+
+DatasetSize = namedtuple('DatasetSize', [
+    'locations', 'rooms', 'events_per_room', 'years', 'responses_per_room',
+    'seed'])
+
+# The dataset starts on the Monday of the first year, so that analytics
+# ranges and event pages are the same on every run
+FIRST_DAY = datetime(2017, 1, 2)
+COUNTRIES = ['Uganda', 'Kenya', 'Nigeria', 'Rwanda']
+TIME_ZONES = ['EAST_AFRICA_TIME', 'EAST_AFRICA_TIME', 'WEST_AFRICA_TIME',
+              'CENTRAL_AFRICA_TIME']
+ROLES = ['Admin', 'Super Admin', 'Default User']
+QUESTIONS = [
+    ('Rate the room', 'rate', None),
+    ('Missing items', 'check', ['marker pen', 'apple tv', 'duster']),
+    ('Suggestions', 'text_area', None),
+    ('Missing resources', 'missing_items', None),
+]
+LABELS = ['1st floor', '2nd floor', 'wing a', 'wing b', 'quiet']
+COPY_CHUNK_ROWS = 50000
+
+
+def admin_email(location_id):
+    return 'benchmark.admin{}@andela.com'.format(location_id)
+
+
+def calendar_id(room_id):
+    return 'benchmark-room-{}@resource.calendar.google.com'.format(room_id)
+
+
+def location_of(room_id, size):
+    return (room_id - 1) % size.locations + 1
+
+
+def timestamp(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def pg_array(values):
+    return '{' + ','.join('"{}"'.format(value) for value in values) + '}'
+
+
+def locations(size, choice):
+    for location_id in range(1, size.locations + 1):
+        yield (location_id, 'Location {}'.format(location_id),
+               'L{}'.format(location_id),
+               COUNTRIES[location_id % len(COUNTRIES)],
+               TIME_ZONES[location_id % len(TIME_ZONES)], 'active')
+
+
+def users(size, choice):
+    for location_id in range(1, size.locations + 1):
+        yield (location_id, admin_email(location_id),
+               'Location {}'.format(location_id),
+               'Benchmark Admin {}'.format(location_id), 'active')
+
+
+def rooms(size, choice):
+    for room_id in range(1, size.rooms + 1):
+        labels = choice.sample(LABELS, choice.randrange(3))
+        yield (room_id, 'Room {}'.format(room_id), 'meeting',
+               choice.choice([4, 6, 8, 10, 14, 20, 40]), pg_array(labels),
+               pg_array(label.lower() for label in labels),
+               calendar_id(room_id), location_of(room_id, size), 10,
+               'active', 'place-holder-id')
+
+
+def events(size, choice):
+    """
+    Events of every room between 08:00 and 18:00 on weekdays, 5% of
+    them cancelled and 40% checked into
+    """
+    days = size.years * 365
+    event_id = 0
+    for room_id in range(1, size.rooms + 1):
+        for number in range(size.events_per_room):
+            event_id += 1
+            day = FIRST_DAY + timedelta(days=choice.randrange(days))
+            day -= timedelta(days=max(day.weekday() - 4, 0))
+            start = day + timedelta(minutes=480 + 30 * choice.randrange(20))
+            end = start + timedelta(minutes=choice.choice([30, 60, 90]))
+            cancelled = choice.random() < 0.05
+            checked_in = not cancelled and choice.random() < 0.4
+            yield (
+                event_id, 'benchmark-{}-{}'.format(room_id, number), room_id,
+                'Meeting {}'.format(number), timestamp(start), timestamp(end),
+                checked_in, cancelled, 'active', choice.randrange(1, 12),
+                timestamp(start + timedelta(minutes=2))
+                if checked_in else None,
+                cancelled and choice.random() < 0.5, choice.random() < 0.1)
+
+
+def questions(size, choice):
+    end = FIRST_DAY + timedelta(days=size.years * 365)
+    for question_id, (title, question_type, options) in enumerate(
+            QUESTIONS, 1):
+        yield (question_id, title, question_type, title,
+               timestamp(FIRST_DAY), timestamp(end),
+               pg_array(options) if options else None, True, 'active')
+
+
+def responses(size, choice):
+    days = size.years * 365
+    response_id = 0
+    for room_id in range(1, size.rooms + 1):
+        for _ in range(size.responses_per_room):
+            response_id += 1
+            question_id = choice.randrange(1, len(QUESTIONS) + 1)
+            title, question_type, options = QUESTIONS[question_id - 1]
+            if question_type == 'rate':
+                response = [str(choice.randrange(1, 6))]
+            elif question_type == 'check':
+                response = choice.sample(options, choice.randrange(1, 3))
+            else:
+                response = ['Response {}'.format(response_id)]
+            yield (response_id, room_id, question_id, question_type,
+                   pg_array(response),
+                   FIRST_DAY + timedelta(minutes=choice.randrange(
+                       days * 24 * 60)),
+                   choice.random() < 0.3, 'active')
+
+
+def devices(size, choice):
+    last_seen = FIRST_DAY + timedelta(days=size.years * 365)
+    for room_id in range(1, size.rooms + 1):
+        yield (room_id, 'Tablet {}'.format(room_id), 'tablet', FIRST_DAY,
+               last_seen, 'Location {}'.format(location_of(room_id, size)),
+               room_id, 'active', 'online')
+
+
+def office_structures(size, choice):
+    """
+    A building of three floors with two wings each per location
+    """
+    structure_id = 0
+    for location_id in range(1, size.locations + 1):
+        building = str(uuid.UUID(int=choice.getrandbits(128)))
+        structure_id += 1
+        yield (structure_id, building, 1,
+               'Building {}'.format(location_id), None, None, 'Building',
+               location_id, 1, 'active')
+        for floor in range(1, 4):
+            floor_id = str(uuid.UUID(int=choice.getrandbits(128)))
+            structure_id += 1
+            yield (structure_id, floor_id, 2, 'Floor {}'.format(floor),
+                   building, 'Building {}'.format(location_id), 'Floor',
+                   location_id, floor, 'active')
+            for wing in range(1, 3):
+                structure_id += 1
+                yield (structure_id, str(uuid.UUID(
+                    int=choice.getrandbits(128))), 3,
+                    'Wing {}-{}'.format(floor, wing), floor_id,
+                    'Floor {}'.format(floor), 'Wing', location_id, wing,
+                    'active')
+
+
+# (table, columns, rows) in the order of their foreign keys
+TABLES = [
+    ('roles', ['id', 'role'],
+     lambda size, choice: enumerate(ROLES, 1)),
+    ('locations', ['id', 'name', 'abbreviation', 'country', 'time_zone',
+                   'state'], locations),
+    ('users', ['id', 'email', 'location', 'name', 'state'], users),
+    ('users_roles', ['user_id', 'role_id'],
+     lambda size, choice: ((user_id, 1)
+                           for user_id in range(1, size.locations + 1))),
+    ('rooms', ['id', 'name', 'room_type', 'capacity', 'room_labels',
+               'normalized_room_labels', 'calendar_id', 'location_id',
+               'cancellation_duration', 'state', 'structure_id'], rooms),
+    ('events', ['id', 'event_id', 'room_id', 'event_title', 'start_time',
+                'end_time', 'checked_in', 'cancelled', 'state',
+                'number_of_participants', 'check_in_time', 'auto_cancelled',
+                'app_booking'], events),
+    ('questions', ['id', 'question_title', 'question_type', 'question',
+                   'start_date', 'end_date', 'check_options', 'is_active',
+                   'state'], questions),
+    ('responses', ['id', 'room_id', 'question_id', 'question_type',
+                   'response', 'created_date', 'resolved', 'state'],
+     responses),
+    ('devices', ['id', 'name', 'device_type', 'date_added', 'last_seen',
+                 'location', 'room_id', 'state', 'health_status'], devices),
+    ('office_structures', ['id', 'structure_id', 'level', 'name',
+                           'parent_id', 'parent_title', 'tag', 'location_id',
+                           'position', 'state'], office_structures),
+]
+
+
+def copy_rows(cursor, table, columns, rows):
+    """
+    Streams the rows into the table with COPY, COPY_CHUNK_ROWS at a time
+    :returns the number of rows copied
+    """
+    statement = 'COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(
+        table, ', '.join(columns))
+    copied = 0
+    while True:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        chunk = 0
+        for row in rows:
+            writer.writerow(row)
+            chunk += 1
+            if chunk == COPY_CHUNK_ROWS:
+                break
+        if not chunk:
+            return copied
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+        copied += chunk
+
+
+def load_dataset(size, reset=False):
+    """
+    Loads the dataset of the size into the database of the engine
+    :params size: DatasetSize
+    :params reset: drop and recreate every table first
+    :returns the number of rows loaded per table
+    """
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    choice = random.Random(size.seed)
+    connection = engine.raw_connection()
+    counts = {}
+    try:
+        cursor = connection.cursor()
+        for table, columns, rows in TABLES:
+            counts[table] = copy_rows(
+                cursor, table, columns, iter(rows(size, choice)))
+            if table != 'users_roles':
+                cursor.execute(
+                    "SELECT setval('{0}_id_seq', "
+                    "(SELECT coalesce(max(id), 0) + 1 FROM {0}), false)"
+                    .format(table))
+        connection.commit()
+        cursor.execute('ANALYZE')
+        connection.commit()
+    finally:
+        connection.close()
+    return counts
+
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument('--locations', type=int, default=5)
+    arguments.add_argument('--rooms', type=int, default=50)
+    arguments.add_argument('--events-per-room', type=int, default=2000)
+    arguments.add_argument('--years', type=int, default=3)
+    arguments.add_argument('--responses-per-room', type=int, default=20)
+    arguments.add_argument('--seed', type=int, default=0)
+    arguments.add_argument('--reset', action='store_true')
+    options = arguments.parse_args()
+    print(json.dumps(load_dataset(DatasetSize(
+        options.locations, options.rooms, options.events_per_room,
+        options.years, options.responses_per_room, options.seed),
+        reset=options.reset), indent=2))
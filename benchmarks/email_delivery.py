@@ -0,0 +1,78 @@
+"""
+Compares sending cancellation emails over one SMTP connection per message
+with the pooled, batched delivery of the email worker.
+
+Run it from the project root, e.g.
+    APP_SETTINGS=testing python -m benchmarks.email_delivery --emails 500
+
+Messages go to a local SMTP sink. The report is printed as JSON.
+"""
+import argparse
+import json
+import time
+
+from flask_mail import Mail
+
+from app import create_app
+from benchmarks.smtp_sink import SMTPSink
+from helpers.email.email_setup import SendEmail, build_message, deliver_emails
+
+
+def cancellation_payloads(emails):
+    return [
+        SendEmail(
+            'Your room reservation was rejected',
+            ['attendee{}@andela.com'.format(number)],
+            'event_cancellation.html',
+            room_name='Entebbe',
+            event_title='Standup {}'.format(number),
+            event_reject_reason='after 10 minutes'
+        ).payload for number in range(emails)
+    ]
+
+
+def send_one_per_connection(payloads):
+    mail = Mail()
+    for payload in payloads:
+        mail.send(build_message(payload))
+
+
+def measure(scenario, send, payloads, sink):
+    connections = sink.connections
+    started = time.perf_counter()
+    send(payloads)
+    elapsed = time.perf_counter() - started
+    return {
+        'scenario': scenario,
+        'emails': len(payloads),
+        'smtp_connections': sink.connections - connections,
+        'seconds': round(elapsed, 3),
+        'emails_per_second': round(len(payloads) / elapsed, 1)
+    }
+
+
+def benchmark_email_delivery(emails):
+    sink = SMTPSink().start()
+    app = create_app('testing')
+    app.config.update(
+        MAIL_SERVER=sink.server_address[0], MAIL_PORT=sink.port,
+        MAIL_USE_TLS=False, MAIL_USERNAME=None, MAIL_SUPPRESS_SEND=False,
+        MAIL_DEFAULT_SENDER='converge@andela.com')
+    app.extensions['mail'] = Mail().init_mail(app.config)
+    payloads = cancellation_payloads(emails)
+    try:
+        with app.app_context():
+            return [
+                measure('connection_per_email', send_one_per_connection,
+                        payloads, sink),
+                measure('pooled_batch', deliver_emails, payloads, sink)
+            ]
+    finally:
+        sink.stop()
+
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument('--emails', type=int, default=500)
+    options = arguments.parse_args()
+    print(json.dumps(benchmark_email_delivery(options.emails), indent=2))
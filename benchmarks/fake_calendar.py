@@ -0,0 +1,166 @@
+"""
+Minimal Google Calendar API server answering the events.list requests of
+the calendar sync with deterministic events, for measuring the sync
+without calling Google.
+"""
+import json
+import re
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from apiclient.discovery import build_from_document
+
+from helpers.calendar.credentials import BoundedHttp
+
+EVENTS_PATH = re.compile(r'^/calendar/v3/calendars/([^/]+)/events$')
+FIRST_EVENT = datetime(2019, 1, 7, 8)
+STRING = {'type': 'string', 'location': 'query'}
+
+
+def discovery_document(root_url):
+    """
+    Returns the part of the Calendar API discovery document the sync uses
+    """
+    return {
+        'kind': 'discovery#restDescription',
+        'discoveryVersion': 'v1',
+        'id': 'calendar:v3',
+        'name': 'calendar',
+        'version': 'v3',
+        'rootUrl': root_url,
+        'servicePath': 'calendar/v3/',
+        'baseUrl': root_url + 'calendar/v3/',
+        'batchPath': 'batch/calendar/v3',
+        'parameters': {},
+        'schemas': {'Events': {'id': 'Events', 'type': 'object'}},
+        'resources': {'events': {'methods': {'list': {
+            'id': 'calendar.events.list',
+            'path': 'calendars/{calendarId}/events',
+            'httpMethod': 'GET',
+            'parameterOrder': ['calendarId'],
+            'response': {'$ref': 'Events'},
+            'parameters': {
+                'calendarId': {
+                    'type': 'string', 'location': 'path', 'required': True},
+                'timeMin': STRING,
+                'timeMax': STRING,
+                'singleEvents': {'type': 'boolean', 'location': 'query'},
+                'orderBy': STRING,
+                'syncToken': STRING,
+                'pageToken': STRING,
+            }
+        }}}}
+    }
+
+
+class FakeCalendarHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        match = EVENTS_PATH.match(url.path)
+        if not match:
+            self.send_error(404)
+            return
+        params = {key: values[0] for key, values in parse_qs(
+            url.query).items()}
+        body = json.dumps(self.server.events_page(
+            unquote(match.group(1)), params)).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeCalendar(ThreadingHTTPServer):
+    """
+    Serves events_per_calendar events per calendar in pages of
+    page_size. A sync token answers with changes_per_sync changes: half
+    of them updates of existing events, a quarter cancellations and a
+    quarter new events
+    :methods
+        start
+        stop
+        service
+        events_page
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, events_per_calendar, changes_per_sync=20,
+                 page_size=250, host='127.0.0.1', port=0):
+        super().__init__((host, port), FakeCalendarHandler)
+        self.events_per_calendar = events_per_calendar
+        self.changes_per_sync = changes_per_sync
+        self.page_size = page_size
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def root_url(self):
+        return 'http://{}:{}/'.format(*self.server_address)
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def service(self):
+        """
+        Returns a Calendar API client sending its requests to the server
+        """
+        return build_from_document(
+            discovery_document(self.root_url), http=BoundedHttp())
+
+    @staticmethod
+    def event(calendar_id, number, status='confirmed', summary=None):
+        start = FIRST_EVENT + timedelta(
+            days=number // 8, minutes=60 * (number % 8))
+        return {
+            'id': 'fake-{}-{}'.format(calendar_id.split('@')[0], number),
+            'status': status,
+            'summary': summary or 'Synced meeting {}'.format(number),
+            'start': {'dateTime': start.strftime('%Y-%m-%dT%H:%M:%SZ')},
+            'end': {'dateTime': (start + timedelta(minutes=45)).strftime(
+                '%Y-%m-%dT%H:%M:%SZ')},
+            'attendees': [{'email': 'attendee{}@andela.com'.format(
+                attendee)} for attendee in range(number % 5 + 1)],
+            'organizer': {'email': 'organizer@andela.com'},
+        }
+
+    def changes(self, calendar_id):
+        count = self.changes_per_sync
+        return [
+            self.event(calendar_id, number, summary='Moved meeting')
+            for number in range(count // 2)
+        ] + [
+            self.event(calendar_id, number, status='cancelled')
+            for number in range(count // 2, count * 3 // 4)
+        ] + [
+            self.event(calendar_id, self.events_per_calendar + number)
+            for number in range(count - count * 3 // 4)
+        ]
+
+    def events_page(self, calendar_id, params):
+        with self.lock:
+            self.requests += 1
+        if params.get('syncToken'):
+            return {'items': self.changes(calendar_id),
+                    'nextSyncToken': 'sync-2'}
+        start = int(params.get('pageToken') or 0)
+        end = min(start + self.page_size, self.events_per_calendar)
+        page = {'items': [self.event(calendar_id, number)
+                          for number in range(start, end)]}
+        if end < self.events_per_calendar:
+            page['nextPageToken'] = str(end)
+        else:
+            page['nextSyncToken'] = 'sync-1'
+        return page
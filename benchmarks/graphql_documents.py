@@ -0,0 +1,61 @@
+"""
+Measures the CPU time /mrm spends turning the query string of typical
+analytics and check-in operations into a validated document, with and
+without the document cache, and the request bytes Automatic Persisted
+Queries save.
+
+Run it from the project root, e.g.
+    APP_SETTINGS=testing python -m benchmarks.graphql_documents
+
+The report is printed as JSON.
+"""
+import argparse
+import json
+import time
+
+from graphql import Source, parse, validate
+
+from fixtures.analytics.query_all_analytics_fixtures import (
+    all_analytics_query
+)
+from fixtures.events.event_checkin_fixtures import event_checkin_mutation
+from helpers.graphql_view.document_cache import DocumentCache, query_hash
+from schema import schema
+
+OPERATIONS = {
+    'all_analytics': all_analytics_query,
+    'event_checkin': event_checkin_mutation,
+}
+
+
+def cpu_ms_per_request(prepare, requests):
+    started = time.process_time()
+    for _ in range(requests):
+        prepare()
+    return round((time.process_time() - started) * 1000 / requests, 4)
+
+
+def benchmark_graphql_documents(requests):
+    report = []
+    for name, query in OPERATIONS.items():
+        cache = DocumentCache()
+        cache.get(schema, query)
+        persisted_body = json.dumps({'extensions': {'persistedQuery': {
+            'version': 1, 'sha256Hash': query_hash(query)}}})
+        report.append({
+            'operation': name,
+            'parse_validate_ms': cpu_ms_per_request(
+                lambda: validate(schema, parse(Source(query))), requests),
+            'cached_ms': cpu_ms_per_request(
+                lambda: cache.get(schema, query), requests),
+            'query_bytes': len(json.dumps({'query': query})),
+            'persisted_query_bytes': len(persisted_body)
+        })
+    return report
+
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument('--requests', type=int, default=500)
+    options = arguments.parse_args()
+    print(json.dumps(benchmark_graphql_documents(options.requests), indent=2))
@@ -0,0 +1,174 @@
+"""
+Replays /mrm traffic recorded with TRAFFIC_RECORD_PATH against the app
+and reports the throughput, the p50/p95/p99 latency of every operation
+and the error rates.
+
+Run it from the project root, e.g.
+    APP_SETTINGS=testing python -m benchmarks.replay traffic.jsonl \
+        --concurrency 8 --rate 50
+    python -m benchmarks.replay traffic.jsonl --url http://localhost:8000 \
+        --token <token> --token <token>
+
+Without --url the requests go to an app created in this process. Every
+recorded user is given one of the --token values, the same one for all
+of their requests; without any, the admin of the first location of
+benchmarks.dataset is used. --rate 0 sends the requests as fast as the
+workers allow.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.suite import admin_token
+
+
+def load_traffic(path):
+    with open(path) as traffic:
+        return [json.loads(line) for line in traffic if line.strip()]
+
+
+def assign_tokens(records, tokens):
+    """
+    Maps the user pseudonyms of the records onto the tokens in turn
+    :returns {user: token}
+    """
+    users = sorted({record['user'] or '' for record in records})
+    return {user: tokens[number % len(tokens)]
+            for number, user in enumerate(users)}
+
+
+def percentile(timings, share):
+    return round(timings[min(int(len(timings) * share),
+                             len(timings) - 1)] * 1000, 2)
+
+
+class InProcessTarget:
+    """
+    Sends the requests to an app created in this process with a test
+    client per thread
+    """
+
+    def __init__(self):
+        from app import create_app
+        self.app = create_app('testing')
+        self.local = threading.local()
+
+    def post(self, body, token):
+        if not hasattr(self.local, 'client'):
+            self.local.client = self.app.test_client()
+        response = self.local.client.post(
+            '/mrm', data=json.dumps(body), content_type='application/json',
+            headers={'Authorization': 'Bearer ' + token})
+        return response.status_code, response.data
+
+
+class HttpTarget:
+    """
+    Sends the requests to a running app over a session per thread
+    """
+
+    def __init__(self, url):
+        self.url = url.rstrip('/') + '/mrm'
+        self.local = threading.local()
+
+    def post(self, body, token):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        response = self.local.session.post(
+            self.url, json=body, headers={'Authorization': 'Bearer ' + token})
+        return response.status_code, response.content
+
+
+def failed(status, data):
+    if status >= 400:
+        return True
+    try:
+        body = json.loads(data)
+    except ValueError:
+        return True
+    bodies = body if isinstance(body, list) else [body]
+    return any(isinstance(item, dict) and item.get('errors')
+               for item in bodies)
+
+
+def replay(records, target, tokens, concurrency, rate, loops=1):
+    """
+    Sends the recorded requests, loops times over, from concurrency
+    threads, starting at most rate of them a second
+    :returns the report as a dict
+    """
+    user_tokens = assign_tokens(records, tokens)
+    plan = records * loops
+    results = defaultdict(list)
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    def send(number, record):
+        if rate:
+            delay = started + number / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        sent = time.perf_counter()
+        try:
+            status, data = target.post(
+                record['body'], user_tokens[record['user'] or ''])
+            error = failed(status, data)
+        except requests.RequestException:
+            error = True
+        with lock:
+            results[record.get('operation') or 'none'].append(
+                (time.perf_counter() - sent, error))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(send, number, record)
+                       for number, record in enumerate(plan)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+    operations = {}
+    for operation, outcomes in sorted(results.items()):
+        timings = sorted(timing for timing, _ in outcomes)
+        errors = sum(error for _, error in outcomes)
+        operations[operation] = {
+            'requests': len(outcomes),
+            'errors': errors,
+            'error_rate': round(errors / len(outcomes), 4),
+            'p50_ms': percentile(timings, 0.5),
+            'p95_ms': percentile(timings, 0.95),
+            'p99_ms': percentile(timings, 0.99),
+        }
+    errors = sum(operation['errors'] for operation in operations.values())
+    return {
+        'requests': len(plan),
+        'concurrency': concurrency,
+        'rate': rate,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(plan) / elapsed, 1),
+        'error_rate': round(errors / len(plan), 4) if plan else 0,
+        'operations': operations
+    }
+
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument('traffic')
+    arguments.add_argument('--url')
+    arguments.add_argument('--token', action='append', dest='tokens')
+    arguments.add_argument('--concurrency', type=int, default=4)
+    arguments.add_argument('--rate', type=float, default=0)
+    arguments.add_argument('--loops', type=int, default=1)
+    arguments.add_argument('--output')
+    options = arguments.parse_args()
+    target = HttpTarget(options.url) if options.url else InProcessTarget()
+    report = replay(
+        load_traffic(options.traffic), target,
+        options.tokens or [admin_token()], options.concurrency,
+        options.rate, options.loops)
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,55 @@
+"""
+Times ranking the rooms of a location held in the room feature index,
+for locations of synthetic rooms with random capacities, resources and
+labels.
+
+Run it from the project root, e.g.
+    APP_SETTINGS=testing python -m benchmarks.room_recommendation
+
+The report is printed as JSON.
+"""
+import argparse
+import json
+import random
+import time
+
+from helpers.room.recommendation import RoomFeatures, rank_rooms
+
+RESOURCES = ['markers', 'tv', 'projector', 'whiteboard', 'speakerphone',
+             'webcam', 'flipchart', 'hdmi']
+LABELS = ['1st floor', '2nd floor', 'wing a', 'wing b', 'quiet', 'block-b']
+
+
+def synthetic_rooms(count, seed=0):
+    choice = random.Random(seed)
+    return [
+        RoomFeatures(
+            room_id, 'Room {}'.format(room_id), None,
+            choice.choice([4, 6, 8, 10, 14, 20, 40]),
+            frozenset(choice.sample(RESOURCES, choice.randrange(5))),
+            frozenset(choice.sample(LABELS, choice.randrange(3))))
+        for room_id in range(count)
+    ]
+
+
+def benchmark_room_recommendation(sizes, repeats):
+    report = []
+    for size in sizes:
+        rooms = synthetic_rooms(size)
+        booked = set(range(0, size, 3))
+        started = time.perf_counter()
+        for _ in range(repeats):
+            rank_rooms(rooms, 6, ['tv', 'markers'], ['quiet'], booked)
+        elapsed = (time.perf_counter() - started) / repeats
+        report.append({'rooms': size, 'ms_per_query': round(elapsed * 1000, 3)})
+    return report
+
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument('--sizes', type=int, nargs='+',
+                           default=[100, 1000, 10000])
+    arguments.add_argument('--repeats', type=int, default=100)
+    options = arguments.parse_args()
+    print(json.dumps(benchmark_room_recommendation(
+        options.sizes, options.repeats), indent=2))
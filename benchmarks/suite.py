@@ -0,0 +1,275 @@
+"""
+Runs the benchmark scenarios against a database loaded by
+benchmarks.dataset and writes their timings as JSON, so that commits can
+be compared.
+
+Run it from the project root, e.g.
+    APP_SETTINGS=testing python -m benchmarks.dataset --reset
+    APP_SETTINGS=testing python -m benchmarks.suite --output before.json
+    APP_SETTINGS=testing python -m benchmarks.suite --output after.json
+    APP_SETTINGS=testing python -m benchmarks.suite \
+        --compare before.json after.json
+
+Analytics, event and room listings go through /mrm with the token of the
+admin of the first location. The calendar sync talks to a local fake
+Calendar API server.
+"""
+import argparse
+import json
+import subprocess
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+import jwt
+
+from api.events.models import Events as EventsModel
+from api.room.models import Room as RoomModel
+from app import create_app
+from benchmarks.checkin_throughput import benchmark_check_ins
+from benchmarks.dataset import admin_email, calendar_id
+from benchmarks.fake_calendar import FakeCalendar
+from helpers.calendar.events import CalendarEvents
+from helpers.database import db_session
+
+ANALYTICS_QUERY = '''
+query {{
+    allAnalytics(startDate: "{}", endDate: "{}", locationId: 1) {{
+        checkinsPercentage
+        cancellationsPercentage
+        bookings
+        analytics {{
+            roomName
+            numberOfBookings
+            checkins
+            events {{ durationInMinutes }}
+        }}
+        bookingsCount {{ totalBookings period }}
+    }}
+}}
+'''
+EVENTS_QUERY = '''
+query {{
+    allEvents(startDate: "{}", endDate: "{}", page: {}, perPage: {}) {{
+        events {{ eventTitle startTime roomId }}
+        hasNext
+        pages
+        queryTotal
+    }}
+}}
+'''
+ROOMS_QUERY = '''
+query {{
+    allRooms(page: {}, perPage: {}, withTotal: true) {{
+        rooms {{ name capacity roomLabels }}
+        pages
+        queryTotal
+    }}
+}}
+'''
+RESPONSES_QUERY = '''
+query {
+    allRoomResponses {
+        responses {
+            roomName
+            totalResponses
+        }
+    }
+}
+'''
+ANALYTICS_RANGES = {
+    'day': ('Mar 06 2017', 'Mar 06 2017'),
+    'week': ('Mar 06 2017', 'Mar 12 2017'),
+    'month': ('Mar 01 2017', 'Mar 31 2017'),
+    'quarter': ('Jan 01 2017', 'Mar 31 2017'),
+}
+
+
+def admin_token(location_id=1):
+    token = jwt.encode({'UserInfo': {
+        'email': admin_email(location_id),
+        'name': 'Benchmark Admin {}'.format(location_id),
+        'picture': 'https://www.andela.com/benchmark'
+    }}, 'benchmark')
+    return token.decode() if isinstance(token, bytes) else token
+
+
+def summarise(scenario, variant, timings, **extra):
+    timings = sorted(timings)
+    return dict({
+        'scenario': scenario,
+        'variant': variant,
+        'runs': len(timings),
+        'mean_ms': round(sum(timings) * 1000 / len(timings), 2),
+        'p50_ms': round(timings[len(timings) // 2] * 1000, 2),
+        'p95_ms': round(timings[int(len(timings) * 0.95)] * 1000, 2),
+    }, **extra)
+
+
+def time_operation(client, query, repeats):
+    """
+    Posts the query to /mrm repeats times
+    :returns the duration of every request
+    """
+    headers = {'Authorization': 'Bearer ' + admin_token()}
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        response = client.post(
+            '/mrm', data=json.dumps({'query': query}),
+            content_type='application/json', headers=headers)
+        timings.append(time.perf_counter() - started)
+        body = json.loads(response.data)
+        if body.get('errors'):
+            raise RuntimeError('{} failed: {}'.format(query, body['errors']))
+    return timings
+
+
+def analytics_scenario(client, options):
+    return [
+        summarise('all_analytics', period, time_operation(
+            client, ANALYTICS_QUERY.format(*dates), options.repeats))
+        for period, dates in ANALYTICS_RANGES.items()
+    ]
+
+
+def events_scenario(client, options):
+    week = ANALYTICS_RANGES['week']
+    return [
+        summarise('all_events', 'week_page_{}'.format(page), time_operation(
+            client, EVENTS_QUERY.format(week[0], week[1], page, 50),
+            options.repeats))
+        for page in (1, 10)
+    ]
+
+
+def rooms_scenario(client, options):
+    return [
+        summarise('all_rooms', 'page_{}'.format(page), time_operation(
+            client, ROOMS_QUERY.format(page, 20), options.repeats))
+        for page in (1, 2)
+    ]
+
+
+def responses_scenario(client, options):
+    return [summarise('all_room_responses', 'all', time_operation(
+        client, RESPONSES_QUERY, options.repeats))]
+
+
+def sync_scenario(client, options):
+    """
+    Syncs the events of options.sync_rooms rooms from the fake Calendar
+    API, then their changes with the sync tokens, and removes them again
+    """
+    calendar = FakeCalendar(options.sync_events).start()
+    rooms = RoomModel.query.filter(RoomModel.calendar_id.in_([
+        calendar_id(room_id) for room_id in range(1, options.sync_rooms + 1)
+    ])).order_by(RoomModel.id).all()
+    report = []
+    try:
+        with patch('helpers.calendar.credentials.build_calendar_service',
+                   calendar.service):
+            for variant, events in (
+                    ('full', options.sync_events),
+                    ('incremental', calendar.changes_per_sync)):
+                timings = []
+                for room in rooms:
+                    started = time.perf_counter()
+                    CalendarEvents().sync_single_room_events(room)
+                    timings.append(time.perf_counter() - started)
+                report.append(summarise(
+                    'calendar_sync', variant, timings,
+                    events_per_second=round(
+                        events * len(rooms) / sum(timings), 1)))
+    finally:
+        calendar.stop()
+        EventsModel.query.filter(
+            EventsModel.event_id.like('fake-%')
+        ).delete(synchronize_session=False)
+        for room in rooms:
+            room.next_sync_token = None
+        db_session.commit()
+    return report
+
+
+def check_in_scenario(client, options):
+    return [dict(benchmark_check_ins(
+        calendar_id(1), options.check_ins, options.workers),
+        variant='{}_workers'.format(options.workers))]
+
+
+SCENARIOS = {
+    'analytics': analytics_scenario,
+    'events': events_scenario,
+    'rooms': rooms_scenario,
+    'responses': responses_scenario,
+    'sync': sync_scenario,
+    'check_in': check_in_scenario,
+}
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD']).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(options):
+    app = create_app('testing')
+    client = app.test_client()
+    results = []
+    with app.app_context():
+        for name in options.scenarios:
+            results.extend(SCENARIOS[name](client, options))
+            db_session.remove()
+    return {
+        'commit': current_commit(),
+        'created': datetime.utcnow().isoformat() + 'Z',
+        'results': results
+    }
+
+
+def compare(before, after):
+    """
+    Lists the change of the median timing of every scenario variant
+    """
+    medians = {
+        (result['scenario'], result['variant']): result['p50_ms']
+        for result in before['results'] if 'p50_ms' in result
+    }
+    return [{
+        'scenario': result['scenario'],
+        'variant': result['variant'],
+        'before_p50_ms': medians[(result['scenario'], result['variant'])],
+        'after_p50_ms': result['p50_ms'],
+        'change_percent': round(100 * (
+            result['p50_ms'] / medians[(result['scenario'], result['variant'])]
+            - 1), 1)
+    } for result in after['results']
+        if (result.get('scenario'), result.get('variant')) in medians]
+
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument('--scenarios', nargs='+', choices=SCENARIOS,
+                           default=list(SCENARIOS))
+    arguments.add_argument('--repeats', type=int, default=5)
+    arguments.add_argument('--sync-rooms', type=int, default=5)
+    arguments.add_argument('--sync-events', type=int, default=500)
+    arguments.add_argument('--check-ins', type=int, default=400)
+    arguments.add_argument('--workers', type=int, default=4)
+    arguments.add_argument('--output')
+    arguments.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    options = arguments.parse_args()
+    if options.compare:
+        with open(options.compare[0]) as before, \
+                open(options.compare[1]) as after:
+            report = compare(json.load(before), json.load(after))
+    else:
+        report = run_suite(options)
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    print(json.dumps(report, indent=2))
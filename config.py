@@ -1,4 +1,6 @@
+import json
 import os
+from datetime import timedelta
 from celery.schedules import crontab
 basedir = os.path.abspath(os.path.dirname(__file__))
 
@@ -13,18 +15,152 @@ class Config:
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     DOMAIN_NAME = os.getenv('DOMAIN_NAME')
+    # Messages sent over one SMTP connection, and retries of a failed
+    # connection with a backoff doubling from MAIL_RETRY_BACKOFF seconds
+    MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE') or 100)
+    MAIL_SEND_RETRIES = int(os.getenv('MAIL_SEND_RETRIES') or 3)
+    MAIL_RETRY_BACKOFF = float(os.getenv('MAIL_RETRY_BACKOFF') or 1)
     # mrm_push url
     MRM_PUSH_URL = os.getenv("MRM_PUSH_URL")
+    # Seconds before a push service call times out, retries of failed
+    # calls with a backoff doubling from PUSH_SERVICE_BACKOFF seconds and
+    # channel changes sent per reconciliation request
+    PUSH_SERVICE_TIMEOUT = float(os.getenv('PUSH_SERVICE_TIMEOUT') or 5)
+    PUSH_SERVICE_RETRIES = int(os.getenv('PUSH_SERVICE_RETRIES') or 3)
+    PUSH_SERVICE_BACKOFF = float(os.getenv('PUSH_SERVICE_BACKOFF') or 0.5)
+    PUSH_SERVICE_BATCH_SIZE = int(os.getenv('PUSH_SERVICE_BATCH_SIZE') or 100)
+    # Periodically reconcile the push service channels, a push service
+    # without GET and POST /channels is reported once and left alone
+    PUSH_CHANNEL_RECONCILIATION = os.getenv(
+        'PUSH_CHANNEL_RECONCILIATION', 'true').lower() == 'true'
 
     # Celery configuration
     CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL')
     CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND')
-    CELERY_IMPORTS = ["services.data_deletion.clean_archived_data"]
+    CELERY_IMPORTS = [
+        "services.data_deletion.clean_archived_data",
+        "services.device_health.record_device_health",
+        "services.room_cancelation.cancel_due_events",
+        "helpers.room.subscriber"
+    ]
+    # Comma separated URLs of read replicas of the database. Reads of
+    # GraphQL queries and other read only work go to them in turn, and to
+    # the primary while none can be reached within
+    # DB_REPLICA_CONNECT_TIMEOUT seconds. A replica that could not be
+    # reached is retried after DB_REPLICA_RETRY_SECONDS. Users read from
+    # the primary for READ_YOUR_WRITES_SECONDS after a mutation
+    DATABASE_REPLICA_URLS = [
+        url.strip() for url in
+        (os.getenv('DATABASE_REPLICA_URLS') or '').split(',') if url.strip()]
+    DB_REPLICA_CONNECT_TIMEOUT = int(
+        os.getenv('DB_REPLICA_CONNECT_TIMEOUT') or 2)
+    DB_REPLICA_RETRY_SECONDS = int(os.getenv('DB_REPLICA_RETRY_SECONDS') or 30)
+    READ_YOUR_WRITES_SECONDS = int(
+        os.getenv('READ_YOUR_WRITES_SECONDS') or 10)
+    # Connection pool of the database engine shared by the app, the Celery
+    # workers and the services: its size and overflow, seconds to wait for
+    # a connection and after which connections are replaced, and whether
+    # connections are checked before use
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW') or 10)
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT') or 10)
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE') or 1800)
+    DB_POOL_PRE_PING = os.getenv(
+        'DB_POOL_PRE_PING', 'true').lower() == 'true'
+    # Milliseconds after which Postgres cancels a statement, or ends a
+    # session idle in a transaction, 0 for never. Top level GraphQL fields
+    # can be given timeouts of their own, given as a JSON object, e.g.
+    # {"allAnalytics": 15000}, an operation taking the smallest timeout
+    # of its fields, and the data deletion services run with
+    # DB_MAINTENANCE_STATEMENT_TIMEOUT
+    DB_STATEMENT_TIMEOUT = int(os.getenv('DB_STATEMENT_TIMEOUT') or 30000)
+    DB_IDLE_IN_TRANSACTION_TIMEOUT = int(
+        os.getenv('DB_IDLE_IN_TRANSACTION_TIMEOUT') or 60000)
+    DB_OPERATION_STATEMENT_TIMEOUTS = json.loads(
+        os.getenv('DB_OPERATION_STATEMENT_TIMEOUTS') or '{}')
+    DB_MAINTENANCE_STATEMENT_TIMEOUT = int(
+        os.getenv('DB_MAINTENANCE_STATEMENT_TIMEOUT') or 0)
+    # Redis shared by the API workers, e.g. for the device activity buffer
+    REDIS_URL = os.getenv('REDIS_URL')
+    # Seconds between writes of buffered device heartbeats to the database
+    DEVICE_ACTIVITY_FLUSH_INTERVAL = int(
+        os.getenv('DEVICE_ACTIVITY_FLUSH_INTERVAL') or 5)
+    # Minutes without a heartbeat after which a device is stale or offline
+    DEVICE_STALE_AFTER = int(os.getenv('DEVICE_STALE_AFTER') or 15)
+    DEVICE_OFFLINE_AFTER = int(os.getenv('DEVICE_OFFLINE_AFTER') or 60)
+    # Seconds a room stays held while its booking is written to the calendar
+    BOOKING_HOLD_SECONDS = int(os.getenv('BOOKING_HOLD_SECONDS') or 30)
+    # Depth and cost limits of GraphQL operations per role, and the cost
+    # from which an operation is charged to the token's budget of rate
+    # cost points per QUERY_COST_WINDOW seconds. Requests without a known
+    # user get the Default User limits
+    QUERY_COST_LIMITS = {
+        'Default User': {
+            'depth': 8, 'cost': 2000, 'expensive': 200, 'rate': 2000},
+        'Admin': {
+            'depth': 10, 'cost': 10000, 'expensive': 500, 'rate': 20000},
+        'Super Admin': {
+            'depth': 12, 'cost': 20000, 'expensive': 1000, 'rate': 50000},
+    }
+    QUERY_COST_WINDOW = int(os.getenv('QUERY_COST_WINDOW') or 60)
+    # Items assumed for list fields without a page size argument
+    QUERY_DEFAULT_LIST_SIZE = int(os.getenv('QUERY_DEFAULT_LIST_SIZE') or 10)
+    # Parsed GraphQL documents cached per worker, seconds for which the
+    # queries of Automatic Persisted Queries are kept in Redis and the
+    # longest query in characters that can be persisted
+    GRAPHQL_DOCUMENT_CACHE_SIZE = int(
+        os.getenv('GRAPHQL_DOCUMENT_CACHE_SIZE') or 500)
+    PERSISTED_QUERY_TTL = int(
+        os.getenv('PERSISTED_QUERY_TTL') or 30 * 24 * 60 * 60)
+    PERSISTED_QUERY_MAX_SIZE = int(
+        os.getenv('PERSISTED_QUERY_MAX_SIZE') or 10000)
+    # Resolve the analytics and Google Calendar backed top level fields of
+    # an operation concurrently on a pool of GRAPHQL_EXECUTOR_THREADS
+    GRAPHQL_PARALLEL_EXECUTION = os.getenv(
+        'GRAPHQL_PARALLEL_EXECUTION', 'false').lower() == 'true'
+    GRAPHQL_EXECUTOR_THREADS = int(os.getenv('GRAPHQL_EXECUTOR_THREADS') or 8)
+    # Operations a batched /mrm request may hold
+    GRAPHQL_MAX_BATCH_SIZE = int(os.getenv('GRAPHQL_MAX_BATCH_SIZE') or 20)
+    # /mrm requests taking this many seconds are logged with their
+    # SLOW_REQUEST_TOP_QUERIES slowest SQL queries
+    SLOW_REQUEST_SECONDS = float(os.getenv('SLOW_REQUEST_SECONDS') or 1)
+    SLOW_REQUEST_TOP_QUERIES = int(os.getenv('SLOW_REQUEST_TOP_QUERIES') or 5)
+    # JSONL file /mrm requests are recorded to for replaying them with
+    # benchmarks.replay, anonymised. Only TRAFFIC_RECORD_SAMPLE_RATE of
+    # them are kept. Unset disables the recording. User pseudonyms are
+    # keyed with TRAFFIC_RECORD_SECRET, SECRET_KEY when it is unset
+    TRAFFIC_RECORD_PATH = os.getenv('TRAFFIC_RECORD_PATH')
+    TRAFFIC_RECORD_SECRET = os.getenv('TRAFFIC_RECORD_SECRET')
+    TRAFFIC_RECORD_SAMPLE_RATE = float(
+        os.getenv('TRAFFIC_RECORD_SAMPLE_RATE') or 1)
+    # Seconds between the stack samples of /mrm requests a Super Admin
+    # profiles, and seconds their profiles are kept for /profiles
+    PROFILE_SAMPLE_INTERVAL = float(
+        os.getenv('PROFILE_SAMPLE_INTERVAL') or 0.005)
+    PROFILE_TTL = int(os.getenv('PROFILE_TTL') or 24 * 60 * 60)
+    # Google Calendar API requests a worker may have in flight at once
+    GOOGLE_API_MAX_CONCURRENCY = int(
+        os.getenv('GOOGLE_API_MAX_CONCURRENCY') or 4)
+    # Seconds after which the room recommendation index reloads a location
+    RECOMMENDATION_INDEX_TTL = int(
+        os.getenv('RECOMMENDATION_INDEX_TTL') or 300)
     CELERYBEAT_SCHEDULE = {
         'clean_archived_data': {
             'task': 'clean_archived_data.delete_archived_data',
             'schedule': crontab(hour=23, minute=00)
         },
+        'record_device_health': {
+            'task': 'device_health.record_device_health',
+            'schedule': crontab()
+        },
+        'cancel_due_events': {
+            'task': 'event_deadlines.cancel_due_events',
+            'schedule': timedelta(seconds=30)
+        },
+        'reconcile_push_channels': {
+            'task': 'reconcile-push-channels',
+            'schedule': crontab(minute='*/10')
+        },
     }
 
     @staticmethod
@@ -40,6 +176,9 @@ class DevelopmentConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
+    REDIS_URL = None
+    DATABASE_REPLICA_URLS = []
+    DEVICE_ACTIVITY_FLUSH_INTERVAL = 0
     SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'test-db.sqlite')
 
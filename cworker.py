@@ -1,7 +1,9 @@
 import os
 
 from celery import Celery
+from celery.signals import worker_process_init
 from app import create_app
+from helpers.database import engine
 
 
 app = create_app(os.getenv('APP_SETTINGS') or 'default')
@@ -24,3 +26,12 @@ def make_celery(app):
 
 
 celery = make_celery(app)
+
+
+@worker_process_init.connect
+def reset_connection_pool(**kwargs):
+    """
+    Gives every forked worker process connections of its own instead of
+    those of the pool inherited from the parent
+    """
+    engine.dispose()
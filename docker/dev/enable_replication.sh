@@ -0,0 +1,9 @@
+#!/bin/bash
+# Lets the replica stream the WAL of the database. Runs when the database
+# is first initialised; for an existing converge_db, append the line to
+# its pg_hba.conf and restart the database
+function enable_replication {
+    echo "host replication all all md5" >> "$PGDATA/pg_hba.conf"
+}
+
+enable_replication $@
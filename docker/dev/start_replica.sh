@@ -0,0 +1,18 @@
+#!/bin/bash
+# Starts a hot standby of the database service, copying it with
+# pg_basebackup the first time
+function start_replica {
+    until pg_isready -h database -U postgres; do
+        sleep 1
+    done
+    if [ ! -s "$PGDATA/PG_VERSION" ]; then
+        mkdir -p "$PGDATA"
+        chown postgres "$PGDATA"
+        chmod 700 "$PGDATA"
+        gosu postgres pg_basebackup -h database -U postgres -D "$PGDATA" \
+            -X stream -R
+    fi
+    exec docker-entrypoint.sh postgres
+}
+
+start_replica $@
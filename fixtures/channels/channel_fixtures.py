@@ -29,3 +29,35 @@ channels_response = {
         }
     }
 }
+
+channels_since_version_query = '''
+ query {
+  allChannels(sinceVersion: 2) {
+    channels {
+      calendarId
+      firebaseToken
+    }
+    removedChannels
+    version
+  }
+}
+'''
+
+channels_since_version_response = {
+    "data": {
+        "allChannels": {
+            "channels": [
+                {
+                    "calendarId": "andela.com_3630363835303531343031"
+                    "@resource.calendar.google.com",
+                    "firebaseToken": "new-token"
+                }
+            ],
+            "removedChannels": [
+                "andela.com_3730313534393638323232"
+                "@resource.calendar.google.com"
+            ],
+            "version": 4
+        }
+    }
+}
@@ -0,0 +1,21 @@
+rooms_query = '''
+query {
+    allRooms {
+        rooms {
+            name
+        }
+    }
+}
+'''
+
+create_tag_mutation = '''
+mutation {
+    createTag(name: "Replicated", color: "blue", description: "Block") {
+        tag {
+            name
+        }
+    }
+}
+'''
+
+unreachable_replica_url = 'postgresql://postgres@127.0.0.1:1/converge'
@@ -293,3 +293,53 @@ search_device_by_name_expected_response = {
         }
     }
 devices_query_response = b'{"data":{"createDevice":{"device":{"name":"Apple tablet","location":"Kampala","deviceType":"External Display"}}}}'  # noqaE501
+
+device_health_summary_query = '''
+    query{
+        deviceHealthSummary(locationId: 1){
+            online
+            stale
+            offline
+            unhealthyDevices{
+                id
+                name
+                healthStatus
+            }
+        }
+    }
+'''
+
+device_health_summary_response = {
+    'data': {
+        'deviceHealthSummary': {
+            'online': 0,
+            'stale': 0,
+            'offline': 1,
+            'unhealthyDevices': [{
+                'id': '1',
+                'name': 'Samsung',
+                'healthStatus': 'DeviceHealthType.offline'
+                }]
+            }
+        }
+    }
+
+device_health_summary_recovered_response = {
+    'data': {
+        'deviceHealthSummary': {
+            'online': 1,
+            'stale': 0,
+            'offline': 0,
+            'unhealthyDevices': []
+            }
+        }
+    }
+
+device_health_summary_invalid_location_query = '''
+    query{
+        deviceHealthSummary(locationId: 100){
+            online
+            offline
+        }
+    }
+'''
@@ -6,7 +6,7 @@ book_event_mutation = '''mutation {
         duration:60
         attendees: "adafia.samuel@gmail.com, qanda8@gmail.com",
         timeZone: "Africa/Kigali",
-        room:"Yankara"
+        room:"Entebbe"
     ){
             response
         }
@@ -21,7 +21,7 @@ book_event_mutation_no_title = '''mutation {
         duration:60
         attendees: "adafia.samuel@gmail.com, qanda8@gmail.com",
         timeZone: "Africa/Kigali",
-        room:"Yankara"
+        room:"Entebbe"
     ){
             response
         }
@@ -51,7 +51,7 @@ book_event_mutation_no_start_date = '''mutation {
         duration:60
         attendees: "adafia.samuel@gmail.com, qanda8@gmail.com",
         timeZone: "Africa/Kigali",
-        room:"Yankara"
+        room:"Entebbe"
     ){
             response
         }
@@ -66,7 +66,7 @@ book_event_mutation_no_start_time = '''mutation {
         duration:60
         attendees: "adafia.samuel@gmail.com, qanda8@gmail.com",
         timeZone: "Africa/Kigali",
-        room:"Yankara"
+        room:"Entebbe"
     ){
             response
         }
@@ -81,7 +81,7 @@ book_event_mutation_no_time_Zone = '''mutation {
         duration:60
         attendees: "adafia.samuel@gmail.com, qanda8@gmail.com",
         timeZone: "",
-        room:"Yankara"
+        room:"Entebbe"
     ){
             response
         }
@@ -0,0 +1,15 @@
+batch_size_response = {
+    "errors": [
+        {
+            "message": "Batches must hold 1 to 2 operations."
+        }
+    ]
+}
+
+invalid_batch_response = {
+    "errors": [
+        {
+            "message": "POST body sent invalid JSON."
+        }
+    ]
+}
@@ -0,0 +1,59 @@
+dashboard_query = '''
+query {
+    twoDays: allAnalytics(
+        startDate: "jul 11 2018", endDate: "jul 12 2018", locationId: 1
+    ) {
+        bookings
+        analytics {
+            roomName
+            numberOfBookings
+        }
+    }
+    month: allAnalytics(
+        startDate: "jul 1 2018", endDate: "jul 31 2018", locationId: 1
+    ) {
+        bookings
+        checkinsPercentage
+    }
+    allAvailableRooms(
+        startDate: "Jul 11 2018",
+        startTime: "09:00:00",
+        endDate: "Jul 11 2018",
+        endTime: "10:00:00",
+        timeZone: "UTC"
+    ) {
+        availableRoom {
+            name
+        }
+    }
+}
+'''
+
+dashboard_response = {
+    "data": {
+        "twoDays": {
+            "bookings": 1,
+            "analytics": [
+                {
+                    "roomName": "Entebbe",
+                    "numberOfBookings": 1
+                },
+                {
+                    "roomName": "Tana",
+                    "numberOfBookings": 0
+                }
+            ]
+        },
+        "month": {
+            "bookings": 1,
+            "checkinsPercentage": 0.0
+        },
+        "allAvailableRooms": {
+            "availableRoom": [
+                {
+                    "name": "Tana"
+                }
+            ]
+        }
+    }
+}
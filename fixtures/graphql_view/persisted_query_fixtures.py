@@ -0,0 +1,46 @@
+import hashlib
+
+rooms_query = '''
+query {
+    allRooms {
+        rooms {
+            name
+        }
+    }
+}
+'''
+
+rooms_query_hash = hashlib.sha256(rooms_query.encode('utf-8')).hexdigest()
+
+rooms_response = {
+    "data": {
+        "allRooms": {
+            "rooms": [
+                {
+                    "name": "Entebbe"
+                },
+                {
+                    "name": "Tana"
+                }
+            ]
+        }
+    }
+}
+
+invalid_field_query = '''
+query {
+    allRooms {
+        rooms {
+            colour
+        }
+    }
+}
+'''
+
+persisted_query_not_found_response = {
+    "errors": [
+        {
+            "message": "PersistedQueryNotFound"
+        }
+    ]
+}
@@ -0,0 +1,80 @@
+nested_rooms_query = '''
+query {
+    allRooms(perPage: 20) {
+        rooms {
+            events {
+                room {
+                    events {
+                        room {
+                            name
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+'''
+
+deep_rooms_query = '''
+query {
+    allRooms {
+        rooms {
+            events {
+                room {
+                    events {
+                        room {
+                            events {
+                                room {
+                                    events {
+                                        room {
+                                            name
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+'''
+
+year_long_analytics_query = '''
+query {
+    allAnalytics(startDate: "Jan 1 2018", endDate: "Dec 31 2018") {
+        analytics {
+            roomName
+        }
+    }
+}
+'''
+
+rooms_fragment_query = '''
+query {
+    allRooms(perPage: 5) {
+        ...roomPage
+    }
+}
+
+fragment roomPage on PaginatedRooms {
+    rooms {
+        name
+        events {
+            eventTitle
+        }
+    }
+}
+'''
+
+paged_rooms_query = '''
+query ($perPage: Int) {
+    allRooms(perPage: $perPage) {
+        rooms {
+            name
+        }
+    }
+}
+'''
@@ -63,3 +63,35 @@ query {
     }
 }
 '''
+
+available_rooms_check_calendar_query = '''
+query {
+  allAvailableRooms(
+              startDate: "Nov 07 2018",
+              startTime: "08:00:00",
+              endDate: "Nov 11 2018",
+              endTime: "09:45:00",
+              timeZone: "Africa/Kampala",
+              checkCalendar: true
+  ){
+   availableRoom{
+      id
+      name
+    }
+    }
+}
+'''
+
+available_rooms_response = {
+    "data": {
+        "allAvailableRooms": {
+            "availableRoom": [
+                {
+                    "id": "andela.com_3730313534393638323232"
+                    "@resource.calendar.google.com",
+                    "name": "Tana"
+                }
+            ]
+        }
+    }
+}
@@ -251,3 +251,111 @@ filter_rooms_by_location_resource = '''query {
     }
 }
     '''
+
+filter_rooms_by_any_room_label = '''query {
+  allRooms(roomLabels:"wing a, WING B", labelMatch: ANY){
+   rooms{
+      name
+      roomLabels
+        }
+    }
+}
+    '''
+
+filter_rooms_by_any_room_label_response = {
+    "data": {
+        "allRooms": {
+            "rooms": [
+                {
+                    "name": "Entebbe",
+                    "roomLabels": ["1st Floor", "Wing A"]
+                },
+                {
+                    "name": "Tana",
+                    "roomLabels": ["1st Floor", "Wing B"]
+                }
+            ]
+        }
+    }
+}
+
+filter_rooms_by_partial_room_label = '''query {
+  allRooms(roomLabels:"Wing"){
+   rooms{
+      name
+      roomLabels
+        }
+    }
+}
+    '''
+
+filter_rooms_by_combined_arguments = '''query {
+  allRooms(location:"Kampala", minCapacity:5, maxCapacity:10,
+    tags:"block-b", devices:"samsung", roomLabels:"Wing A"){
+   rooms{
+      name
+      capacity
+        }
+    }
+}
+    '''
+
+filter_rooms_by_combined_arguments_response = {
+    "data": {
+        "allRooms": {
+            "rooms": [
+                {
+                    "name": "Entebbe",
+                    "capacity": 6
+                }
+            ]
+        }
+    }
+}
+
+filter_rooms_by_structure = '''query {
+  allRooms(structureId:"b05fc5f2-b4aa-4f48-a8fb-30bdcc3fc968"){
+   rooms{
+      name
+        }
+    }
+}
+    '''
+
+filter_rooms_by_structure_response = {
+    "data": {
+        "allRooms": {
+            "rooms": [
+                {
+                    "name": "Entebbe"
+                }
+            ]
+        }
+    }
+}
+
+filter_rooms_by_office = '''query {
+  allRooms(office:"Epic"){
+   rooms{
+      name
+        }
+    }
+}
+    '''
+
+filter_rooms_by_unknown_office = '''query {
+  allRooms(office:"Nowhere"){
+   rooms{
+      name
+        }
+    }
+}
+    '''
+
+filter_rooms_by_unknown_office_response = {
+    "data": {
+        "allRooms": {
+            "rooms": []
+        }
+    }
+}
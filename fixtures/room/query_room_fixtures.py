@@ -47,6 +47,36 @@ paginated_rooms_response = {
     }
 }
 
+paginated_rooms_without_total_query = '''
+ query {
+  allRooms(page:1, perPage:1, withTotal:false){
+   rooms{
+      name
+   }
+   hasNext
+   hasPrevious
+   pages
+   queryTotal
+}
+}
+'''
+
+paginated_rooms_without_total_response = {
+    "data": {
+        "allRooms": {
+            "rooms": [
+                {
+                    "name": "Entebbe"
+                }
+            ],
+            "hasNext": True,
+            "hasPrevious": False,
+            "pages": None,
+            "queryTotal": None
+        }
+    }
+}
+
 room_query_by_id = '''
 {
     getRoomById(roomId: 1){
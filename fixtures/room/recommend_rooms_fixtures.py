@@ -0,0 +1,137 @@
+recommend_rooms_query = '''
+query {
+    recommendRooms(
+        start: "2029-11-06T10:00:00",
+        end: "2029-11-06T11:00:00",
+        timeZone: "Africa/Kampala",
+        attendees: 4
+    ) {
+        room {
+            name
+        }
+        capacityWaste
+        extraResources
+    }
+}
+'''
+
+recommend_rooms_response = {
+    "data": {
+        "recommendRooms": [
+            {
+                "room": {
+                    "name": "Entebbe"
+                },
+                "capacityWaste": 2,
+                "extraResources": 0
+            },
+            {
+                "room": {
+                    "name": "Tana"
+                },
+                "capacityWaste": 10,
+                "extraResources": 0
+            }
+        ]
+    }
+}
+
+recommend_rooms_with_resources_query = '''
+query {
+    recommendRooms(
+        start: "2029-11-06T07:00:00Z",
+        end: "2029-11-06T08:00:00Z",
+        attendees: 4,
+        requiredResources: ["markers"],
+        labels: ["Block-B"]
+    ) {
+        room {
+            name
+        }
+        capacityWaste
+    }
+}
+'''
+
+recommend_rooms_with_resources_response = {
+    "data": {
+        "recommendRooms": [
+            {
+                "room": {
+                    "name": "Tana"
+                },
+                "capacityWaste": 10
+            }
+        ]
+    }
+}
+
+recommend_rooms_with_labels_query = '''
+query {
+    recommendRooms(
+        start: "2029-11-06T10:00:00Z",
+        end: "2029-11-06T11:00:00Z",
+        attendees: 2,
+        labels: ["wing b"]
+    ) {
+        room {
+            name
+        }
+    }
+}
+'''
+
+recommend_booked_rooms_query = '''
+query {
+    recommendRooms(
+        start: "2018-07-11T09:30:00Z",
+        end: "2018-07-11T10:30:00Z",
+        attendees: 2,
+        limit: 1
+    ) {
+        room {
+            name
+        }
+    }
+}
+'''
+
+recommend_rooms_for_many_query = '''
+query {
+    recommendRooms(
+        start: "2029-11-06T10:00:00Z",
+        end: "2029-11-06T11:00:00Z",
+        attendees: 40
+    ) {
+        room {
+            name
+        }
+    }
+}
+'''
+
+recommend_rooms_invalid_period_query = '''
+query {
+    recommendRooms(
+        start: "2029-11-06T11:00:00Z",
+        end: "2029-11-06T10:00:00Z",
+        attendees: 4
+    ) {
+        room {
+            name
+        }
+    }
+}
+'''
+
+recommend_tana_response = {
+    "data": {
+        "recommendRooms": [
+            {
+                "room": {
+                    "name": "Tana"
+                }
+            }
+        ]
+    }
+}
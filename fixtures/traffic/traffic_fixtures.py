@@ -0,0 +1,37 @@
+rooms_operation = {
+    'query': 'query rooms { allRooms { rooms { name calendarId } } }',
+    'variables': {'organizer': 'peter.walugembe@andela.com'},
+    'operationName': 'rooms'
+}
+
+recorded_body = {
+    'query': 'query rooms {\n  allRooms {\n    rooms {\n      name\n'
+             '      calendarId\n    }\n  }\n}\n',
+    'variables': {'organizer': 'redacted'},
+    'operationName': 'rooms'
+}
+
+room_name_operation = {
+    'query': 'query ($location: String) { '
+             'getRoomByName(name: "Boardroom of Jane Doe") { name } '
+             'allRooms(location: $location, page: 1) { rooms { name } } }',
+    'variables': {'location': 'Jane Doe Office', 'startDate': 'Nov 6 2019'}
+}
+
+room_calendar_id = \
+    'andela.com_3630363835303531343031@resource.calendar.google.com'
+
+traffic_secret = 'traffic-secret'
+
+request_variables = {
+    'room': room_calendar_id,
+    'attendeeIds': ['peter.walugembe@andela.com', 'joseph@andela.com'],
+    'note': 'Booked by joseph@andela.com'
+}
+
+anonymised_variables = {
+    'room': room_calendar_id,
+    'attendeeIds': ['user-e65a956cc763@example.com',
+                    'user-1d2c474fb994@example.com'],
+    'note': 'redacted'
+}
@@ -3,6 +3,7 @@ from graphql import GraphQLError
 from api.location.models import Location
 from api.room.models import Room as RoomModel
 from helpers.auth.user_details import get_user_from_db
+from helpers.request_scope.request_scope import cached
 from helpers.room_filter.room_filter import (
     location_join_room)
 from utilities.utility import StateType
@@ -37,9 +38,11 @@ class Admin_roles():
         Return admin's location for viewing analytics data
         """
         admin_details = get_user_from_db()
-        location = Location.query.filter_by(
-             name=admin_details.location
-        ).first()
+        location = cached(
+            ('location', admin_details.location),
+            lambda: Location.query.filter_by(
+                name=admin_details.location
+            ).first())
         if not location:
             raise GraphQLError('Your location does not exist')
         if location.state != StateType.active:
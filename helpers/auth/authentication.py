@@ -14,6 +14,7 @@ from api.role.models import Role
 from api.notification.models import Notification as NotificationModel
 from helpers.connection.connection_error_handler import handle_http_error
 from helpers.location.location import check_and_add_location
+from helpers.request_scope.request_scope import cached
 from utilities.utility import StateType
 
 from helpers.database import db_session
@@ -25,6 +26,7 @@ class Authentication:
     """ Authenicate token
     :methods
         decode_token
+        decode_payload
         get_token
     """
 
@@ -37,14 +39,20 @@ class Authentication:
 
     def decode_token(self):
         """
-        Decodes the auth token
+        Decodes the auth token, once per request scope
         :param
         :return
             integer|string
         """
-
+        auth_token = self.get_token()
+        user_info = cached(
+            ('token', auth_token), lambda: self.decode_payload(auth_token))
+        if isinstance(user_info, dict):
+            self.user_info = user_info
+        return user_info
+
+    def decode_payload(self, auth_token):
         try:
-            auth_token = self.get_token()
             if auth_token is None:
                 return jsonify({
                     'message':
@@ -52,7 +60,6 @@ class Authentication:
                 }), 401
 
             payload = jwt.decode(auth_token, verify=False)
-            self.user_info = payload['UserInfo']
             return payload['UserInfo']
         except jwt.ExpiredSignatureError:
             return jsonify({
@@ -144,7 +151,9 @@ class Authentication:
                     email = user_data['email']
 
                     try:
-                        user = User.query.filter_by(email=email).first()
+                        user = cached(
+                            ('user', email),
+                            lambda: User.query.filter_by(email=email).first())
                     except Exception:
                         raise GraphQLError("The database cannot be reached")
 
@@ -1,9 +1,30 @@
 from helpers.auth import authentication
+from helpers.request_scope.request_scope import cached
 from api.user.models import User
 
 
 def get_user_from_db():
     user_token = authentication.Auth.decode_token()
     user_email = user_token['email']
-    user = User.query.filter_by(email=user_email).first()
-    return user
+    return get_user_by_email(user_email)
+
+
+def get_user_by_email(email):
+    """
+    Returns the user with the email, looked up once per request scope
+    """
+    return cached(
+        ('user', email),
+        lambda: User.query.filter_by(email=email).first())
+
+
+def get_user_role():
+    """
+    Returns the role of the requesting user, None when the request has
+    no valid token or the user has not been saved yet
+    """
+    user_token = authentication.Auth.decode_token()
+    if not isinstance(user_token, dict):
+        return None
+    user = get_user_by_email(user_token['email'])
+    return user.roles[0].role if user and user.roles else None
@@ -1,4 +1,5 @@
 import os
+import threading
 
 from apiclient.discovery import build
 from httplib2 import Http
@@ -6,6 +7,24 @@ from graphql import GraphQLError
 from oauth2client import file, client, tools  # noqa
 from oauth2client.client import OAuth2WebServerFlow  # noqa
 
+from config import Config
+from helpers.metrics.metrics import external_call
+from helpers.request_scope.request_scope import cached
+
+google_calls = threading.BoundedSemaphore(Config.GOOGLE_API_MAX_CONCURRENCY)
+
+
+class BoundedHttp(Http):
+    """
+    Http client that waits for a free slot before sending a request, so
+    that concurrent resolvers keep at most GOOGLE_API_MAX_CONCURRENCY
+    Calendar API requests in flight, and times them
+    """
+
+    def request(self, *args, **kwargs):
+        with google_calls, external_call('google_calendar'):
+            return super().request(*args, **kwargs)
+
 
 class Credentials():
     """Define api credentials
@@ -15,26 +34,33 @@ class Credentials():
 
     def set_api_credentials(self):
         """
-        Setup the Calendar API
+        Setup the Calendar API, once per request scope
         """
-        SCOPES = 'https://www.googleapis.com/auth/calendar'
-        store = file.Storage('credentials.json')
-        credentials = store.get()
-
-        if not credentials or credentials.invalid:
-            # Create a flow object. This object holds the client_id,
-            # client_secret, and
-            # SCOPES. It assists with OAuth 2.0 steps to get user
-            # authorization and credentials.
-            flow = OAuth2WebServerFlow(
-                os.getenv('OOATH2_CLIENT_ID'),
-                os.getenv('OOATH2_CLIENT_SECRET'),
-                SCOPES)
-            credentials = tools.run_flow(flow, store)
-        api_key = os.getenv('API_KEY')
-        service = build('calendar', 'v3', developerKey=api_key,
-                        http=credentials.authorize(Http()))
-        return service
+        return cached(('calendar_service',), build_calendar_service)
+
+
+def build_calendar_service():
+    """
+    Setup the Calendar API
+    """
+    SCOPES = 'https://www.googleapis.com/auth/calendar'
+    store = file.Storage('credentials.json')
+    credentials = store.get()
+
+    if not credentials or credentials.invalid:
+        # Create a flow object. This object holds the client_id,
+        # client_secret, and
+        # SCOPES. It assists with OAuth 2.0 steps to get user
+        # authorization and credentials.
+        flow = OAuth2WebServerFlow(
+            os.getenv('OOATH2_CLIENT_ID'),
+            os.getenv('OOATH2_CLIENT_SECRET'),
+            SCOPES)
+        credentials = tools.run_flow(flow, store)
+    api_key = os.getenv('API_KEY')
+    service = build('calendar', 'v3', developerKey=api_key,
+                    http=credentials.authorize(BoundedHttp()))
+    return service
 
 
 credentials = Credentials()
@@ -10,6 +10,11 @@ from api.events.models import Events as EventsModel
 from api.room.models import Room as RoomModel
 from .analytics_helper import CommonAnalytics
 from .credentials import Credentials, get_google_calendar_events
+from helpers.event_booking.event_booking import release_event_holds
+from helpers.event_deadlines.event_deadlines import (
+    checkin_deadlines,
+    schedule_event_deadlines
+)
 
 
 class RoomSchedules(Credentials):
@@ -104,35 +109,11 @@ class RoomSchedules(Credentials):
 
         return all_events, all_dates
 
-    def check_event_status(self, info, **kwargs):
-        try:
-            room_id = RoomModel.query.filter_by(
-                calendar_id=kwargs['calendar_id']).first().id
-            checked_in_events = EventsModel.query.filter_by(
-                event_id=kwargs['event_id'],
-                room_id=room_id,
-                start_time=kwargs['start_time'],
-                checked_in=True).count()
-            cancelled_events = EventsModel.query.filter_by(
-                event_id=kwargs['event_id'],
-                room_id=room_id,
-                start_time=kwargs['start_time'],
-                cancelled=True).count()
-            if checked_in_events > 0 and 'meeting_end_time' not in kwargs:
-                raise GraphQLError("Event already checked in")
-            elif checked_in_events < 1 and 'meeting_end_time' in kwargs:
-                raise GraphQLError("Event yet to be checked in")
-            elif cancelled_events > 0:
-                raise GraphQLError("Event already cancelled")
-            return room_id
-        except AttributeError:
-            raise GraphQLError(
-                "This Calendar ID is invalid")
-
 
 class CalendarEvents:
     """
-    Sync all calendar events with Converge Database
+    Sync all calendar events with Converge Database and schedule
+    the check-in deadlines of the synced occurrences
     :methods
         sync_single_room_events
         sync_all_events
@@ -156,6 +137,8 @@ class CalendarEvents:
             next_page = event_results.get("nextPageToken")
             room_events = event_results["items"]
             next_sync_token = event_results.get("nextSyncToken")
+            archived_events = []
+            synced_events = []
             for event in room_events:
                 existing_event = EventsModel.query.filter_by(
                     event_id=event.get("id")
@@ -168,6 +151,7 @@ class CalendarEvents:
                 if existing_event and event.get("status") == "cancelled":
                     existing_event.state = "archived"
                     existing_event.save()
+                    archived_events.append(existing_event.id)
 
                 elif existing_event:
                     existing_event.event_title = event.get("summary")
@@ -177,6 +161,8 @@ class CalendarEvents:
                         "dateTime") or event["end"].get("date")
                     existing_event.number_of_participants = number_of_attendees
                     existing_event.save()
+                    synced_events.append(
+                        (existing_event, room.cancellation_duration))
 
                 elif not event.get("status") == "cancelled":
                     app_booking = False
@@ -199,6 +185,11 @@ class CalendarEvents:
                         cancelled=False
                     )
                     new_event.save()
+                    synced_events.append(
+                        (new_event, room.cancellation_duration))
+            checkin_deadlines.unschedule_many(archived_events)
+            schedule_event_deadlines(synced_events)
+            release_event_holds([event.get("id") for event in room_events])
             if not next_page:
                 break
 
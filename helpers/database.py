@@ -1,23 +1,265 @@
-from sqlalchemy import create_engine, DateTime, Column, func
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import has_request_context, request
+from sqlalchemy import create_engine, event, DateTime, Column, func
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 from config import config
 
 import os
 import sys
 sys.path.append(os.getcwd())
 
+logger = logging.getLogger(__name__)
+
 config_name = os.getenv('APP_SETTINGS')
-database_uri = config.get(config_name).SQLALCHEMY_DATABASE_URI
-engine = create_engine(database_uri, convert_unicode=True)
-db_session = scoped_session(sessionmaker(autocommit=False,
-                                         autoflush=False,
-                                         bind=engine))
+settings = config.get(config_name)
+database_uri = settings.SQLALCHEMY_DATABASE_URI
+
+
+def engine_options(database_uri, settings):
+    """
+    Returns the create_engine arguments of the database: a pool sized by
+    the settings, with pre-ping and recycling, and the statement and
+    idle in transaction timeouts of every connection on Postgres
+    """
+    options = {'convert_unicode': True}
+    if make_url(database_uri).get_backend_name() != 'postgresql':
+        return options
+    timeouts = {
+        'statement_timeout': settings.DB_STATEMENT_TIMEOUT,
+        'idle_in_transaction_session_timeout':
+            settings.DB_IDLE_IN_TRANSACTION_TIMEOUT,
+    }
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={'options': ' '.join(
+            '-c {}={}'.format(name, milliseconds)
+            for name, milliseconds in sorted(timeouts.items()))})
+    return options
+
+
+def create_database_engine(database_uri, settings):
+    """
+    Creates the engine of the web app, the Celery workers and the
+    services, configured by the settings
+    """
+    return create_engine(
+        database_uri, **engine_options(database_uri, settings))
+
+
+class ReplicaSet:
+    """
+    Engines of the read replicas of the database, handed out in turn.
+    A replica is checked at most every retry_seconds; one that cannot be
+    reached, or loses a connection in between, is left out for
+    retry_seconds, and reads go to the primary while no replica is up
+    :methods
+        choose
+        available
+        mark_down
+    """
+
+    def __init__(self, urls, settings):
+        self.engines = []
+        for url in urls:
+            options = engine_options(url, settings)
+            if 'connect_args' in options:
+                options['connect_args']['connect_timeout'] = \
+                    settings.DB_REPLICA_CONNECT_TIMEOUT
+            replica = create_engine(url, **options)
+            event.listen(replica, 'handle_error', self.handle_error)
+            self.engines.append(replica)
+        self.retry_seconds = settings.DB_REPLICA_RETRY_SECONDS
+        self.checked = {}
+        self.down_until = {}
+        self.turns = itertools.count()
+        self.lock = threading.Lock()
+
+    def choose(self):
+        """
+        Returns the next replica that is up, None when none is
+        """
+        for _ in self.engines:
+            replica = self.engines[next(self.turns) % len(self.engines)]
+            if self.available(replica):
+                return replica
+        return None
+
+    def available(self, replica):
+        now = time.monotonic()
+        with self.lock:
+            if self.down_until.get(replica, 0) > now:
+                return False
+            if now - self.checked.get(replica, -self.retry_seconds) < \
+                    self.retry_seconds:
+                return True
+            self.checked[replica] = now
+        try:
+            with replica.connect() as connection:
+                connection.execute('SELECT 1')
+        except SQLAlchemyError as error:
+            # connection errors were handled by handle_error already
+            if self.down_until.get(replica, 0) <= now:
+                self.mark_down(replica, error)
+            return False
+        return True
+
+    def mark_down(self, replica, error):
+        """
+        Leaves a replica out for retry_seconds
+        """
+        logger.warning('Replica %r is down: %s', replica.url, error)
+        with self.lock:
+            self.down_until[replica] = time.monotonic() + self.retry_seconds
+
+    def handle_error(self, context):
+        # connections that could not be made, or were lost
+        if context.connection is None or context.is_disconnect:
+            self.mark_down(context.engine, context.original_exception)
+
+
+replicas = ReplicaSet(settings.DATABASE_REPLICA_URLS, settings) \
+    if settings.DATABASE_REPLICA_URLS else None
+routing = threading.local()
+
+
+def has_replicas():
+    return replicas is not None
+
+
+def all_engines():
+    return [engine] + (replicas.engines if replicas else [])
+
+
+def reads_from_replica():
+    """
+    Tells whether the reads of the current request, or thread outside
+    requests, may go to a replica
+    """
+    if has_request_context():
+        return request.environ.get('mrm.read_only', False)
+    return getattr(routing, 'read_only', False)
+
+
+@contextmanager
+def read_only(enabled=True):
+    """
+    Sends the reads of the block to a replica, when there is one
+    """
+    if has_request_context():
+        previous = request.environ.get('mrm.read_only', False)
+        request.environ['mrm.read_only'] = enabled
+    else:
+        previous = getattr(routing, 'read_only', False)
+        routing.read_only = enabled
+    try:
+        yield
+    finally:
+        if has_request_context():
+            request.environ['mrm.read_only'] = previous
+        else:
+            routing.read_only = previous
+
+
+class RoutingSession(Session):
+    """
+    Session reading from one replica while reads_from_replica, and from
+    the primary otherwise. Once it has written, or tried to, it reads
+    from the primary too, so that it sees its own writes. When its
+    replica cannot be connected to, it reads from the primary instead
+    """
+
+    def get_bind(self, mapper=None, clause=None):
+        if isinstance(clause, UpdateBase):
+            self.info['wrote'] = True
+        if replicas is None or self._flushing or self.info.get('wrote') \
+                or not reads_from_replica():
+            return super().get_bind(mapper, clause)
+        replica = self.info.get('replica')
+        if replica is None or not replicas.available(replica):
+            replica = self.info['replica'] = replicas.choose()
+        return replica or super().get_bind(mapper, clause)
+
+    def _connection_for_bind(self, engine, execution_options=None, **kw):
+        try:
+            return super()._connection_for_bind(
+                engine, execution_options, **kw)
+        except DBAPIError:
+            if replicas is None or engine not in replicas.engines:
+                raise
+            # handle_error has marked the replica down already
+            self.info.pop('replica', None)
+            return super()._connection_for_bind(
+                self.bind, execution_options, **kw)
+
+
+engine = create_database_engine(database_uri, settings)
+session_factory = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+db_session = scoped_session(session_factory)
 
 DeclarativeBase = declarative_base()
 DeclarativeBase.query = db_session.query_property()
 
 
+def set_statement_timeout(connection, milliseconds):
+    """
+    Sets the statement timeout of the transaction of the connection on
+    Postgres, or restores the timeout of the connection when None
+    """
+    if connection.dialect.name != 'postgresql':
+        return
+    connection.execute('SET LOCAL statement_timeout = {}'.format(
+        'DEFAULT' if milliseconds is None else int(milliseconds)))
+
+
+@event.listens_for(session_factory, 'after_begin')
+def apply_operation_timeout(session, transaction, connection):
+    """
+    Gives the transactions begun for a GraphQL operation with a timeout
+    of its own, on the request thread or a pool thread, that timeout
+    """
+    if not has_request_context():
+        return
+    milliseconds = request.environ.get('mrm.statement_timeout')
+    if milliseconds is not None:
+        set_statement_timeout(connection, milliseconds)
+
+
+@event.listens_for(session_factory, 'before_flush')
+def remember_write(session, flush_context, instances):
+    session.info['wrote'] = True
+
+
+def pool_stats(engine=engine):
+    """
+    Returns the size of the connection pool of the engine, the
+    connections checked in and out of it and its overflow, or None for
+    pools that do not keep connections
+    """
+    pool = engine.pool
+    if not hasattr(pool, 'checkedout'):
+        return None
+    return {
+        'size': pool.size(),
+        'checked_in': pool.checkedin(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+    }
+
+
 class Base(DeclarativeBase):
     """
     Extends the base class to the specific models and by default places the
@@ -0,0 +1,227 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from uuid import uuid4
+
+import redis
+from dateutil import parser
+from sqlalchemy import text
+from sqlalchemy.orm.attributes import set_committed_value
+
+from api.devices.models import DeviceHealthType
+from config import config
+from helpers.database import db_session
+from helpers.devices.device_health import (
+    HEALTH_STATUS, RECORD_TRANSITIONS, health_thresholds, health_status)
+
+logger = logging.getLogger(__name__)
+
+
+def encode_activity(last_seen, last_activity):
+    return json.dumps({
+        'last_seen': last_seen.isoformat(),
+        'last_activity': last_activity
+    })
+
+
+def decode_activity(value):
+    activity = json.loads(value)
+    return parser.parse(activity['last_seen']), activity['last_activity']
+
+
+class DeviceActivityBuffer:
+    """
+    Write-behind buffer for device heartbeats.
+    Only the latest activity of every device is kept and the buffered
+    values are written to the devices table in one UPDATE per flush.
+    Activity lives in Redis when a redis_url is given, so that all the
+    API workers share one buffer, and in process memory otherwise
+    :methods
+        record
+        pending_activity
+        flush
+    """
+    key = 'device_activity'
+
+    def __init__(self, redis_url=None, flush_interval=0):
+        self.redis = redis.StrictRedis.from_url(
+            redis_url) if redis_url else None
+        self.flush_interval = flush_interval
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.flusher = None
+
+    def record(self, device_id, last_seen, last_activity):
+        """
+        Buffers the activity of a device, replacing any unflushed one
+        :params device_id, last_seen, last_activity
+        """
+        if isinstance(last_seen, str):
+            last_seen = parser.parse(last_seen)
+        last_seen = last_seen.replace(tzinfo=None)
+        if self.redis:
+            self.redis.hset(
+                self.key, device_id,
+                encode_activity(last_seen, last_activity))
+        else:
+            with self.lock:
+                self.pending[device_id] = (last_seen, last_activity)
+        self.start_flusher()
+
+    def pending_activity(self, device_ids):
+        """
+        Returns the unflushed (last_seen, last_activity) of the devices
+        :params device_ids
+        """
+        if not device_ids:
+            return {}
+        if self.redis:
+            values = self.redis.hmget(self.key, device_ids)
+            return {
+                device_id: decode_activity(value)
+                for device_id, value in zip(device_ids, values) if value
+            }
+        with self.lock:
+            return {
+                device_id: self.pending[device_id]
+                for device_id in device_ids if device_id in self.pending
+            }
+
+    def drain(self):
+        """
+        Removes and returns everything buffered so far
+        """
+        if self.redis:
+            flushing_key = '{}:flushing:{}'.format(self.key, uuid4().hex)
+            try:
+                self.redis.rename(self.key, flushing_key)
+            except redis.ResponseError:
+                return {}
+            values = self.redis.hgetall(flushing_key)
+            self.redis.delete(flushing_key)
+            return {
+                int(device_id): decode_activity(value)
+                for device_id, value in values.items()
+            }
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        return pending
+
+    def restore(self, activity):
+        """
+        Puts back activity that could not be flushed unless the device
+        reported newer activity in the meantime
+        """
+        if self.redis:
+            for device_id, (last_seen, last_activity) in activity.items():
+                self.redis.hsetnx(
+                    self.key, device_id,
+                    encode_activity(last_seen, last_activity))
+            return
+        with self.lock:
+            for device_id, buffered in activity.items():
+                self.pending.setdefault(device_id, buffered)
+
+    def flush(self):
+        """
+        Writes the buffered activity to the devices table
+        :returns the number of devices updated
+        """
+        activity = self.drain()
+        if not activity:
+            return 0
+        try:
+            write_device_activity(activity)
+        except Exception:
+            db_session.rollback()
+            self.restore(activity)
+            raise
+        return len(activity)
+
+    def clear(self):
+        self.drain()
+
+    def start_flusher(self):
+        if self.flusher or not self.flush_interval:
+            return
+        with self.lock:
+            if not self.flusher:
+                self.flusher = threading.Thread(
+                    target=self.run_flusher, daemon=True)
+                self.flusher.start()
+                atexit.register(self.flush)
+
+    def run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not flush device activity')
+            finally:
+                db_session.remove()
+
+
+def write_device_activity(activity):
+    """
+    Updates last_seen, last_activity and the health status of many devices
+    in one statement, recording the devices that came back online
+    :params activity: {device_id: (last_seen, last_activity)}
+    """
+    rows = []
+    parameters = health_thresholds()
+    for index, (device_id, (last_seen, last_activity)) in enumerate(
+            activity.items()):
+        rows.append(
+            '(CAST(:id_{0} AS INTEGER), CAST(:last_seen_{0} AS TIMESTAMP), '
+            ':last_activity_{0})'.format(index))
+        parameters.update({
+            'id_{}'.format(index): device_id,
+            'last_seen_{}'.format(index): last_seen,
+            'last_activity_{}'.format(index): last_activity
+        })
+    db_session.execute(text(
+        'WITH changed AS (UPDATE devices SET '
+        'last_seen = activity.last_seen, '
+        'last_activity = activity.last_activity, '
+        'health_status = {status}, date_updated = now() '
+        'FROM (VALUES {rows}) AS activity (id, last_seen, last_activity), '
+        'devices AS previous '
+        'WHERE devices.id = activity.id AND previous.id = devices.id '
+        'RETURNING devices.id, previous.health_status AS previous_status, '
+        'devices.health_status AS status) {record_transitions}'.format(
+            status=HEALTH_STATUS.format(last_seen='activity.last_seen'),
+            rows=', '.join(rows),
+            record_transitions=RECORD_TRANSITIONS)
+    ), parameters)
+    db_session.commit()
+
+
+def merge_pending_activity(devices):
+    """
+    Overlays unflushed activity and the health status it implies on loaded
+    devices without marking them as modified, so reads stay fresh between
+    flushes
+    :params devices: list of device models
+    """
+    pending = device_activity.pending_activity(
+        [device.id for device in devices])
+    for device in devices:
+        if device.id in pending:
+            last_seen, last_activity = pending[device.id]
+            set_committed_value(device, 'last_seen', last_seen)
+            set_committed_value(device, 'last_activity', last_activity)
+            set_committed_value(
+                device, 'health_status',
+                DeviceHealthType(health_status(last_seen)))
+    return devices
+
+
+settings = config.get(os.getenv('APP_SETTINGS') or 'default')
+device_activity = DeviceActivityBuffer(
+    redis_url=settings.REDIS_URL,
+    flush_interval=settings.DEVICE_ACTIVITY_FLUSH_INTERVAL
+)
@@ -0,0 +1,103 @@
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, text
+
+from api.devices.models import Devices as DevicesModel
+from config import config
+from helpers.database import db_session
+
+settings = config.get(os.getenv('APP_SETTINGS') or 'default')
+
+# SQL expression classifying a device from the age of its last heartbeat,
+# last_seen being stored in UTC
+HEALTH_STATUS = '''CASE
+    WHEN {last_seen} >= (now() AT TIME ZONE 'utc')
+        - make_interval(mins => :stale_after) THEN 'online'
+    WHEN {last_seen} >= (now() AT TIME ZONE 'utc')
+        - make_interval(mins => :offline_after) THEN 'stale'
+    ELSE 'offline' END::devicehealthtype'''
+
+# Inserts a transition for every row of the "changed" CTE, which returns
+# the device id with its previous and new health status
+RECORD_TRANSITIONS = '''INSERT INTO device_health_transitions
+    (id, device_id, previous_status, status, changed_at)
+SELECT nextval('device_health_transitions_id_seq'), id,
+    previous_status, status, now() AT TIME ZONE 'utc'
+FROM changed WHERE status <> previous_status'''
+
+CLASSIFY_DEVICES = '''WITH classified AS (
+    SELECT id, health_status AS previous_status,
+        {status} AS status
+    FROM devices WHERE state = 'active'
+), changed AS (
+    UPDATE devices SET health_status = classified.status
+    FROM classified
+    WHERE devices.id = classified.id
+    AND classified.status <> classified.previous_status
+    RETURNING devices.id, classified.previous_status, classified.status
+)
+{record_transitions}'''.format(
+    status=HEALTH_STATUS.format(last_seen='last_seen'),
+    record_transitions=RECORD_TRANSITIONS)
+
+
+def health_thresholds():
+    return {
+        'stale_after': settings.DEVICE_STALE_AFTER,
+        'offline_after': settings.DEVICE_OFFLINE_AFTER
+    }
+
+
+def health_status(last_seen):
+    """
+    Classifies a heartbeat the way HEALTH_STATUS does in the database
+    :params last_seen: naive UTC datetime
+    """
+    age = datetime.utcnow() - last_seen
+    if age <= timedelta(minutes=settings.DEVICE_STALE_AFTER):
+        return 'online'
+    if age <= timedelta(minutes=settings.DEVICE_OFFLINE_AFTER):
+        return 'stale'
+    return 'offline'
+
+
+def classify_device_health():
+    """
+    Moves devices whose heartbeats aged past a threshold to their new
+    health status and records the transitions, in one statement which
+    only writes the devices that changed
+    :returns the number of transitions recorded
+    """
+    result = db_session.execute(text(CLASSIFY_DEVICES), health_thresholds())
+    db_session.commit()
+    return result.rowcount
+
+
+def device_health_counts(location_name):
+    """
+    Counts the active devices of a location by health status
+    :params location_name
+    """
+    counts = dict.fromkeys(['online', 'stale', 'offline'], 0)
+    rows = db_session.query(
+        DevicesModel.health_status, func.count(DevicesModel.id)
+    ).filter(
+        func.lower(DevicesModel.location) == location_name.lower(),
+        DevicesModel.state == "active"
+    ).group_by(DevicesModel.health_status)
+    for status, count in rows:
+        counts[status.value] = count
+    return counts
+
+
+def unhealthy_devices(location_name):
+    """
+    Returns the active devices of a location that are not online
+    :params location_name
+    """
+    return DevicesModel.query.filter(
+        DevicesModel.health_status != "online",
+        func.lower(DevicesModel.location) == location_name.lower(),
+        DevicesModel.state == "active"
+    ).order_by(DevicesModel.last_seen).all()
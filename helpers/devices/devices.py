@@ -1,15 +1,43 @@
 from graphql import GraphQLError
+from sqlalchemy import func
+
 from api.devices.models import Devices as DeviceModel
-from api.devices.schema import Devices as DeviceSchema
+from helpers.database import db_session
+from helpers.devices.device_activity import (
+    device_activity, merge_pending_activity)
+from helpers.devices.device_health import (
+    device_health_counts, unhealthy_devices)
 
 
-def update_device_last_activity(info, room_id, activity_time, activity):
-    device_query = DeviceSchema.get_query(info)
-    device = device_query.filter(
-                DeviceModel.room_id == room_id
-            ).first()
-    if not device:
+def update_device_last_activity(room_id, activity_time, activity):
+    """
+    Records the latest activity on the room's device in the write-behind
+    buffer, which writes it to the devices table on its next flush
+    :params room_id, activity_time, activity
+    """
+    device_id = db_session.query(func.min(DeviceModel.id)).filter(
+        DeviceModel.room_id == room_id).scalar()
+    if not device_id:
         raise GraphQLError("Room device not found")
-    device.last_seen = activity_time
-    device.last_activity = activity
-    device.save()
+    device_activity.record(device_id, activity_time, activity)
+
+
+def device_health_summary(location_name):
+    """
+    Counts the devices of a location by health status and lists the
+    unhealthy ones, both read from the health status index and corrected
+    for heartbeats that are still waiting to be flushed
+    :params location_name
+    """
+    counts = device_health_counts(location_name)
+    devices = unhealthy_devices(location_name)
+    indexed_status = {
+        device.id: device.health_status.value for device in devices}
+    unhealthy = []
+    for device in merge_pending_activity(devices):
+        status = device.health_status.value
+        counts[indexed_status[device.id]] -= 1
+        counts[status] += 1
+        if status != 'online':
+            unhealthy.append(device)
+    return dict(counts, unhealthy_devices=unhealthy)
@@ -1,6 +1,5 @@
 from .email_setup import SendEmail
 from config import Config
-from flask import render_template
 from api.room.models import Room as RoomModel
 
 
@@ -14,20 +13,11 @@ class EmailNotification:
         """
         send email notifications after a given activity has occured
         """
-        recipients = kwargs.get('email')
+        recipients = kwargs.pop('email')
+        subject = kwargs.pop('subject')
+        template = kwargs.pop('template')
 
-        email = SendEmail(
-            kwargs.get('subject'), recipients,
-            render_template(
-                kwargs.get('template'),
-                location_name=kwargs.get('location_name'),
-                user_name=kwargs.get('user_name'),
-                room_name=kwargs.get('room_name'),
-                event_title=kwargs.get('event_title'),
-                event_reject_reason=kwargs.get('event_reject_reason'),
-                new_role=kwargs.get('new_role'),
-                domain=kwargs.get('domain')
-            ))
+        email = SendEmail(subject, recipients, template, **kwargs)
 
         return email.send()
 
@@ -42,7 +32,7 @@ class EmailNotification:
         )
 
     def event_cancellation_notification(
-        self, event, room_id, event_reject_reason
+        self, event, room_id, event_reject_reason, room_name=None
     ):
         """
         send email notifications on event rejection
@@ -50,12 +40,14 @@ class EmailNotification:
             - event: The event being rejected
             - room_id: Id of the room rejecting the event
             - event_reject_reason: Reason for rejecting the event
+            - room_name: Name of the room, looked up when not given
         """
         attendees = event['attendees']
         email = [attendee['email'] for attendee in attendees]
         event_title = event['summary']
-        room = RoomModel.query.filter_by(id=room_id).first()
-        room_name = room.name
+        if not room_name:
+            room_name = RoomModel.query.with_entities(
+                RoomModel.name).filter_by(id=room_id).scalar()
         subject = 'Your room reservation was rejected'
         template = 'event_cancellation.html'
         return EmailNotification.send_email_notification(
@@ -1,17 +1,30 @@
-from flask_mail import Message, Mail
+import logging
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, render_template
+from flask_mail import Message
+from jinja2 import TemplateError
 from config import Config
 import celery
 
+logger = logging.getLogger(__name__)
+batches = threading.local()
+
 
 class SendEmail:
     """
     "Encapsulates an email message.
 
+    Only the template name and its context are queued, the worker renders
+    the template and sends the message
+
     :param subject: email subject header
     :param recipients: list of email addresses
-    :param body: plain text message
-    :param html: HTML message
-    :param sender: email sender address
+    :param template: name of the HTML template
+    :param context: variables the template is rendered with
     """
 
     def __init__(
@@ -19,29 +32,139 @@ class SendEmail:
             subject,
             recipients,
             template,
+            **context
     ):
         self.subject = subject
-        self.recipients = recipients
+        self.recipients = [recipients] if isinstance(
+            recipients, str) else recipients
         self.template = template
+        self.context = context
         self.sender = Config.MAIL_USERNAME
-        self.message = Message(
-            subject=self.subject,
-            recipients=self.recipients,
-            html=self.template,
-            sender=self.sender)
+
+    @property
+    def payload(self):
+        return {
+            'subject': self.subject,
+            'recipients': self.recipients,
+            'sender': self.sender,
+            'template': self.template,
+            'context': self.context
+        }
 
     @celery.task(name='asynchronous-email-notifications')
-    def send_async_email(msg_dict):
-        mail = Mail()
-        msg = Message()
-        msg.__dict__.update(msg_dict)
-        mail.send(msg)
+    def send_async_email(payloads):
+        return deliver_emails(payloads)
 
     def send(self):
-        try:
-            msg = self.message.__dict__
-            self.send_async_email.apply_async(args=[msg])
+        batch = getattr(batches, 'payloads', None)
+        if batch is not None:
+            batch.append(self.payload)
             return True
-        except Exception as e:
-            print(e)
-            return False
+        return enqueue_emails([self.payload])
+
+
+def enqueue_emails(payloads):
+    """
+    Queues the payloads in tasks of at most MAIL_BATCH_SIZE messages
+    :returns whether every task was queued
+    """
+    try:
+        for start in range(0, len(payloads), Config.MAIL_BATCH_SIZE):
+            SendEmail.send_async_email.apply_async(
+                args=[payloads[start:start + Config.MAIL_BATCH_SIZE]])
+        return True
+    except Exception as e:
+        print(e)
+        return False
+
+
+@contextmanager
+def email_batch():
+    """
+    Collects the emails sent in the block and queues them together, so
+    the worker delivers them over one SMTP connection
+    """
+    if getattr(batches, 'payloads', None) is not None:
+        yield
+        return
+    batches.payloads = []
+    try:
+        yield
+    finally:
+        payloads, batches.payloads = batches.payloads, None
+        if payloads:
+            enqueue_emails(payloads)
+
+
+def build_message(payload):
+    return Message(
+        subject=payload['subject'],
+        recipients=payload['recipients'],
+        html=render_template(payload['template'], **payload['context']),
+        sender=payload['sender'])
+
+
+def deliver_emails(payloads):
+    """
+    Renders and sends the payloads over one SMTP connection. Templates
+    are compiled once and cached by the application's Jinja environment.
+    A message that cannot be rendered or is permanently rejected is
+    logged and skipped. When the connection fails, it is reopened after
+    an exponential backoff and sending resumes with the message that failed
+    :params payloads: list of SendEmail payloads
+    :returns the number of messages sent
+    """
+    mail = current_app.extensions['mail']
+    sent = 0
+    attempt = 0
+    position = 0
+    while position < len(payloads):
+        try:
+            with connect(mail) as connection:
+                for payload in payloads[position:]:
+                    sent += send_message(connection, payload)
+                    position += 1
+                    attempt = 0
+        except (smtplib.SMTPServerDisconnected, OSError):
+            attempt += 1
+            if attempt > Config.MAIL_SEND_RETRIES:
+                raise
+            time.sleep(Config.MAIL_RETRY_BACKOFF * 2 ** (attempt - 1))
+    return sent
+
+
+def send_message(connection, payload):
+    """
+    Sends one payload, logging it when it cannot be rendered or is
+    permanently rejected. Transient errors are raised
+    :returns the number of messages sent
+    """
+    try:
+        connection.send(build_message(payload))
+        return 1
+    except smtplib.SMTPRecipientsRefused:
+        logger.exception('Recipients refused: %s', payload['recipients'])
+    except smtplib.SMTPResponseException as error:
+        if error.smtp_code < 500:
+            raise
+        logger.exception('Message to %s rejected', payload['recipients'])
+    except TemplateError:
+        logger.exception('Could not render %s', payload['template'])
+    return 0
+
+
+@contextmanager
+def connect(mail):
+    """
+    Opens a Flask-Mail connection whose QUIT may fail without hiding
+    the error that broke the connection
+    """
+    connection = mail.connect()
+    connection.__enter__()
+    try:
+        yield connection
+    finally:
+        try:
+            connection.__exit__(None, None, None)
+        except (smtplib.SMTPException, OSError):
+            pass
@@ -0,0 +1,118 @@
+from graphql import GraphQLError
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from api.events.models import BookingHold
+from config import Config
+from helpers.database import db_session
+
+# Key of the advisory locks that serialise the holds of a room. Without
+# them, concurrent inserts checking the exclusion constraint against each
+# other's uncommitted holds can deadlock
+BOOKING_HOLD_LOCK = 7264
+
+LOCK_ROOM_HOLDS = text('SELECT pg_advisory_xact_lock(:key, :room_id)')
+
+CLEAR_LAPSED_HOLDS = text('''
+DELETE FROM booking_holds
+WHERE room_id = :room_id AND expires_at < now()''')
+
+# Holds the room unless a synced event overlaps the period. Overlapping
+# holds are rejected by the booking_holds_no_overlap exclusion constraint
+HOLD_ROOM = text('''
+INSERT INTO booking_holds (id, room_id, time_range, expires_at)
+SELECT nextval('booking_holds_id_seq'), :room_id,
+       tstzrange(:start_time, :end_time, '[)'),
+       now() + make_interval(secs => :hold_seconds)
+WHERE NOT EXISTS (
+    SELECT 1 FROM events
+    WHERE events.room_id = :room_id
+      AND events.state = 'active'
+      AND events.cancelled IS NOT TRUE
+      AND events.time_range && tstzrange(:start_time, :end_time, '[)')
+)
+RETURNING id''')
+
+CONFIRM_HOLD = text('''
+UPDATE booking_holds
+SET confirmed = true, event_id = :event_id, expires_at = upper(time_range)
+WHERE id = :hold_id''')
+
+RELEASE_HOLD = text('DELETE FROM booking_holds WHERE id = :hold_id')
+
+
+def hold_room(room_id, start_time, end_time):
+    """
+    Reserves a room for a period while its booking is written to the
+    calendar, clearing the lapsed holds of the room first. Holds of the
+    same room are taken one at a time
+    :params room_id
+    :params start_time, end_time: timezone aware datetimes
+    :returns the id of the hold
+    """
+    try:
+        db_session.execute(LOCK_ROOM_HOLDS, {
+            'key': BOOKING_HOLD_LOCK, 'room_id': room_id})
+        db_session.execute(CLEAR_LAPSED_HOLDS, {'room_id': room_id})
+        hold_id = db_session.execute(HOLD_ROOM, {
+            'room_id': room_id,
+            'start_time': start_time,
+            'end_time': end_time,
+            'hold_seconds': Config.BOOKING_HOLD_SECONDS
+        }).scalar()
+        db_session.commit()
+    except IntegrityError:
+        db_session.rollback()
+        hold_id = None
+    if not hold_id:
+        raise GraphQLError('Room is already booked for that time')
+    return hold_id
+
+
+def confirm_hold(hold_id, event_id):
+    """
+    Keeps the hold of a booked event until the calendar sync stores or
+    cancels the event, or at the latest until the event ends
+    """
+    db_session.execute(CONFIRM_HOLD, {'hold_id': hold_id,
+                                      'event_id': event_id})
+    db_session.commit()
+
+
+def release_hold(hold_id):
+    db_session.execute(RELEASE_HOLD, {'hold_id': hold_id})
+    db_session.commit()
+
+
+def release_event_holds(event_ids):
+    """
+    Drops the confirmed holds of calendar events the sync has seen. A
+    stored event blocks its room from then on, and a cancelled one must
+    not block it any longer
+    :params event_ids: calendar event ids
+    """
+    if event_ids:
+        BookingHold.query.filter(
+            BookingHold.confirmed.is_(True),
+            BookingHold.event_id.in_(event_ids)
+        ).delete(synchronize_session=False)
+        db_session.commit()
+
+
+def book_room(room_id, start_time, end_time, create_event):
+    """
+    Books a room by holding it, creating the calendar event and then
+    confirming the hold, or releasing it when the event was not created
+    :params room_id
+    :params start_time, end_time: timezone aware datetimes
+    :params create_event: callable creating the calendar event
+    :returns the created event
+    """
+    hold_id = hold_room(room_id, start_time, end_time)
+    try:
+        event = create_event()
+    except Exception:
+        release_hold(hold_id)
+        raise
+    confirm_hold(hold_id, event.get('id') if event else None)
+    return event
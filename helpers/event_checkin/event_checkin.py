@@ -0,0 +1,154 @@
+from datetime import timedelta
+from dateutil import parser
+from graphql import GraphQLError
+from sqlalchemy import and_, literal, select
+from sqlalchemy.dialects.postgresql import insert
+
+from api.events.models import Events as EventsModel
+from api.room.models import Room as RoomModel
+from helpers.database import db_session
+from helpers.devices.devices import update_device_last_activity
+
+events = EventsModel.__table__
+
+
+def check_in_event(**kwargs):
+    """
+    Checks into an event occurrence, creating it when it has not
+    been synced from the calendar yet
+    :params kwargs: eventCheckin mutation arguments
+    """
+    check_in_time = kwargs.get('check_in_time')
+    statement = upsert_event(
+        kwargs,
+        checked_in=True,
+        check_in_time=check_in_time
+    )
+    activity = (check_in_time, 'check in') if check_in_time else None
+    return record_event_action('checked_in', statement, activity, **kwargs)
+
+
+def cancel_event(**kwargs):
+    """
+    Cancels an event occurrence nobody checked into, creating it when it
+    has not been synced from the calendar yet
+    :params kwargs: cancelEvent mutation arguments
+    """
+    try:
+        device_last_seen = parser.parse(
+            kwargs['start_time']) + timedelta(minutes=10)
+    except ValueError:
+        raise GraphQLError("Invalid start time")
+    statement = upsert_event(
+        kwargs,
+        cancelled=True,
+        auto_cancelled=True
+    )
+    activity = (device_last_seen, 'cancel meeting')
+    return record_event_action('cancelled', statement, activity, **kwargs)
+
+
+def end_event(**kwargs):
+    """
+    Records the end of a checked in event occurrence
+    :params kwargs: endEvent mutation arguments
+    """
+    calendar_rooms = select([RoomModel.id]).where(
+        RoomModel.calendar_id == kwargs['calendar_id'])
+    statement = events.update().where(and_(
+        events.c.event_id == kwargs['event_id'],
+        events.c.start_time == kwargs['start_time'],
+        events.c.room_id.in_(calendar_rooms),
+        events.c.checked_in.is_(True),
+        events.c.cancelled.isnot(True),
+        events.c.meeting_end_time.is_(None)
+    )).values(
+        meeting_end_time=kwargs['meeting_end_time']
+    ).returning(*events.c)
+    activity = (kwargs['meeting_end_time'], 'end meeting')
+    return record_event_action('ended', statement, activity, **kwargs)
+
+
+def upsert_event(kwargs, **changes):
+    """
+    Builds an INSERT ... ON CONFLICT statement that creates the event
+    occurrence in the room owning the calendar or applies the changes to
+    the existing occurrence, provided it is neither checked in nor
+    cancelled. The unique (event_id, start_time) key makes concurrent
+    taps from several tablets serialise on the same row
+    """
+    values = {
+        'event_id': kwargs['event_id'],
+        'event_title': kwargs['event_title'],
+        'start_time': kwargs['start_time'],
+        'end_time': kwargs['end_time'],
+        'number_of_participants': kwargs.get('number_of_participants'),
+        'checked_in': False,
+        'cancelled': False
+    }
+    values.update(changes)
+    calendar_room = select(
+        [RoomModel.id] + [
+            literal(value, events.c[column].type)
+            for column, value in values.items()
+        ]
+    ).where(RoomModel.calendar_id == kwargs['calendar_id']).limit(1)
+    return insert(events).from_select(
+        ['room_id'] + list(values), calendar_room
+    ).on_conflict_do_update(
+        index_elements=[events.c.event_id, events.c.start_time],
+        set_=changes,
+        where=and_(
+            events.c.checked_in.isnot(True),
+            events.c.cancelled.isnot(True)
+        )
+    ).returning(*events.c)
+
+
+def record_event_action(event_check, statement, activity=None, **kwargs):
+    """
+    Runs the event write and the device activity update in one
+    transaction, so the whole action costs two statements and a commit.
+    When the write matches no row the transaction is rolled back and the
+    reason is reported
+    :params event_check: one of checked_in, cancelled or ended
+    :params statement: event write returning the affected row
+    :params activity: (last_seen, last_activity) of the room device
+    """
+    try:
+        written = list(db_session.query(EventsModel).populate_existing(
+        ).instances(db_session.execute(statement)))
+        if not written:
+            db_session.rollback()
+            raise event_action_error(event_check, **kwargs)
+        if activity:
+            update_device_last_activity(written[0].room_id, *activity)
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+    return written[0]
+
+
+def event_action_error(event_check, **kwargs):
+    """
+    Explains why an event action did not apply
+    :params event_check: one of checked_in, cancelled or ended
+    """
+    room = RoomModel.query.filter_by(
+        calendar_id=kwargs['calendar_id']).first()
+    if not room:
+        return GraphQLError("This Calendar ID is invalid")
+    event = EventsModel.query.filter_by(
+        event_id=kwargs['event_id'],
+        start_time=kwargs['start_time']).first()
+    if event_check == 'ended':
+        if not event or event.room_id != room.id or not event.checked_in:
+            return GraphQLError("Event yet to be checked in")
+    elif event and event.checked_in:
+        return GraphQLError("Event already checked in")
+    if event and event.cancelled:
+        return GraphQLError("Event already cancelled")
+    if event and event.meeting_end_time:
+        return GraphQLError("Event has already ended")
+    return GraphQLError("Event could not be updated")
@@ -0,0 +1,274 @@
+import heapq
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+import redis
+from dateutil import parser
+from sqlalchemy import and_, text
+
+from api.events.models import (
+    CheckInDeadline as CheckInDeadlineModel,
+    Events as EventsModel
+)
+from api.room.models import Room as RoomModel
+from config import config
+from helpers.database import db_session
+
+events = EventsModel.__table__
+
+# Pops the members of a sorted set whose score is due, atomically, so that
+# two workers never receive the same deadline
+POP_DUE = '''
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1],
+                       'LIMIT', 0, ARGV[2])
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+end
+return due
+'''
+
+# Writes a batch of deadlines in one statement, the event ids of a batch
+# being unique
+SCHEDULE = text('''
+INSERT INTO checkin_deadlines (event_id, deadline)
+SELECT * FROM unnest(
+    CAST(:event_ids AS integer[]), CAST(:deadlines AS timestamptz[]))
+ON CONFLICT (event_id) DO UPDATE SET deadline = EXCLUDED.deadline
+''')
+
+# Locked rows are skipped so that concurrent workers pop disjoint deadlines
+DELETE_DUE = text('''
+DELETE FROM checkin_deadlines WHERE event_id IN (
+    SELECT event_id FROM checkin_deadlines WHERE deadline <= :now
+    ORDER BY deadline LIMIT :limit FOR UPDATE SKIP LOCKED
+) RETURNING event_id, deadline
+''')
+
+
+def check_in_deadline(start_time, cancellation_duration):
+    """
+    Returns the UTC timestamp after which an unattended event occurrence
+    is cancelled
+    :params start_time: ISO start time of the occurrence
+    :params cancellation_duration: minutes the room waits for a check-in
+    """
+    start_time = parser.parse(start_time)
+    if not start_time.tzinfo:
+        start_time = start_time.replace(tzinfo=timezone.utc)
+    deadline = start_time + timedelta(minutes=cancellation_duration or 10)
+    return deadline.timestamp()
+
+
+class CheckInDeadlines:
+    """
+    Timer wheel of event check-in deadlines keyed by event row id.
+    Deadlines live in a Redis sorted set when a redis_url is given and
+    in the checkin_deadlines table otherwise, so that the API workers
+    schedule into the queue the Celery worker pops from. An in-process
+    heap is only used when asked for explicitly. Scheduling an event
+    again moves its deadline and popping due deadlines costs O(log n) each
+    :methods
+        schedule
+        schedule_many
+        unschedule
+        unschedule_many
+        pop_due
+    """
+    key = 'event_checkin_deadlines'
+
+    def __init__(self, redis_url=None, in_process=False):
+        self.redis = redis.StrictRedis.from_url(
+            redis_url) if redis_url else None
+        self.pop_due_script = self.redis.register_script(
+            POP_DUE) if self.redis else None
+        self.in_process = in_process and not self.redis
+        self.heap = []
+        self.deadlines = {}
+        self.lock = threading.Lock()
+
+    def schedule(self, event_id, deadline):
+        """
+        Schedules or moves the check-in deadline of an event
+        :params event_id: id of the events row
+        :params deadline: UTC timestamp
+        """
+        self.schedule_many({event_id: deadline})
+
+    def schedule_many(self, deadlines):
+        """
+        Schedules or moves the check-in deadlines of several events in
+        one write
+        :params deadlines: dict of UTC timestamps by events row id
+        """
+        if not deadlines:
+            return
+        if self.redis:
+            self.redis.execute_command('ZADD', self.key, *[
+                member for event_id, deadline in deadlines.items()
+                for member in (deadline, event_id)
+            ])
+            return
+        if not self.in_process:
+            db_session.execute(SCHEDULE, {
+                'event_ids': list(deadlines),
+                'deadlines': [
+                    datetime.fromtimestamp(deadline, timezone.utc)
+                    for deadline in deadlines.values()
+                ]
+            })
+            db_session.commit()
+            return
+        with self.lock:
+            for event_id, deadline in deadlines.items():
+                self.deadlines[event_id] = deadline
+                heapq.heappush(self.heap, (deadline, event_id))
+
+    def unschedule(self, event_id):
+        """
+        Drops the deadline of an event that no longer needs cancelling
+        :params event_id: id of the events row
+        """
+        self.unschedule_many([event_id])
+
+    def unschedule_many(self, event_ids):
+        """
+        Drops the deadlines of several events in one write
+        :params event_ids: ids of the events rows
+        """
+        if not event_ids:
+            return
+        if self.redis:
+            self.redis.zrem(self.key, *event_ids)
+            return
+        if not self.in_process:
+            CheckInDeadlineModel.query.filter(
+                CheckInDeadlineModel.event_id.in_(event_ids)
+            ).delete(synchronize_session=False)
+            db_session.commit()
+            return
+        with self.lock:
+            for event_id in event_ids:
+                self.deadlines.pop(event_id, None)
+
+    def pop_due(self, now=None, limit=1000):
+        """
+        Removes and returns the ids of the events whose deadline passed,
+        earliest first
+        :params now: UTC timestamp, defaults to the current time
+        :params limit: maximum number of deadlines to pop
+        """
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        if self.redis:
+            return [
+                int(event_id) for event_id in self.pop_due_script(
+                    keys=[self.key], args=[now, limit])
+            ]
+        if not self.in_process:
+            popped = db_session.execute(DELETE_DUE, {
+                'now': datetime.fromtimestamp(now, timezone.utc),
+                'limit': limit
+            }).fetchall()
+            db_session.commit()
+            return [event_id for event_id, _ in sorted(
+                popped, key=lambda row: (row.deadline, row.event_id))]
+        due = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now and len(due) < limit:
+                deadline, event_id = heapq.heappop(self.heap)
+                # entries of moved or dropped deadlines are skipped lazily
+                if self.deadlines.get(event_id) == deadline:
+                    del self.deadlines[event_id]
+                    due.append(event_id)
+        return due
+
+    def __len__(self):
+        if self.redis:
+            return self.redis.zcard(self.key)
+        if not self.in_process:
+            return CheckInDeadlineModel.query.count()
+        return len(self.deadlines)
+
+    def clear(self):
+        if self.redis:
+            self.redis.delete(self.key)
+            return
+        if not self.in_process:
+            CheckInDeadlineModel.query.delete()
+            db_session.commit()
+            return
+        with self.lock:
+            self.heap = []
+            self.deadlines = {}
+
+
+def schedule_event_deadlines(synced_events):
+    """
+    Schedules the check-in deadlines of synced event occurrences in one
+    write, leaving out those that already passed
+    :params synced_events: (events model, cancellation duration of the
+        room) pairs
+    """
+    now = datetime.now(timezone.utc).timestamp()
+    deadlines = {}
+    for event, cancellation_duration in synced_events:
+        deadline = check_in_deadline(event.start_time, cancellation_duration)
+        if deadline > now:
+            deadlines[event.id] = deadline
+    checkin_deadlines.schedule_many(deadlines)
+
+
+def schedule_upcoming_events():
+    """
+    Loads the deadlines of every upcoming unattended event, e.g. after
+    the deadlines were lost
+    :returns the number of deadlines scheduled
+    """
+    since = (datetime.utcnow() - timedelta(days=1)).isoformat()
+    upcoming = db_session.query(
+        EventsModel, RoomModel.cancellation_duration
+    ).join(RoomModel).filter(
+        EventsModel.state == 'active',
+        EventsModel.checked_in.isnot(True),
+        EventsModel.cancelled.isnot(True),
+        EventsModel.start_time >= since
+    )
+    scheduled = len(checkin_deadlines)
+    schedule_event_deadlines(upcoming)
+    return len(checkin_deadlines) - scheduled
+
+
+def cancel_due_events(now=None):
+    """
+    Pops the due check-in deadlines and cancels the occurrences nobody
+    checked into in one UPDATE. Occurrences that were checked into,
+    cancelled or archived in the meantime are left untouched, so popping
+    the same deadline twice is harmless
+    :params now: UTC timestamp, defaults to the current time
+    :returns the (id, event_id, room_id) of the cancelled occurrences
+    """
+    due = checkin_deadlines.pop_due(now)
+    if not due:
+        return []
+    try:
+        cancelled = db_session.execute(events.update().where(and_(
+            events.c.id.in_(due),
+            events.c.state == 'active',
+            events.c.checked_in.isnot(True),
+            events.c.cancelled.isnot(True)
+        )).values(
+            cancelled=True,
+            auto_cancelled=True
+        ).returning(
+            events.c.id, events.c.event_id, events.c.room_id
+        )).fetchall()
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        checkin_deadlines.schedule_many(dict.fromkeys(due, now or 0))
+        raise
+    return cancelled
+
+
+settings = config.get(os.getenv('APP_SETTINGS') or 'default')
+checkin_deadlines = CheckInDeadlines(redis_url=settings.REDIS_URL)
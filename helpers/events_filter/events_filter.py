@@ -144,3 +144,23 @@ def convert_date(provided_date, provided_time, time_zone):
     new_date = parser.parse(date)
     new_date_format = str(pytz.timezone(time_zone).localize(new_date))
     return new_date_format.replace(new_date_format[10], 'T')
+
+
+def parse_period(start, end, time_zone):
+    """
+    Parses the start and end of a period, localizing them to the time
+    zone when they have no UTC offset
+    :returns timezone aware start and end datetimes
+    """
+    try:
+        zone = pytz.timezone(time_zone)
+        period = [parser.parse(value) for value in (start, end)]
+    except pytz.UnknownTimeZoneError:
+        raise GraphQLError("Invalid time zone")
+    except (ValueError, OverflowError):
+        raise GraphQLError("Invalid start or end date")
+    start, end = [value if value.tzinfo else zone.localize(value)
+                  for value in period]
+    if start >= end:
+        raise GraphQLError("Start time must be lower than end time")
+    return start, end
@@ -0,0 +1,113 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import redis
+from graphql import GraphQLError, Source, parse, validate
+
+
+def query_hash(query):
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+class DocumentCache:
+    """
+    LRU cache of parsed and validated GraphQL documents keyed by the
+    sha256 of the query. It lives as long as the worker process, so an
+    operation is parsed and validated once per worker instead of on
+    every request
+    :methods
+        get
+        clear
+    """
+
+    def __init__(self, maxsize=500):
+        self.maxsize = maxsize
+        self.documents = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, schema, query):
+        """
+        :returns (document, errors) of the query, the document being None
+            when it could not be parsed
+        """
+        key = query_hash(query)
+        with self.lock:
+            if key in self.documents:
+                self.documents.move_to_end(key)
+                self.hits += 1
+                return self.documents[key]
+            self.misses += 1
+        try:
+            document = parse(Source(query, name='GraphQL request'))
+            entry = document, validate(schema, document)
+        except GraphQLError as error:
+            entry = None, [error]
+        with self.lock:
+            self.documents[key] = entry
+            while len(self.documents) > self.maxsize:
+                self.documents.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self.lock:
+            self.documents.clear()
+            self.hits = self.misses = 0
+
+
+class PersistedQueries:
+    """
+    Store of the query strings registered by clients using Automatic
+    Persisted Queries, keyed by their sha256. Queries are kept in Redis
+    when a redis_url is given, so that a query registered with one worker
+    can be used with all of them, and in a bounded in-process LRU
+    otherwise. Queries longer than max_size characters are refused
+    :methods
+        get
+        register
+        clear
+    """
+    key = 'persisted_query'
+
+    def __init__(self, redis_url=None, ttl=None, maxsize=1000,
+                 max_size=None):
+        self.redis = redis.StrictRedis.from_url(
+            redis_url) if redis_url else None
+        self.ttl = ttl
+        self.max_size = max_size
+        self.maxsize = maxsize
+        self.queries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, sha256_hash):
+        if self.redis:
+            query = self.redis.get('{}:{}'.format(self.key, sha256_hash))
+            return query.decode('utf-8') if query else None
+        with self.lock:
+            query = self.queries.get(sha256_hash)
+            if query is not None:
+                self.queries.move_to_end(sha256_hash)
+            return query
+
+    def register(self, sha256_hash, query):
+        if query_hash(query) != sha256_hash:
+            raise GraphQLError('provided sha does not match query')
+        if self.max_size and len(query) > self.max_size:
+            raise GraphQLError('Persisted query is too large')
+        if self.redis:
+            self.redis.set(
+                '{}:{}'.format(self.key, sha256_hash), query, ex=self.ttl)
+            return
+        with self.lock:
+            self.queries[sha256_hash] = query
+            self.queries.move_to_end(sha256_hash)
+            while len(self.queries) > self.maxsize:
+                self.queries.popitem(last=False)
+
+    def clear(self):
+        if self.redis:
+            for key in self.redis.scan_iter('{}:*'.format(self.key)):
+                self.redis.delete(key)
+        with self.lock:
+            self.queries.clear()
@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import copy_current_request_context
+from promise import Promise
+
+from helpers.database import db_session
+from helpers.profiling.profiling import profiled_thread
+
+# Top level fields that spend their time on analytics queries or on the
+# Google Calendar API and return plain objects, so that they can be
+# resolved away from the request's database session
+PARALLEL_FIELDS = {
+    'Query.allAnalytics',
+    'Query.analyticsForBookedRooms',
+    'Query.analyticsForDailyRoomEvents',
+    'Query.analyticsForMeetingsDurations',
+    'Query.analyticsForMeetingsPerRoom',
+    'Query.analyticsRatios',
+    'Query.analyticsRatiosPerRoom',
+    'Query.bookingsAnalyticsCount',
+    'Query.allRemoteRooms',
+    'Query.roomSchedule',
+    'Query.roomOccupants',
+    'Query.allAvailableRooms',
+}
+
+
+def resolve_in_session(fn, args, kwargs):
+    """
+    Runs a resolver on a pool thread with that thread's scoped session,
+    which is closed once the resolver returns. The thread is sampled
+    with the request when it is profiled
+    """
+    try:
+        with profiled_thread():
+            return fn(*args, **kwargs)
+    finally:
+        db_session.remove()
+
+
+class ParallelFieldExecutor:
+    """
+    graphql-core executor that resolves the PARALLEL_FIELDS of an
+    operation concurrently on a thread pool shared by the requests of
+    the worker, and every other field synchronously. Pool threads run
+    with a copy of the request context. Their results are handed back
+    on the request thread, so the selections of the fields, and the
+    fields of mutations, which are resolved one after another, keep
+    using the request's session. Operations executed with
+    return_promise share the executor until wait_until_finished
+    :methods
+        execute
+        wait_until_finished
+    """
+
+    def __init__(self, pool, fields=PARALLEL_FIELDS):
+        self.pool = pool
+        self.fields = fields
+        self.pending = []
+
+    def execute(self, fn, *args, **kwargs):
+        info = args[1]
+        field = '{}.{}'.format(info.parent_type.name, info.field_name)
+        if field not in self.fields:
+            return fn(*args, **kwargs)
+        promise = Promise()
+        future = self.pool.submit(
+            copy_current_request_context(resolve_in_session),
+            fn, args, kwargs)
+        self.pending.append((promise, future))
+        return promise
+
+    def wait_until_finished(self):
+        while self.pending:
+            pending, self.pending = self.pending, []
+            for promise, future in pending:
+                try:
+                    promise.do_resolve(future.result())
+                except Exception as error:
+                    promise.do_reject(error)
+
+
+field_pool = None
+
+
+def parallel_executor(threads):
+    """
+    Returns an executor for one request, starting the worker's thread
+    pool on first use
+    """
+    global field_pool
+    if field_pool is None:
+        field_pool = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix='graphql-field')
+    return ParallelFieldExecutor(field_pool)
@@ -0,0 +1,393 @@
+import json
+import os
+
+from flask import Response, current_app, make_response, request
+from flask_graphql import GraphQLView
+from flask_graphql.graphqlview import HttpError
+from graphql import GraphQLError
+from graphql.language import ast
+from graphql.execution import ExecutionResult
+from graphql.utils.get_operation_ast import get_operation_ast
+from promise import Promise
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.exceptions import BadRequest, MethodNotAllowed
+
+from helpers.auth.authentication import Auth
+from helpers.auth.user_details import get_user_role
+from config import config
+from helpers.database import (
+    db_session, has_replicas, set_statement_timeout
+)
+from helpers.graphql_view.document_cache import (
+    DocumentCache, PersistedQueries
+)
+from helpers.graphql_view.executor import parallel_executor
+from helpers.graphql_view.recent_writes import RecentWrites
+from helpers.metrics.metrics import (
+    current_stats, resolver_middleware, track_request
+)
+from helpers.profiling.profiling import profile_request, profiling_requested
+from helpers.query_cost.query_cost import (
+    QueryCost, check_query_cost, query_cost_limiter
+)
+from helpers.request_scope.request_scope import request_scope
+
+settings = config.get(os.getenv('APP_SETTINGS') or 'default')
+document_cache = DocumentCache(maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+persisted_queries = PersistedQueries(
+    redis_url=settings.REDIS_URL, ttl=settings.PERSISTED_QUERY_TTL,
+    max_size=settings.PERSISTED_QUERY_MAX_SIZE)
+recent_writes = RecentWrites(
+    redis_url=settings.REDIS_URL, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+
+def persisted_query_hash(data):
+    """
+    Returns the sha256 of an Automatic Persisted Queries request, sent
+    as {"persistedQuery": {"version": 1, "sha256Hash": ...}} in the
+    extensions of the request
+    """
+    extensions = request.args.get('extensions') or data.get('extensions')
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            raise HttpError(BadRequest('Extensions are invalid JSON.'))
+    persisted_query = (extensions or {}).get('persistedQuery') or {}
+    return persisted_query.get('sha256Hash')
+
+
+def top_level_fields(operation):
+    """
+    Returns the names of the top level fields an operation selects
+    """
+    if operation is None:
+        return []
+    return [selection.name.value
+            for selection in operation.selection_set.selections
+            if isinstance(selection, ast.Field)]
+
+
+def operation_label(document, operation_name):
+    """
+    Names an operation in the metrics after its first top level field.
+    The names clients give their operations are not used, so that the
+    labels are bounded by the fields of the schema
+    """
+    fields = top_level_fields(get_operation_ast(document, operation_name))
+    return fields[0] if fields else 'unknown'
+
+
+class MrmGraphQLView(GraphQLView):
+    """
+    GraphQL view that takes parsed and validated documents from the
+    document cache, accepts Automatic Persisted Queries, and rejects
+    operations going over the depth and cost limits of the user's role
+    before executing them. The role is only looked up for operations
+    the Default User limits, which are the lowest, do not allow outright.
+    With GRAPHQL_PARALLEL_EXECUTION the slow top level fields of an
+    operation are resolved concurrently.
+    A JSON array of operations is answered with the array of their
+    responses. The operations of a request share its token, user,
+    location and calendar lookups, and with GRAPHQL_PARALLEL_EXECUTION
+    the slow fields of a batch of queries are resolved together.
+    Requests, their queries and their resolvers are timed for /metrics.
+    With read replicas, queries read from them unless the token ran a
+    mutation earlier in the request or within READ_YOUR_WRITES_SECONDS.
+    A Super Admin can have a request profiled with an X-Mrm-Profile
+    header or a profile argument, and get the profile from
+    /profiles/<id>, the id being sent in the X-Mrm-Profile-Id header
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batch_executor = None
+
+    def dispatch_request(self):
+        with request_scope(), track_request(
+                current_app.config['SLOW_REQUEST_SECONDS'],
+                current_app.config['SLOW_REQUEST_TOP_QUERIES']):
+            with profile_request(
+                    self.profiling_allowed(),
+                    current_app.config['PROFILE_SAMPLE_INTERVAL']
+            ) as profiler:
+                response = self.dispatch_operations()
+            if profiler:
+                # the GraphiQL page is rendered as a string
+                response = make_response(response)
+                response.headers['X-Mrm-Profile-Id'] = profiler.id
+            return response
+
+    @staticmethod
+    def profiling_allowed():
+        if not profiling_requested():
+            return False
+        try:
+            return get_user_role() == 'Super Admin'
+        except SQLAlchemyError:
+            db_session.rollback()
+            return False
+
+    def dispatch_operations(self):
+        if not self.is_batch(request):
+            return super().dispatch_request()
+        try:
+            result, status_code = self.get_batch_response(
+                request, self.parse_batch(request))
+        except HttpError as e:
+            return Response(
+                self.json_encode(request, {
+                    'errors': [self.format_error(e)]
+                }),
+                status=e.response.code,
+                headers={'Allow': ['GET, POST']},
+                content_type='application/json'
+            )
+        return Response(
+            status=status_code,
+            response=result,
+            content_type='application/json'
+        )
+
+    @staticmethod
+    def is_batch(request):
+        return request.method.lower() == 'post' and \
+            request.mimetype == 'application/json' and \
+            request.data.lstrip().startswith(b'[')
+
+    @staticmethod
+    def parse_batch(request):
+        try:
+            operations = json.loads(request.data.decode('utf8'))
+            assert all(isinstance(operation, dict)
+                       for operation in operations)
+        except Exception:
+            raise HttpError(BadRequest('POST body sent invalid JSON.'))
+        max_size = current_app.config['GRAPHQL_MAX_BATCH_SIZE']
+        if not operations or len(operations) > max_size:
+            raise HttpError(BadRequest(
+                'Batches must hold 1 to {} operations.'.format(max_size)))
+        return operations
+
+    def get_batch_response(self, request, operations):
+        """
+        Executes the operations of a batch in order, or together when
+        they are all queries and parallel execution is enabled
+        :returns the JSON array of the responses and the highest status
+        """
+        if current_app.config['GRAPHQL_PARALLEL_EXECUTION'] and all(
+                self.operation_type(operation) == 'query'
+                for operation in operations):
+            self.batch_executor = parallel_executor(
+                current_app.config['GRAPHQL_EXECUTOR_THREADS'])
+        results = []
+        for operation in operations:
+            query, variables, operation_name, _ = self.get_graphql_params(
+                request, operation)
+            results.append(self.execute_graphql_request(
+                operation, query, variables, operation_name))
+        if self.batch_executor:
+            self.batch_executor.wait_until_finished()
+        responses = [self.encode_result(request, result)
+                     for result in results]
+        return '[{}]'.format(','.join(
+            response for response, _ in responses)), max(
+            status_code for _, status_code in responses)
+
+    def operation_type(self, data):
+        """
+        Returns the type of the operation of a request, None when it
+        cannot be told
+        """
+        query, _, operation_name, _ = self.get_graphql_params(request, data)
+        sha256_hash = persisted_query_hash(data)
+        query = query or (sha256_hash and persisted_queries.get(sha256_hash))
+        if not query:
+            return None
+        document, errors = document_cache.get(self.schema, query)
+        operation = None if errors else get_operation_ast(
+            document, operation_name)
+        return operation.operation if operation else None
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, _ = self.get_graphql_params(
+            request, data)
+        return self.encode_result(
+            request,
+            self.execute_graphql_request(
+                data, query, variables, operation_name, show_graphiql),
+            show_graphiql)
+
+    def encode_result(self, request, execution_result, show_graphiql=False):
+        if isinstance(execution_result, Promise):
+            execution_result = execution_result.get()
+        if not execution_result:
+            return None, 200
+        response = {}
+        if execution_result.errors:
+            response['errors'] = [
+                self.format_error(e) for e in execution_result.errors]
+        if execution_result.invalid:
+            status_code = 400
+        else:
+            status_code = 200
+            response['data'] = execution_result.data
+        return self.json_encode(
+            request, response, show_graphiql), status_code
+
+    def get_middleware(self, request):
+        return resolver_middleware
+
+    def get_executor(self, request):
+        if self.batch_executor:
+            return self.batch_executor
+        if current_app.config['GRAPHQL_PARALLEL_EXECUTION']:
+            return parallel_executor(
+                current_app.config['GRAPHQL_EXECUTOR_THREADS'])
+        return super().get_executor(request)
+
+    def execute_graphql_request(self, data, query, variables,
+                                operation_name, show_graphiql=False):
+        try:
+            query = self.resolve_persisted_query(data, query)
+        except GraphQLError as error:
+            return ExecutionResult(errors=[error], invalid=True)
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(BadRequest('Must provide query string.'))
+
+        document, errors = document_cache.get(self.schema, query)
+        if errors:
+            return ExecutionResult(errors=errors, invalid=True)
+
+        operation = self.operation_over_get(document, operation_name)
+        if operation:
+            if show_graphiql:
+                return None
+            raise HttpError(MethodNotAllowed(
+                ['POST'],
+                'Can only perform a {} operation from a POST '
+                'request.'.format(operation)))
+
+        try:
+            return self.execute(
+                document,
+                root_value=self.get_root_value(request),
+                variable_values=variables or {},
+                operation_name=operation_name,
+                context_value=self.get_context(request),
+                middleware=self.get_middleware(request),
+                executor=self.get_executor(request)
+            )
+        except Exception as e:
+            return ExecutionResult(errors=[e], invalid=True)
+
+    @staticmethod
+    def operation_over_get(document, operation_name):
+        """
+        Returns the type of the operation when it is not a query sent
+        with GET
+        """
+        if request.method.lower() != 'get':
+            return None
+        operation = get_operation_ast(document, operation_name)
+        if operation and operation.operation != 'query':
+            return operation.operation
+        return None
+
+    def resolve_persisted_query(self, data, query):
+        """
+        Registers the query of a persisted query request, or returns the
+        registered query when only its hash was sent. Only valid queries
+        sent with a token are registered
+        """
+        sha256_hash = persisted_query_hash(data)
+        if not sha256_hash:
+            return query
+        if query:
+            _, errors = document_cache.get(self.schema, query)
+            if not errors and isinstance(Auth.decode_token(), dict):
+                persisted_queries.register(sha256_hash, query)
+            return query
+        query = persisted_queries.get(sha256_hash)
+        if not query:
+            raise GraphQLError('PersistedQueryNotFound')
+        return query
+
+    def execute(self, document, *args, **kwargs):
+        operation = get_operation_ast(document, kwargs.get('operation_name'))
+        current_stats().operations.append(
+            operation_label(document, kwargs.get('operation_name')))
+        self.apply_statement_timeout(operation)
+        self.route_reads(operation)
+        try:
+            self.check_cost(
+                document, kwargs.get('operation_name'),
+                kwargs.get('variable_values'))
+        except GraphQLError as error:
+            return ExecutionResult(errors=[error], invalid=True)
+        if self.batch_executor:
+            kwargs['return_promise'] = True
+        return super().execute(document, *args, **kwargs)
+
+    @staticmethod
+    def apply_statement_timeout(operation):
+        """
+        Gives the transactions of the operation the smallest statement
+        timeout of its top level fields, or the default one when none of
+        them has one
+        """
+        timeouts = current_app.config['DB_OPERATION_STATEMENT_TIMEOUTS']
+        milliseconds = min((
+            timeouts[field] for field in top_level_fields(operation)
+            if field in timeouts), default=None)
+        if milliseconds == request.environ.get('mrm.statement_timeout'):
+            return
+        request.environ['mrm.statement_timeout'] = milliseconds
+        set_statement_timeout(db_session.connection(), milliseconds)
+
+    @staticmethod
+    def route_reads(operation):
+        """
+        Lets the reads of a query go to a replica, unless its token has
+        written recently. Mutations are remembered as writes of the token
+        """
+        if not has_replicas():
+            return
+        token = Auth.get_token()
+        if operation is not None and operation.operation == 'mutation':
+            request.environ['mrm.wrote'] = True
+            recent_writes.add(token)
+        request.environ['mrm.read_only'] = operation is not None and \
+            operation.operation == 'query' and \
+            not request.environ.get('mrm.wrote') and \
+            not recent_writes.contains(token)
+
+    def check_cost(self, document, operation_name, variables):
+        """
+        Checks the operation against the limits of the user's role. The
+        operations of a batch add up, so their total cost is held to the
+        cost limit and charged to the token's budget once it is expensive
+        """
+        depth, cost = QueryCost(
+            self.schema, current_app.config['QUERY_DEFAULT_LIST_SIZE']
+        ).analyse(document, operation_name, variables)
+        cost += request.environ.get('mrm.request_cost', 0)
+        limits = current_app.config['QUERY_COST_LIMITS']
+        default_limits = limits['Default User']
+        if depth > default_limits['depth'] or \
+                cost >= default_limits['expensive']:
+            try:
+                role = get_user_role()
+            except SQLAlchemyError:
+                db_session.rollback()
+                role = None
+            role_limits = limits.get(role, default_limits)
+            charged = request.environ.get('mrm.charged_cost', 0)
+            check_query_cost(
+                depth, cost, role_limits, query_cost_limiter,
+                Auth.get_token(), charged)
+            if cost >= role_limits['expensive']:
+                request.environ['mrm.charged_cost'] = cost
+        request.environ['mrm.request_cost'] = cost
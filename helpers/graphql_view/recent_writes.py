@@ -0,0 +1,56 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+
+
+class RecentWrites:
+    """
+    Remembers the tokens that ran a mutation in the last ttl seconds, so
+    that their queries read from the primary until the replicas have
+    caught up. Tokens are kept hashed in Redis when a redis_url is given,
+    so that every worker knows them, and in a bounded in-process store
+    otherwise
+    :methods
+        add
+        contains
+    """
+    key = 'recent_write'
+
+    def __init__(self, redis_url=None, ttl=10, maxsize=10000):
+        self.redis = redis.StrictRedis.from_url(
+            redis_url) if redis_url else None
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.writes = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def token_hash(token):
+        return hashlib.sha256((token or '').encode('utf-8')).hexdigest()
+
+    def add(self, token):
+        token_hash = self.token_hash(token)
+        if self.redis:
+            self.redis.set(
+                '{}:{}'.format(self.key, token_hash), 1, ex=self.ttl)
+            return
+        with self.lock:
+            self.writes.pop(token_hash, None)
+            self.writes[token_hash] = time.monotonic() + self.ttl
+            while len(self.writes) > self.maxsize:
+                self.writes.popitem(last=False)
+
+    def contains(self, token):
+        token_hash = self.token_hash(token)
+        if self.redis:
+            return bool(self.redis.exists(
+                '{}:{}'.format(self.key, token_hash)))
+        with self.lock:
+            expires = self.writes.get(token_hash)
+            if expires is not None and expires <= time.monotonic():
+                del self.writes[token_hash]
+                expires = None
+            return expires is not None
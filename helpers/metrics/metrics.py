@@ -0,0 +1,241 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import has_request_context, request
+from graphql.execution.middleware import MiddlewareManager
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """
+    Prometheus histogram with one label, kept in the memory of the worker
+    :methods
+        observe
+        render
+    """
+
+    def __init__(self, name, documentation, label, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, label_value, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_value)
+            if series is None:
+                series = self.series[label_value] = {
+                    'buckets': [0] * len(self.buckets), 'sum': 0, 'count': 0}
+            if index < len(self.buckets):
+                series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [
+            '# HELP {} {}'.format(self.name, self.documentation),
+            '# TYPE {} histogram'.format(self.name)
+        ]
+        with self.lock:
+            series = sorted(
+                (label_value, dict(values, buckets=list(values['buckets'])))
+                for label_value, values in self.series.items())
+        for label_value, values in series:
+            label = '{}="{}"'.format(self.label, escape(label_value))
+            cumulative = 0
+            for bound, count in zip(self.buckets, values['buckets']):
+                cumulative += count
+                lines.append('{}_bucket{{{},le="{}"}} {}'.format(
+                    self.name, label, bound, cumulative))
+            lines.append('{}_bucket{{{},le="+Inf"}} {}'.format(
+                self.name, label, values['count']))
+            lines.append('{}_sum{{{}}} {}'.format(
+                self.name, label, round(values['sum'], 6)))
+            lines.append('{}_count{{{}}} {}'.format(
+                self.name, label, values['count']))
+        return '\n'.join(lines)
+
+
+def escape(label_value):
+    return str(label_value).replace('\\', '\\\\').replace(
+        '"', '\\"').replace('\n', '\\n')
+
+
+request_seconds = Histogram(
+    'mrm_request_seconds', 'Time spent answering /mrm requests',
+    'operation', DURATION_BUCKETS)
+request_queries = Histogram(
+    'mrm_request_queries', 'SQL queries run per /mrm request',
+    'operation', QUERY_COUNT_BUCKETS)
+request_db_seconds = Histogram(
+    'mrm_request_db_seconds', 'Time spent in the database per /mrm request',
+    'operation', DURATION_BUCKETS)
+resolver_seconds = Histogram(
+    'mrm_resolver_seconds', 'Time spent in GraphQL resolvers',
+    'field', DURATION_BUCKETS)
+external_call_seconds = Histogram(
+    'mrm_external_call_seconds', 'Time spent calling external services',
+    'service', DURATION_BUCKETS)
+HISTOGRAMS = (request_seconds, request_queries, request_db_seconds,
+              resolver_seconds, external_call_seconds)
+
+
+def render_pool_stats(stats):
+    """
+    Returns the stats of the database connection pool as gauges
+    """
+    lines = []
+    for name, value in sorted(stats.items()):
+        lines += [
+            '# HELP mrm_db_pool_{} Database connection pool {}'.format(
+                name, name.replace('_', ' ')),
+            '# TYPE mrm_db_pool_{} gauge'.format(name),
+            'mrm_db_pool_{} {}'.format(name, value)
+        ]
+    return '\n'.join(lines)
+
+
+def render_metrics(pool_stats=None, events_without_time_range=None):
+    """
+    Returns the histograms, and the stats of the database connection
+    pool and the number of events without a time range when given, in
+    the Prometheus text format
+    """
+    metrics = [histogram.render() for histogram in HISTOGRAMS]
+    if pool_stats:
+        metrics.append(render_pool_stats(pool_stats))
+    if events_without_time_range is not None:
+        metrics.append('\n'.join([
+            '# HELP mrm_events_without_time_range Events whose times '
+            'could not be parsed, they never make a room busy',
+            '# TYPE mrm_events_without_time_range gauge',
+            'mrm_events_without_time_range {}'.format(
+                events_without_time_range)
+        ]))
+    return '\n'.join(metrics) + '\n'
+
+
+class RequestStats:
+    """
+    Queries and operations of one request, shared through the WSGI
+    environ with the threads resolving fields for it
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.operations = []
+        self.queries = []
+
+    @property
+    def operation(self):
+        if len(self.operations) == 1:
+            return self.operations[0]
+        return 'batch' if self.operations else 'none'
+
+    def top_queries(self, count):
+        return sorted(self.queries, key=lambda query: -query[1])[:count]
+
+
+def current_stats():
+    if not has_request_context():
+        return None
+    return request.environ.get('mrm.request_stats')
+
+
+@contextmanager
+def track_request(slow_seconds, top_queries):
+    """
+    Records the duration, queries and database time of the request made
+    in the block, and logs requests taking slow_seconds or more with
+    their top_queries slowest queries
+    """
+    stats = request.environ['mrm.request_stats'] = RequestStats()
+    try:
+        yield stats
+    finally:
+        elapsed = time.perf_counter() - stats.started
+        db_seconds = sum(seconds for _, seconds in stats.queries)
+        request_seconds.observe(stats.operation, elapsed)
+        request_queries.observe(stats.operation, len(stats.queries))
+        request_db_seconds.observe(stats.operation, db_seconds)
+        if elapsed >= slow_seconds:
+            logger.warning(
+                'Slow request %s: %.3fs, %s queries taking %.3fs%s',
+                stats.operation, elapsed, len(stats.queries), db_seconds,
+                ''.join('\n  %.3fs %s' % (seconds, statement[:1000])
+                        for statement, seconds in stats.top_queries(
+                            top_queries)))
+
+
+@contextmanager
+def external_call(service):
+    """
+    Times a call to an external service
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        external_call_seconds.observe(
+            service, time.perf_counter() - started)
+
+
+class ResolverTiming:
+    """
+    graphql-core middleware timing every resolver
+    """
+
+    def resolve(self, next, root, info, **args):
+        started = time.perf_counter()
+        try:
+            return next(root, info, **args)
+        finally:
+            resolver_seconds.observe(
+                '{}.{}'.format(info.parent_type.name, info.field_name),
+                time.perf_counter() - started)
+
+
+# wrap_in_promise would turn the result of every resolver into a promise
+resolver_middleware = MiddlewareManager(ResolverTiming(), wrap_in_promise=False)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context,
+                         executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    stats = current_stats()
+    if stats is not None:
+        stats.queries.append((statement, elapsed))
+
+
+def handle_error(context):
+    connection = context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+
+def instrument_engine(engine):
+    """
+    Counts the queries of the engine, and their time, per request
+    """
+    if not event.contains(engine, 'before_cursor_execute',
+                          before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+        event.listen(engine, 'handle_error', handle_error)
@@ -3,6 +3,7 @@ import itertools
 import graphene
 from math import ceil
 from graphql import GraphQLError
+from sqlalchemy import func
 
 
 class Paginate(graphene.ObjectType):
@@ -16,42 +17,55 @@ class Paginate(graphene.ObjectType):
         self.page = kwargs.pop('page', None)
         self.per_page = kwargs.pop('per_page', None)
         self.unique = kwargs.pop('unique', None)
-        self.query_total
-        self.pages
+        self.with_total = kwargs.pop('with_total', None) is not False
+        self.query_total = None
+        self.pages = None
+        self.has_more = None
         self.filter_data = {}
         self.filter_data.update(**kwargs)
 
-    def resolve_pages(self, pages):
-        if self.per_page:
-            self.pages = ceil(self.query_total / self.per_page)
-        pages = self.pages
-        return pages
-
-    def resolve_has_next(self, has_next):
-        if self.page:
-            page = self.page
-            pages = self.pages
-            pages = self.resolve_pages(pages)
-            if page < pages:
-                has_next = True
-            else:
-                has_next = False
-        return has_next
-
-    def resolve_has_previous(self, has_previous):
-        if self.page:
-            page = self.page
-            pages = self.resolve_pages(self.pages)
-            if (page > 1) and (pages > 1) and (page <= pages):
-                has_previous = True
-            else:
-                has_previous = False
-
-        return has_previous
-
-    def resolve_current_page(self, pages):
-        pages = self.resolve_pages(pages)
-        if self.page > pages:
+    def paginate(self, query):
+        """
+        Returns the requested page of the query and caches the page
+        metadata. The total is read from a count(*) OVER() column
+        fetched with the page rows, when the client opts out of totals
+        one extra row is fetched to tell whether a next page exists.
+        :params query: ordered query to paginate
+        """
+        offset = validate_page(self.page) * self.per_page
+        if not self.with_total:
+            rows = query.limit(self.per_page + 1).offset(offset).all()
+            self.has_more = len(rows) > self.per_page
+            return rows[:self.per_page]
+        rows = query.add_columns(
+            func.count().over().label('query_total')
+        ).limit(self.per_page).offset(offset).all()
+        if rows:
+            self.query_total = rows[0].query_total
+        else:
+            self.query_total = query.order_by(None).count()
+        self.pages = ceil(self.query_total / self.per_page)
+        return [row[0] for row in rows]
+
+    def resolve_pages(self, info):
+        return self.pages
+
+    def resolve_has_next(self, info):
+        if not self.page:
+            return None
+        if self.pages is None:
+            return self.has_more
+        return self.page < self.pages
+
+    def resolve_has_previous(self, info):
+        if not self.page:
+            return None
+        if self.pages is None:
+            return self.page > 1
+        return 1 < self.page <= self.pages
+
+    def resolve_current_page(self, info):
+        if self.pages is not None and self.page > self.pages:
             raise GraphQLError("Page does not exist")
         return self.page
 
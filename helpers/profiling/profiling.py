@@ -0,0 +1,168 @@
+import os
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+import redis
+from flask import has_request_context, request
+
+from config import config
+
+settings = config.get(os.getenv('APP_SETTINGS') or 'default')
+
+
+def frame_name(frame):
+    return '{}:{}'.format(
+        frame.f_globals.get('__name__', '?'), frame.f_code.co_name)
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of the threads working on a request every
+    interval seconds from a background thread, so that the profiled
+    code runs unchanged. The samples are counted per stack and written
+    in the collapsed format of flamegraph.pl and speedscope
+    :methods
+        add_thread
+        remove_thread
+        start
+        stop
+        collapsed
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.id = uuid.uuid4().hex
+        self.threads = set()
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self.sample, daemon=True)
+
+    def add_thread(self, ident):
+        self.threads.add(ident)
+
+    def remove_thread(self, ident):
+        self.threads.discard(ident)
+
+    def start(self):
+        self.sampler.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.sampler.join()
+
+    def sample(self):
+        while not self.stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for ident in list(self.threads):
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(frame_name(frame))
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[';'.join(reversed(stack))] += 1
+                    self.samples += 1
+
+    def collapsed(self):
+        return ''.join('{} {}\n'.format(stack, count)
+                       for stack, count in sorted(self.stacks.items()))
+
+
+class ProfileStore:
+    """
+    Store of the collapsed stacks of profiled requests, keyed by the id
+    of their profile. Profiles are kept in Redis for ttl seconds when a
+    redis_url is given, so that any worker can return them, and in a
+    bounded in-process LRU otherwise
+    :methods
+        get
+        save
+    """
+    key = 'profile'
+
+    def __init__(self, redis_url=None, ttl=None, maxsize=50):
+        self.redis = redis.StrictRedis.from_url(
+            redis_url) if redis_url else None
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.profiles = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, profile_id):
+        if self.redis:
+            profile = self.redis.get('{}:{}'.format(self.key, profile_id))
+            return profile.decode('utf-8') if profile is not None else None
+        with self.lock:
+            return self.profiles.get(profile_id)
+
+    def save(self, profile_id, collapsed):
+        if self.redis:
+            self.redis.set(
+                '{}:{}'.format(self.key, profile_id), collapsed, ex=self.ttl)
+            return
+        with self.lock:
+            self.profiles[profile_id] = collapsed
+            while len(self.profiles) > self.maxsize:
+                self.profiles.popitem(last=False)
+
+
+profiles = ProfileStore(redis_url=settings.REDIS_URL, ttl=settings.PROFILE_TTL)
+
+
+def profiling_requested():
+    """
+    Tells whether the request asks to be profiled, with an
+    X-Mrm-Profile header or a profile argument
+    """
+    flag = request.headers.get('X-Mrm-Profile') or \
+        request.args.get('profile') or ''
+    return flag.lower() in ('1', 'true', 'yes')
+
+
+def current_profiler():
+    if not has_request_context():
+        return None
+    return request.environ.get('mrm.profiler')
+
+
+@contextmanager
+def profile_request(enabled, interval):
+    """
+    Samples the block, and the pool threads resolving fields for the
+    request, when enabled and saves the profile once it exits
+    :returns the profiler, None when not enabled
+    """
+    if not enabled:
+        yield None
+        return
+    profiler = request.environ['mrm.profiler'] = SamplingProfiler(interval)
+    profiler.add_thread(threading.get_ident())
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        request.environ['mrm.profiler'] = None
+        profiles.save(profiler.id, profiler.collapsed())
+
+
+@contextmanager
+def profiled_thread():
+    """
+    Adds the current thread to the samples of the request's profiler
+    while the block runs
+    """
+    profiler = current_profiler()
+    if profiler is None:
+        yield
+        return
+    profiler.add_thread(threading.get_ident())
+    try:
+        yield
+    finally:
+        profiler.remove_thread(threading.get_ident())
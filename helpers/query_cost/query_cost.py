@@ -0,0 +1,265 @@
+import hashlib
+import math
+import os
+import threading
+import time
+
+import redis
+from dateutil import parser
+from graphql import GraphQLError
+from graphql.language import ast
+from graphql.type.definition import (
+    GraphQLList, GraphQLNonNull, GraphQLObjectType, GraphQLInterfaceType,
+    GraphQLUnionType
+)
+from graphql.utils.get_operation_ast import get_operation_ast
+
+from config import config
+
+# Cost of resolving a field before its selections are counted. Analytics
+# fields scan events, and are charged per month of the range they cover,
+# while the others wait on the Google Calendar API
+FIELD_COSTS = {
+    'Query.allAnalytics': 200,
+    'Query.analyticsForBookedRooms': 100,
+    'Query.analyticsForDailyRoomEvents': 100,
+    'Query.analyticsForMeetingsDurations': 100,
+    'Query.analyticsForMeetingsPerRoom': 100,
+    'Query.analyticsRatios': 100,
+    'Query.analyticsRatiosPerRoom': 100,
+    'Query.bookingsAnalyticsCount': 100,
+    'Query.allRemoteRooms': 200,
+    'Query.roomSchedule': 100,
+    'Query.roomOccupants': 100,
+    'Query.validateRoomsCalendarIds': 500,
+    'Query.allAvailableRooms': 20,
+    'Mutation.bookEvent': 50,
+    'Mutation.syncEventData': 500,
+}
+# Arguments bounding the number of items a list field returns
+SIZE_ARGUMENTS = ('perPage', 'limit', 'first')
+
+
+def named_type(field_type):
+    while isinstance(field_type, (GraphQLList, GraphQLNonNull)):
+        field_type = field_type.of_type
+    return field_type
+
+
+def is_list(field_type):
+    if isinstance(field_type, GraphQLNonNull):
+        field_type = field_type.of_type
+    return isinstance(field_type, GraphQLList)
+
+
+def argument_value(value, variables):
+    if isinstance(value, ast.Variable):
+        return variables.get(value.name.value)
+    if isinstance(value, ast.IntValue):
+        return int(value.value)
+    if isinstance(value, (ast.StringValue, ast.EnumValue)):
+        return value.value
+    if isinstance(value, ast.BooleanValue):
+        return value.value
+    return None
+
+
+def months_in_range(arguments):
+    """
+    Returns the number of started months between the startDate and
+    endDate arguments of a field, 1 when they are missing or invalid
+    """
+    try:
+        start = parser.parse(arguments['startDate'])
+        end = parser.parse(arguments['endDate'])
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return 1
+    return max(1, math.ceil(((end - start).days + 1) / 31))
+
+
+class QueryCost:
+    """
+    Estimates the depth and cost of a GraphQL operation from its
+    document, before it is executed. A field costs its FIELD_COSTS
+    weight plus 1 for every object it returns with the cost of the
+    object's selections. List fields are assumed to return the page
+    size the field or its parent asks for, or default_list_size items
+    :methods
+        analyse
+    """
+
+    def __init__(self, schema, default_list_size=10):
+        self.schema = schema
+        self.default_list_size = default_list_size
+
+    def analyse(self, document, operation_name=None, variables=None):
+        """
+        :params document: parsed GraphQL document
+        :returns (depth, cost) of the operation that would be executed
+        """
+        operation = get_operation_ast(document, operation_name)
+        if not operation:
+            return 0, 0
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, ast.FragmentDefinition)
+        }
+        self.variables = variables or {}
+        root = self.schema.get_mutation_type() \
+            if operation.operation == 'mutation' \
+            else self.schema.get_query_type()
+        return self.selection_cost(root, operation.selection_set, None, set())
+
+    def fields(self, parent_type, selection_set, visited):
+        """
+        Yields the (type, field) pairs of a selection set, following
+        fragments once each
+        """
+        for selection in selection_set.selections:
+            if isinstance(selection, ast.Field):
+                yield parent_type, selection
+                continue
+            if isinstance(selection, ast.FragmentSpread):
+                name = selection.name.value
+                if name in visited or name not in self.fragments:
+                    continue
+                visited = visited | {name}
+                fragment = self.fragments[name]
+            else:
+                fragment = selection
+            fragment_type = parent_type
+            if fragment.type_condition:
+                fragment_type = self.schema.get_type(
+                    fragment.type_condition.name.value) or parent_type
+            for field in self.fields(
+                    fragment_type, fragment.selection_set, visited):
+                yield field
+
+    def selection_cost(self, parent_type, selection_set, size, visited):
+        depth = cost = 0
+        for field_parent, field in self.fields(
+                parent_type, selection_set, visited):
+            field_depth, field_cost = self.field_cost(
+                field_parent, field, size, visited)
+            depth = max(depth, field_depth)
+            cost += field_cost
+        return depth, cost
+
+    def field_cost(self, parent_type, field, size, visited):
+        name = field.name.value
+        if name.startswith('__'):
+            return 0, 0
+        definition = None
+        if isinstance(parent_type, (GraphQLObjectType, GraphQLInterfaceType)):
+            definition = parent_type.fields.get(name)
+        if not definition:
+            return 1, 0
+        arguments = {
+            argument.name.value: argument_value(argument.value, self.variables)
+            for argument in field.arguments or []
+        }
+        field_type = named_type(definition.type)
+        weight = FIELD_COSTS.get(
+            '{}.{}'.format(parent_type.name, name), 0)
+        weight *= months_in_range(arguments)
+        item_cost = 1 if isinstance(field_type, (
+            GraphQLObjectType, GraphQLInterfaceType, GraphQLUnionType)) else 0
+        own_size = next((
+            arguments[argument] for argument in SIZE_ARGUMENTS
+            if isinstance(arguments.get(argument), int)), None)
+        depth = 0
+        if field.selection_set:
+            depth, selection_cost = self.selection_cost(
+                field_type, field.selection_set, own_size, visited)
+            item_cost += selection_cost
+        if is_list(definition.type):
+            item_cost *= own_size or size or self.default_list_size
+        return depth + 1, weight + item_cost
+
+
+class QueryCostLimiter:
+    """
+    Per token budget of query cost over fixed windows, kept in Redis when
+    a redis_url is given so that all the API workers share it, and in
+    process memory otherwise
+    :methods
+        spend
+        clear
+    """
+    key = 'query_cost'
+
+    def __init__(self, redis_url=None, window=60):
+        self.redis = redis.StrictRedis.from_url(
+            redis_url) if redis_url else None
+        self.window = window
+        self.spent = {}
+        self.lock = threading.Lock()
+
+    def spend(self, token, cost, limit):
+        """
+        Charges the cost to the token unless it would exceed the limit
+        within the current window
+        :returns seconds until the budget is renewed when it is exhausted,
+            otherwise 0
+        """
+        now = time.time()
+        window = int(now // self.window)
+        retry_after = int(math.ceil((window + 1) * self.window - now))
+        digest = hashlib.sha256((token or '').encode()).hexdigest()[:32]
+        key = '{}:{}:{}'.format(self.key, digest, window)
+        if self.redis:
+            pipeline = self.redis.pipeline()
+            pipeline.incrby(key, cost)
+            pipeline.expire(key, self.window)
+            spent = pipeline.execute()[0]
+            if spent > limit:
+                self.redis.decrby(key, cost)
+                return retry_after
+            return 0
+        with self.lock:
+            for stale in [stale for stale in self.spent
+                          if stale[1] != window]:
+                del self.spent[stale]
+            spent = self.spent.get((digest, window), 0) + cost
+            if spent > limit:
+                return retry_after
+            self.spent[(digest, window)] = spent
+        return 0
+
+    def clear(self):
+        if self.redis:
+            for key in self.redis.scan_iter('{}:*'.format(self.key)):
+                self.redis.delete(key)
+        with self.lock:
+            self.spent = {}
+
+
+def check_query_cost(depth, cost, limits, limiter, token, charged=0):
+    """
+    Raises a GraphQLError when an operation goes over the depth or cost
+    limits of the user's role, or when an expensive operation goes over
+    the token's cost budget
+    :params cost: cost of the request up to and including the operation
+    :params limits: dict with depth, cost, expensive and rate limits
+    :params charged: part of the cost already charged to the budget
+    """
+    if depth > limits['depth']:
+        raise GraphQLError(
+            'Query is too deep: depth {} exceeds the limit of {}'.format(
+                depth, limits['depth']))
+    if cost > limits['cost']:
+        raise GraphQLError(
+            'Query is too expensive: cost {} exceeds the limit of {}'.format(
+                cost, limits['cost']))
+    if cost >= limits['expensive']:
+        retry_after = limiter.spend(token, cost - charged, limits['rate'])
+        if retry_after:
+            raise GraphQLError(
+                'Too many expensive queries, retry in {} seconds'.format(
+                    retry_after))
+
+
+settings = config.get(os.getenv('APP_SETTINGS') or 'default')
+query_cost_limiter = QueryCostLimiter(
+    redis_url=settings.REDIS_URL, window=settings.QUERY_COST_WINDOW)
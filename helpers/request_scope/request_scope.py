@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+
+from flask import g, has_app_context
+
+
+@contextmanager
+def request_scope():
+    """
+    Shares the lookups made in the block, e.g. by every operation of a
+    batched /mrm request. Nested scopes use the outer one
+    """
+    if g.get('lookups') is not None:
+        yield
+        return
+    g.lookups = {}
+    try:
+        yield
+    finally:
+        g.lookups = None
+
+
+def cached(key, load):
+    """
+    Returns the value of load, called once per request scope and key.
+    Outside a scope, and when load returns None, nothing is cached
+    :params key: hashable identifying the lookup
+    :params load: function making the lookup
+    """
+    lookups = g.get('lookups') if has_app_context() else None
+    if lookups is None:
+        return load()
+    if key not in lookups:
+        value = load()
+        if value is None:
+            return value
+        lookups[key] = value
+    return lookups[key]
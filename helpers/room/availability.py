@@ -0,0 +1,95 @@
+from sqlalchemy import and_, exists, func
+
+from api.events.models import BookingHold, Events as EventsModel
+from api.room.models import Room as RoomModel
+from helpers.calendar.credentials import credentials
+from helpers.database import db_session
+
+# Calendars the free/busy API accepts per request
+FREE_BUSY_BATCH_SIZE = 50
+
+
+def events_without_time_range():
+    """
+    Returns the number of events whose times the events_set_time_range
+    trigger could not parse, counted from a partial index
+    """
+    return db_session.query(func.count(EventsModel.id)).filter(
+        EventsModel.time_range.is_(None)).scalar()
+
+
+def available_rooms(location_id, start_time, end_time):
+    """
+    Returns the active rooms of a location without a synced booking
+    overlapping the period, answered by the GiST index on the events
+    time ranges
+    :params location_id
+    :params start_time, end_time: ISO timestamps with a UTC offset
+    :returns list of (calendar_id, name) ordered by room name
+    """
+    period = func.tstzrange(start_time, end_time, '[)')
+    booked = exists().where(and_(
+        EventsModel.room_id == RoomModel.id,
+        EventsModel.state == 'active',
+        EventsModel.cancelled.isnot(True),
+        EventsModel.time_range.op('&&')(period)
+    ))
+    return db_session.query(RoomModel.calendar_id, RoomModel.name).filter(
+        RoomModel.location_id == location_id,
+        RoomModel.state == 'active',
+        RoomModel.calendar_id.isnot(None),
+        ~booked
+    ).order_by(RoomModel.name).all()
+
+
+def booked_rooms(room_ids, start_time, end_time):
+    """
+    Returns the rooms with a synced booking or a live booking hold
+    overlapping the period
+    :params room_ids: rooms to check
+    :params start_time, end_time: timezone aware datetimes or ISO
+        timestamps with a UTC offset
+    :returns set of room ids
+    """
+    if not room_ids:
+        return set()
+    period = func.tstzrange(start_time, end_time, '[)')
+    events = db_session.query(EventsModel.room_id).filter(
+        EventsModel.room_id.in_(room_ids),
+        EventsModel.state == 'active',
+        EventsModel.cancelled.isnot(True),
+        EventsModel.time_range.op('&&')(period)
+    )
+    holds = db_session.query(BookingHold.room_id).filter(
+        BookingHold.room_id.in_(room_ids),
+        BookingHold.expires_at > func.now(),
+        BookingHold.time_range.op('&&')(period)
+    )
+    return {room_id for room_id, in events.union(holds)}
+
+
+def busy_calendars(calendar_ids, start_time, end_time, time_zone):
+    """
+    Asks the calendar free/busy API which of the calendars are busy in
+    the period, batching the calendars into as few requests as possible
+    :params calendar_ids: calendars to check
+    :returns set of busy calendar ids
+    """
+    if not calendar_ids:
+        return set()
+    service = credentials.set_api_credentials()
+    busy = set()
+    for start in range(0, len(calendar_ids), FREE_BUSY_BATCH_SIZE):
+        response = service.freebusy().query(body={
+            "timeMin": start_time,
+            "timeMax": end_time,
+            "timeZone": time_zone,
+            "items": [
+                {"id": calendar_id} for calendar_id in
+                calendar_ids[start:start + FREE_BUSY_BATCH_SIZE]
+            ]
+        }).execute()
+        busy.update(
+            calendar_id for calendar_id, calendar in
+            response['calendars'].items() if calendar.get('busy'))
+    return busy
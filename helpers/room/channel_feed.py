@@ -0,0 +1,42 @@
+from api.channels.models import channel_changes_since, current_channel_version
+from helpers.room.subscriber import active_channels
+
+
+def channel_feed(since_version=None, version=None):
+    """
+    Returns the notification channels with the version they reflect.
+    Given since_version, only the channels added, changed or removed
+    after it are returned
+    :params since_version: last version the poller has seen
+    :params version: current channel version, when already read
+    :returns dict of version, channels and removed_channels
+    """
+    if version is None:
+        version = current_channel_version()
+    if since_version is None:
+        return {
+            'version': version,
+            'channels': [
+                {'calendar_id': calendar_id, 'firebase_token': firebase_token}
+                for calendar_id, firebase_token in active_channels().items()
+            ],
+            'removed_channels': []
+        }
+    changes = channel_changes_since(since_version)
+    return {
+        'version': max(
+            [version, since_version] + [change.version for change in changes]),
+        'channels': [
+            {'calendar_id': change.calendar_id,
+             'firebase_token': change.firebase_token}
+            for change in changes if not change.removed
+        ],
+        'removed_channels': [
+            change.calendar_id for change in changes if change.removed
+        ]
+    }
+
+
+def channel_feed_etag(since_version, version):
+    return '{}:{}'.format(
+        'all' if since_version is None else since_version, version)
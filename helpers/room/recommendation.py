@@ -0,0 +1,187 @@
+import heapq
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import event, func
+
+from api.room.models import Room as RoomModel, RoomResource, tags
+from api.room_resource.models import Resource
+from api.tag.models import Tag
+from config import Config
+from helpers.database import db_session
+
+RoomFeatures = namedtuple('RoomFeatures', [
+    'id', 'name', 'calendar_id', 'capacity', 'resources', 'labels'])
+
+Recommendation = namedtuple('Recommendation', [
+    'room_id', 'capacity_waste', 'extra_resources'])
+
+
+def load_room_features(condition):
+    """
+    Loads the features of the active rooms matching a condition
+    :params condition: SQLAlchemy condition on the rooms
+    :returns dict of location id to list of RoomFeatures
+    """
+    rooms = db_session.query(
+        RoomModel.id, RoomModel.location_id, RoomModel.name,
+        RoomModel.calendar_id, RoomModel.capacity,
+        RoomModel.normalized_room_labels
+    ).filter(RoomModel.state == 'active', condition).all()
+    room_ids = [room.id for room in rooms]
+    resources = {room_id: set() for room_id in room_ids}
+    labels = {room.id: set(room.normalized_room_labels or [])
+              for room in rooms}
+    if room_ids:
+        for room_id, name in db_session.query(
+            RoomResource.room_id, func.lower(Resource.name)
+        ).join(Resource).filter(
+            RoomResource.room_id.in_(room_ids),
+            Resource.state == 'active',
+            func.coalesce(RoomResource.quantity, 1) > 0
+        ):
+            resources[room_id].add(name)
+        for room_id, name in db_session.query(
+            tags.c.room_id, func.lower(Tag.name)
+        ).join(Tag, Tag.id == tags.c.tag_id).filter(
+            tags.c.room_id.in_(room_ids),
+            Tag.state == 'active'
+        ):
+            labels[room_id].add(name)
+    locations = {}
+    for room in rooms:
+        locations.setdefault(room.location_id, []).append(RoomFeatures(
+            room.id, room.name, room.calendar_id, room.capacity,
+            frozenset(resources[room.id]), frozenset(labels[room.id])))
+    return locations
+
+
+class RoomFeatureIndex:
+    """
+    In-memory index of the capacity, resources and labels of the active
+    rooms of each location, loaded when a location is first asked for.
+    Rooms written through this process are reloaded one by one on their
+    next lookup, and a location is reloaded entirely after ttl seconds
+    to pick up writes made by other processes
+    :methods
+        rooms
+        invalidate_rooms
+        clear
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl or Config.RECOMMENDATION_INDEX_TTL
+        self.lock = threading.Lock()
+        self.locations = {}
+        self.loaded_at = {}
+        self.dirty = set()
+
+    def rooms(self, location_id):
+        """
+        :returns dict of room id to RoomFeatures of the location
+        """
+        with self.lock:
+            if time.monotonic() - self.loaded_at.get(
+                    location_id, float('-inf')) > self.ttl:
+                loaded = load_room_features(
+                    RoomModel.location_id == location_id)
+                self.locations[location_id] = {
+                    room.id: room for room in loaded.get(location_id, [])}
+                self.loaded_at[location_id] = time.monotonic()
+            if self.dirty:
+                self.refresh(self.dirty)
+                self.dirty = set()
+            return self.locations[location_id]
+
+    def refresh(self, room_ids):
+        """
+        Reloads the given rooms into new location dicts, so that the dicts
+        already returned by rooms() are never changed while being read
+        """
+        loaded = load_room_features(RoomModel.id.in_(room_ids))
+        for location_id, rooms in list(self.locations.items()):
+            refreshed = {room_id: room for room_id, room in rooms.items()
+                         if room_id not in room_ids}
+            refreshed.update(
+                (room.id, room) for room in loaded.get(location_id, []))
+            self.locations[location_id] = refreshed
+
+    def invalidate_rooms(self, room_ids):
+        with self.lock:
+            self.dirty.update(room_ids)
+
+    def clear(self):
+        with self.lock:
+            self.locations = {}
+            self.loaded_at = {}
+            self.dirty = set()
+
+
+room_feature_index = RoomFeatureIndex()
+
+
+def rank_rooms(rooms, attendees, required_resources=(), labels=(),
+               excluded=(), limit=5):
+    """
+    Returns the rooms that fit the attendees and have every required
+    resource and label, best fit first: the fewest empty seats, then
+    the fewest resources that were not asked for
+    :params rooms: iterable of RoomFeatures
+    :params excluded: ids of rooms that are not available
+    :returns list of Recommendation
+    """
+    required_resources = {name.strip().lower()
+                          for name in required_resources if name.strip()}
+    labels = {label.strip().lower() for label in labels if label.strip()}
+    candidates = (
+        (room.capacity - attendees,
+         len(room.resources - required_resources), room.name, room.id)
+        for room in rooms
+        if room.capacity >= attendees and room.id not in excluded and
+        required_resources <= room.resources and labels <= room.labels
+    )
+    return [
+        Recommendation(room_id, capacity_waste, extra_resources)
+        for capacity_waste, extra_resources, _, room_id in
+        heapq.nsmallest(limit, candidates)
+    ]
+
+
+def changed_rooms(session):
+    return session.info.setdefault('recommendation_rooms', set())
+
+
+@event.listens_for(RoomModel, 'after_insert')
+@event.listens_for(RoomModel, 'after_update')
+@event.listens_for(RoomModel, 'after_delete')
+def receive_room_change(mapper, connection, target):
+    changed_rooms(db_session()).add(target.id)
+
+
+@event.listens_for(RoomResource, 'after_insert')
+@event.listens_for(RoomResource, 'after_update')
+@event.listens_for(RoomResource, 'after_delete')
+def receive_room_resource_change(mapper, connection, target):
+    changed_rooms(db_session()).add(target.room_id)
+
+
+@event.listens_for(Resource, 'after_update')
+@event.listens_for(Tag, 'after_update')
+def receive_feature_change(mapper, connection, target):
+    db_session().info['recommendation_clear'] = True
+
+
+@event.listens_for(db_session, 'after_commit')
+def receive_after_commit(session):
+    if session.info.pop('recommendation_clear', False):
+        room_feature_index.clear()
+    room_ids = session.info.pop('recommendation_rooms', None)
+    if room_ids:
+        room_feature_index.invalidate_rooms(room_ids)
+
+
+@event.listens_for(db_session, 'after_rollback')
+def receive_after_rollback(session):
+    session.info.pop('recommendation_clear', None)
+    session.info.pop('recommendation_rooms', None)
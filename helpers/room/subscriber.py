@@ -1,23 +1,186 @@
+import logging
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
 import celery
 from config import Config
+from api.room.models import Room as RoomModel
+from helpers.database import db_session
+from helpers.metrics.metrics import external_call
+
+logger = logging.getLogger(__name__)
+
+
+class PushService:
+    """
+    Client of the mrm_push service. All calls share one pooled HTTP
+    session, time out, and are retried with a backoff on connection
+    errors and 5xx responses, which is safe since every call sets state
+    rather than changing it incrementally. Besides the single room
+    endpoints it uses
+        GET /channels: the channels the service holds, as a list of
+            {calendar_id, firebase_token}
+        POST /channels: {channels: [...], removed: [calendar_id, ...]}
+            upserts and removes channels in one request
+    :methods
+        add_room
+        remove_room
+        update_room_token
+        remote_channels
+        submit
+        reconcile
+    """
+
+    def __init__(self, url=None, timeout=None, retries=None, backoff=None,
+                 batch_size=None):
+        self.url = url
+        self.reconcile_rejected = False
+        self.timeout = timeout or Config.PUSH_SERVICE_TIMEOUT
+        self.retries = Config.PUSH_SERVICE_RETRIES if retries is None \
+            else retries
+        self.backoff = Config.PUSH_SERVICE_BACKOFF if backoff is None \
+            else backoff
+        self.batch_size = batch_size or Config.PUSH_SERVICE_BATCH_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, path, **kwargs):
+        url = (self.url or Config.MRM_PUSH_URL).rstrip('/') + path
+        attempt = 0
+        while True:
+            try:
+                with external_call('push_service'):
+                    response = self.session.request(
+                        method, url, timeout=self.timeout, **kwargs)
+                response.raise_for_status()
+                return response
+            except requests.HTTPError as e:
+                if e.response.status_code < 500:
+                    raise
+                error = e
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            attempt += 1
+            if attempt > self.retries:
+                raise error
+            time.sleep(self.backoff * 2 ** (attempt - 1))
+
+    def add_room(self, calendar_id, firebase_token):
+        self.request('GET', '/add_room', params={
+            'calendar_id': calendar_id, 'firebase_token': firebase_token})
+
+    def remove_room(self, calendar_id):
+        self.request('DELETE', '/delete_room', params={
+            'calendar_id': calendar_id})
+
+    def update_room_token(self, calendar_id, firebase_token):
+        self.request('GET', '/token', params={
+            'calendar_id': calendar_id, 'firebase_token': firebase_token})
+
+    def remote_channels(self):
+        """
+        Returns the channels of the push service as
+        {calendar_id: firebase_token}
+        """
+        return {
+            channel['calendar_id']: channel.get('firebase_token')
+            for channel in self.request('GET', '/channels').json()
+        }
+
+    def submit(self, channels, removed):
+        """
+        Sends channel upserts and removals in batches of batch_size
+        :params channels: {calendar_id: firebase_token} to upsert
+        :params removed: calendar ids to remove
+        """
+        changes = [('channels', {
+            'calendar_id': calendar_id, 'firebase_token': firebase_token
+        }) for calendar_id, firebase_token in channels.items()]
+        changes += [('removed', calendar_id) for calendar_id in removed]
+        for start in range(0, len(changes), self.batch_size):
+            batch = {'channels': [], 'removed': []}
+            for kind, change in changes[start:start + self.batch_size]:
+                batch[kind].append(change)
+            self.request('POST', '/channels', json=batch)
+
+    def reconcile(self, local_channels):
+        """
+        Brings the push service in line with the local channels by
+        sending only the channels that differ
+        :params local_channels: {calendar_id: firebase_token}
+        :returns the upserted channels and the removed calendar ids
+        """
+        remote = self.remote_channels()
+        channels = {
+            calendar_id: firebase_token
+            for calendar_id, firebase_token in local_channels.items()
+            if calendar_id not in remote or
+            remote[calendar_id] != firebase_token
+        }
+        removed = sorted(set(remote) - set(local_channels))
+        self.submit(channels, removed)
+        return channels, removed
+
+
+def active_channels():
+    """
+    Returns the notification channels of the active rooms as
+    {calendar_id: firebase_token}
+    """
+    return dict(db_session.query(
+        RoomModel.calendar_id, RoomModel.firebase_token
+    ).filter(
+        RoomModel.state == "active",
+        RoomModel.calendar_id.isnot(None)
+    ).order_by(RoomModel.id))
+
+
+push_service = PushService()
 
 
 @celery.task(name="add-room-to-push-services")
 def add_room(calendar_id, firebase_token):
-    requests.get(url=Config.MRM_PUSH_URL + "/add_room",
-                 params={"calendar_id": calendar_id,
-                         "firebase_token": firebase_token})
+    push_service.add_room(calendar_id, firebase_token)
 
 
 @celery.task(name="remove-room-from-push-services")
 def remove_room(calendar_id):
-    requests.delete(url=Config.MRM_PUSH_URL + "/delete_room",
-                    params={"calendar_id": calendar_id})
+    push_service.remove_room(calendar_id)
 
 
 @celery.task(name="update-room-token")
 def update_room_token(calendar_id, firebase_token):
-    requests.get(url=Config.MRM_PUSH_URL + "/token",
-                 params={"calendar_id": calendar_id,
-                         "firebase_token": firebase_token})
+    push_service.update_room_token(calendar_id, firebase_token)
+
+
+@celery.task(name="reconcile-push-channels")
+def reconcile_push_channels():
+    """
+    Sends the push service the channel changes it missed, e.g. when
+    one of the tasks above failed. Does nothing when reconciliation is
+    disabled, and a push service without the /channels endpoints is only
+    reported once
+    """
+    if not Config.PUSH_CHANNEL_RECONCILIATION:
+        return 0
+    try:
+        channels, removed = push_service.reconcile(active_channels())
+    except requests.HTTPError as error:
+        if error.response.status_code >= 500:
+            raise
+        if not push_service.reconcile_rejected:
+            push_service.reconcile_rejected = True
+            logger.warning(
+                'Push service rejected channel reconciliation: %s', error)
+        return 0
+    else:
+        push_service.reconcile_rejected = False
+        logger.info(
+            'Reconciled push channels: %s upserted, %s removed',
+            len(channels), len(removed))
+        return len(channels) + len(removed)
+    finally:
+        db_session.remove()
@@ -1,22 +1,21 @@
-from api.room.models import Room as RoomModel, RoomResource
+from enum import Enum
+
+from api.room.models import Room as RoomModel, RoomResource, tags
 from api.room_resource.models import Resource
 from api.room.models import RoomResource as RoomResourceModel
+from api.room.models import normalize_room_labels
 from api.location.models import Location
+from api.devices.models import Devices
+from api.structure.models import Structure as StructureModel
+from api.tag.models import Tag
 from api.room.models import Room
-from sqlalchemy import String, func, cast
+from sqlalchemy import String, and_, cast, exists, func, or_, select
+from sqlalchemy.dialects import postgresql
 
 
-def resource_join_location(query):
-    """
-    Join resources model upto location model via foreign keys
-    :param
-        queryset
-    :return
-        queryset
-    """
-    query_room = query.join(RoomResource.room)
-    query_location = query_room.join(Location)
-    return query_location
+class LabelMatch(Enum):
+    ALL = 'all'
+    ANY = 'any'
 
 
 def room_join_location(query):
@@ -54,61 +53,135 @@ def location_join_resources():
     return location_query
 
 
-def filter_room_labels(query, room_labels):
-    room_labels = room_labels.split(",")
-    for room_label in room_labels:
-        query = query.filter(func.lower(
-            cast(RoomModel.room_labels, String)).contains(
-                room_label.lower().strip()))
-    return query
+def room_labels_condition(room_labels, label_match=None):
+    """
+    Build a condition on the GIN indexed normalized room labels
+    :param
+        room_labels: comma separated string of labels
+        label_match: 'any' to match rooms having at least one of the
+            labels, otherwise rooms must have all of them
+    :return
+        sqlalchemy condition
+    """
+    labels = cast(
+        normalize_room_labels(room_labels.split(",")),
+        postgresql.ARRAY(String))
+    if label_match == LabelMatch.ANY.value:
+        return RoomModel.normalized_room_labels.overlap(labels)
+    return RoomModel.normalized_room_labels.contains(labels)
+
+
+def filter_room_labels(query, room_labels, label_match=None):
+    return query.filter(room_labels_condition(room_labels, label_match))
+
+
+def location_condition(location):
+    return exists().where(and_(
+        Location.id == RoomModel.location_id,
+        Location.name.ilike('%' + location + '%')))
+
+
+def resources_condition(resources):
+    return exists().where(and_(
+        RoomResource.room_id == RoomModel.id,
+        RoomResource.name.ilike('%' + resources + '%')))
+
+
+def devices_condition(devices):
+    device = '%' + devices + '%'
+    return exists().where(and_(
+        Devices.room_id == RoomModel.id,
+        Devices.state == 'active',
+        or_(Devices.name.ilike(device), Devices.device_type.ilike(device))))
+
+
+def tags_condition(room_tags):
+    """
+    Rooms carrying every one of the comma separated tag names
+    """
+    return and_(*[
+        exists().where(and_(
+            tags.c.room_id == RoomModel.id,
+            tags.c.tag_id == Tag.id,
+            func.lower(Tag.name) == tag_name.strip().lower()))
+        for tag_name in room_tags.split(',') if tag_name.strip()
+    ])
+
+
+def structure_tree_condition(root_condition):
+    """
+    Rooms placed in the structures matching root_condition or any
+    structure below them
+    """
+    structures = StructureModel.__table__
+    structure_tree = select([structures.c.structure_id]).where(
+        root_condition).cte('structure_tree', recursive=True)
+    structure_tree = structure_tree.union_all(
+        select([structures.c.structure_id]).where(
+            structures.c.parent_id == structure_tree.c.structure_id))
+    return RoomModel.structure_id.in_(
+        select([structure_tree.c.structure_id]))
+
+
+def structure_condition(structure_id):
+    """
+    Rooms placed in the given office structure or any structure below it
+    """
+    return structure_tree_condition(
+        StructureModel.__table__.c.structure_id == structure_id)
 
 
-def room_filter(query, filter_data):  # noqa: ignore=C901
+def office_condition(office):
+    """
+    Rooms placed in an office structure whose name matches office,
+    or in any structure below it
+    """
+    return structure_tree_condition(
+        StructureModel.__table__.c.name.ilike('%' + office + '%'))
+
+
+ROOM_FILTERS = {
+    'location': location_condition,
+    'capacity': lambda capacity: RoomModel.capacity == capacity,
+    'min_capacity': lambda capacity: RoomModel.capacity >= capacity,
+    'max_capacity': lambda capacity: RoomModel.capacity <= capacity,
+    'resources': resources_condition,
+    'devices': devices_condition,
+    'tags': tags_condition,
+    'structure_id': structure_condition,
+    'office': office_condition,
+}
+
+
+def room_filter_conditions(filter_data):
+    """
+    Compile the room filter arguments into a list of conditions.
+    Related tables are matched with EXISTS so that a room is never
+    returned more than once
+    :param
+        filter_data: dict of filter arguments
+    :return
+        list of sqlalchemy conditions
+    """
+    conditions = [
+        build_condition(filter_data[argument])
+        for argument, build_condition in ROOM_FILTERS.items()
+        if filter_data.get(argument) not in (None, '')
+    ]
+    if filter_data.get('room_labels'):
+        conditions.append(room_labels_condition(
+            filter_data['room_labels'], filter_data.get('label_match')))
+    return conditions
+
+
+def room_filter(query, filter_data):
     """
     Filters for rooms by given specifics and
     returns all rooms if no specific is passed
     :param
         query
-        **kwargs
+        filter_data
     :return
-        List of rooms
-    """
-    location = filter_data.pop("location", None)
-    capacity = filter_data.pop("capacity", None)
-    resources = filter_data.pop("resources", None)
-    room_labels = filter_data.get("room_labels")
-
-    if location and not (resources or capacity or room_labels):
-        query = room_join_location(query)
-        return query.filter(Location.name.ilike('%' + location + '%'))
-    elif capacity and not (resources or room_labels or location):
-        return query.filter(RoomModel.capacity == capacity)
-    elif resources and not (capacity or room_labels or location):
-        query = query.join(RoomResource.room)
-        return query.filter(RoomResource.name.ilike('%' + resources + '%'))
-    elif (capacity and resources) and not (room_labels or location):
-        query = query.filter(RoomModel.capacity == capacity)
-        query = resource_join_location(query)
-        return query.filter(RoomResource.name.ilike('%' + resources + '%'))
-    elif (capacity and location) and not (resources or room_labels):
-        query = query.filter(RoomModel.capacity == capacity)
-        query = room_join_location(query)
-        return query.filter(Location.name.ilike('%' + location + '%'))
-    elif (location and resources) and not (capacity or room_labels):
-        query = resource_join_location(query)
-        query = query.filter(RoomResource.name.ilike('%' + resources + '%'))
-        return query.filter(Location.name.ilike('%' + location + '%'))
-    elif (location and capacity and resources) and not room_labels:
-        query = resource_join_location(query)
-        query = query.filter(RoomModel.capacity == capacity)
-        query = query.filter(RoomResource.name.ilike('%' + resources + '%'))
-        return query.filter(Location.name.ilike('%' + location + '%'))
-    elif room_labels and not (capacity or resources or location):
-        query = filter_room_labels(query, room_labels)
-        return query
-    elif (room_labels and location) and not (resources or capacity):
-        query = filter_room_labels(query, room_labels)
-        query = room_join_location(query)
-        return query.filter(Location.name.ilike('%' + location + '%'))
-    else:
-        return query
+        queryset
+    """
+    return query.filter(*room_filter_conditions(filter_data))
@@ -0,0 +1,187 @@
+import hashlib
+import hmac
+import json
+import random
+import re
+import threading
+import time
+
+from flask import request
+from graphql import GraphQLError, parse, print_ast
+from graphql.language import ast
+
+from helpers.auth.authentication import Auth
+from helpers.metrics.metrics import current_stats
+
+# Email addresses of people, but not the calendar ids of rooms, which
+# replayed operations need to find their rooms
+EMAIL = re.compile(
+    r'[\w.+-]+@(?!(?:resource|group)\.calendar\.google\.com)'
+    r'[\w-]+(?:\.[\w-]+)+')
+
+
+# Arguments and variables whose strings are kept: ids and dates, which
+# replayed operations need, as are room calendar ids wherever they are.
+# Other strings, e.g. names, titles and comments, are redacted
+KEPT_STRINGS = re.compile(r'^id$|Ids?$|[dD]ate|[tT]ime')
+ROOM_CALENDAR_ID = re.compile(
+    r'^[\w.-]+@(?:resource|group)\.calendar\.google\.com$')
+
+REDACTED = 'redacted'
+
+
+def pseudonym(value, secret):
+    """
+    Returns a stable pseudonym of a value that cannot be reversed
+    without the secret
+    """
+    return hmac.new(secret.encode(), value.encode(),
+                    hashlib.sha256).hexdigest()[:12]
+
+
+def anonymise(value, secret, key=None):
+    """
+    Redacts the strings of a request's variables but for ids and dates,
+    and replaces the email addresses in those with stable pseudonyms
+    :params key: name of the variable or field holding the value
+    """
+    if isinstance(value, str):
+        if ROOM_CALENDAR_ID.match(value):
+            return value
+        if not key or not KEPT_STRINGS.search(key):
+            return REDACTED
+        return EMAIL.sub(
+            lambda match: 'user-{}@example.com'.format(
+                pseudonym(match.group(0), secret)), value)
+    if isinstance(value, list):
+        return [anonymise(item, secret, key) for item in value]
+    if isinstance(value, dict):
+        return {name: anonymise(item, secret, name)
+                for name, item in value.items()}
+    return value
+
+
+def anonymise_literals(node, secret, key=None):
+    """
+    Anonymises the string literals of a parsed query in place like the
+    variables
+    """
+    if isinstance(node, ast.StringValue):
+        node.value = anonymise(node.value, secret, key)
+    elif isinstance(node, (ast.Argument, ast.ObjectField)):
+        anonymise_literals(node.value, secret, node.name.value)
+    elif isinstance(node, ast.ListValue):
+        for item in node.values:
+            anonymise_literals(item, secret, key)
+    elif isinstance(node, ast.Node):
+        for attribute in node.__slots__:
+            child = getattr(node, attribute, None)
+            for item in child if isinstance(child, list) else [child]:
+                if isinstance(item, ast.Node):
+                    anonymise_literals(item, secret, key)
+
+
+def anonymise_query(query, secret):
+    """
+    Returns the query with its string literals anonymised, or None when
+    it cannot be parsed
+    """
+    try:
+        document = parse(query)
+    except GraphQLError:
+        return None
+    anonymise_literals(document, secret)
+    return print_ast(document)
+
+
+def anonymise_operation(operation, secret):
+    """
+    Anonymises the query and the variables of a request's GraphQL params
+    """
+    if not isinstance(operation, dict):
+        return None
+    anonymised = dict(operation)
+    if isinstance(operation.get('query'), str):
+        anonymised['query'] = anonymise_query(operation['query'], secret)
+    variables = operation.get('variables')
+    if isinstance(variables, str):
+        try:
+            variables = json.loads(variables)
+        except ValueError:
+            variables = None
+    if 'variables' in operation:
+        anonymised['variables'] = {
+            name: anonymise(value, secret, name)
+            for name, value in variables.items()
+        } if isinstance(variables, dict) else None
+    return anonymised
+
+
+GRAPHQL_PARAMS = ('query', 'variables', 'operationName')
+
+
+def request_body():
+    """
+    Returns the GraphQL params of the request: a dict, or a list of them
+    for a batch
+    """
+    body = request.get_json(silent=True) \
+        if request.method.lower() == 'post' else None
+    if body is None:
+        body = {key: request.args[key] for key in GRAPHQL_PARAMS
+                if key in request.args}
+    return body
+
+
+class TrafficRecorder:
+    """
+    Appends the /mrm requests of the app to a JSONL file: their
+    anonymised body, operation, status and duration, and a pseudonym of
+    the user, so that a replay can give every user its own token.
+    Pseudonyms are keyed with the secret, and only the ids and dates of
+    the queries and variables are kept. Tokens are never recorded. Only
+    sample_rate of the requests are kept
+    :methods
+        install
+        record
+    """
+
+    def __init__(self, path, secret, sample_rate=1.0):
+        self.path = path
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.lock = threading.Lock()
+
+    def install(self, app):
+        app.before_request(self.start)
+        app.after_request(self.record)
+
+    @staticmethod
+    def start():
+        request.environ['mrm.traffic_started'] = time.perf_counter()
+
+    def record(self, response):
+        started = request.environ.get('mrm.traffic_started')
+        if request.endpoint != 'mrm' or started is None or \
+                random.random() >= self.sample_rate:
+            return response
+        body = request_body()
+        if not body:
+            return response
+        stats = current_stats()
+        user = Auth.decode_payload(Auth.get_token())
+        line = json.dumps({
+            'time': round(time.time(), 3),
+            'operation': stats.operation if stats else None,
+            'user': pseudonym(user['email'], self.secret)
+            if isinstance(user, dict) else None,
+            'body': [anonymise_operation(operation, self.secret)
+                     for operation in body]
+            if isinstance(body, list)
+            else anonymise_operation(body, self.secret),
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2)
+        })
+        with self.lock, open(self.path, 'a') as traffic:
+            traffic.write(line + '\n')
+        return response
@@ -1,10 +1,15 @@
 import sys
+from functools import partial
 from services.room_cancelation.auto_cancel_event import UpdateRecurringEvent
 from services.data_deletion.clean_deleted_data_from_db import DataDeletion
+from helpers.event_deadlines.event_deadlines import schedule_upcoming_events
 
 services = {
     "clean_database": DataDeletion().clean_deleted_data,
-    "autocancel_events": UpdateRecurringEvent().update_recurring_event_status
+    "autocancel_events": UpdateRecurringEvent().update_recurring_event_status,
+    "autocancel_events_dry_run": partial(
+        UpdateRecurringEvent().update_recurring_event_status, dry_run=True),
+    "schedule_event_deadlines": schedule_upcoming_events
 }
 
 
@@ -1,5 +1,5 @@
-from helpers.database import database_uri
-from sqlalchemy import create_engine, MetaData, and_
+from helpers.database import engine, set_statement_timeout, settings
+from sqlalchemy import MetaData, and_
 from datetime import timedelta, datetime
 import celery
 
@@ -10,9 +10,8 @@ def delete_archived_data():
         This method deletes data that has been deleted for
         more than 30 days
         """
-    database_engine = create_engine(database_uri)
     metadata = MetaData()
-    metadata.reflect(bind=database_engine)
+    metadata.reflect(bind=engine)
 
     for table in reversed(metadata.sorted_tables):
         try:
@@ -20,6 +19,9 @@ def delete_archived_data():
             delta = now - timedelta(days=30)
             statement = table.delete().where(
                 and_(table.c.date_updated < delta, table.c.state == 'archived'))
-            database_engine.execute(statement)
+            with engine.begin() as connection:
+                set_statement_timeout(
+                    connection, settings.DB_MAINTENANCE_STATEMENT_TIMEOUT)
+                connection.execute(statement)
         except AttributeError:
             continue
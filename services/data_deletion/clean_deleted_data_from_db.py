@@ -1,5 +1,5 @@
-from helpers.database import database_uri
-from sqlalchemy import create_engine, MetaData
+from helpers.database import engine, set_statement_timeout, settings
+from sqlalchemy import MetaData
 
 
 class DataDeletion:
@@ -9,13 +9,15 @@ class DataDeletion:
         deletion from the database
         """
         print("cleaning data...")
-        database_engine = create_engine(database_uri)
         metadata = MetaData()
-        metadata.reflect(bind=database_engine)
+        metadata.reflect(bind=engine)
 
         for table in reversed(metadata.sorted_tables):
             try:
                 statement = table.delete().where(table.c.state == "deleted")
-                database_engine.execute(statement)
+                with engine.begin() as connection:
+                    set_statement_timeout(
+                        connection, settings.DB_MAINTENANCE_STATEMENT_TIMEOUT)
+                    connection.execute(statement)
             except AttributeError:
                 continue
@@ -0,0 +1,18 @@
+from helpers.database import db_session
+from helpers.devices.device_activity import device_activity
+from helpers.devices.device_health import classify_device_health
+import celery
+
+
+@celery.task(name='device_health.record_device_health')
+def record_device_health():
+    """
+        This method flushes buffered heartbeats and moves the devices
+        whose heartbeats aged past the stale or offline threshold to
+        their new health status, recording each transition
+        """
+    try:
+        device_activity.flush()
+        return classify_device_health()
+    finally:
+        db_session.remove()
@@ -1,10 +1,16 @@
 from dateutil.relativedelta import relativedelta
-from graphql import GraphQLError
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
 from api.room.models import Room as RoomModel
 from api.events.models import Events as EventsModel
 from datetime import datetime
 from helpers.calendar.credentials import Credentials
-from helpers.email.email import event_cancellation_notification
+from helpers.database import db_session
+from helpers.email.email import notification
+from helpers.email.email_setup import email_batch
+
+events = EventsModel.__table__
+rooms = RoomModel.__table__
 
 
 class UpdateRecurringEvent():
@@ -16,8 +22,14 @@ class UpdateRecurringEvent():
     been checked into three consecutive times
 
     To test the functionality of this class run the command
-    'python run_autocancel_room.py' from the root folder
+    'python run_mrm_services.py autocancel_events' from the root folder,
+    or 'python run_mrm_services.py autocancel_events_dry_run' to only
+    report the series that would be cancelled
     """
+    event_reject_reason = "for 3 consecutive meetings"
+
+    def __init__(self, consecutive_misses=3):
+        self.consecutive_misses = consecutive_misses
 
     def get_room_index_from_attendees(self, attendees, calendar_id):
         """
@@ -34,30 +46,27 @@ class UpdateRecurringEvent():
                 break
         return index_of_room
 
-    def get_all_recurring_events(self, query, start_date, end_date):
+    def get_all_recurring_events(self, service, start_date, end_date):
         """
-        :param query: A room query that allows you to query all
-        the active rooms
+        :param service: the calendar api service
         :param start_date: the first day from which you want to get
         the recurring events
         :param end_date: the final date upto which you want to get
         the recurring event
         :return: the recurring events within the time frame
         """
-        rooms = query.filter_by(state="active")
-        credentials = Credentials()
-        service = credentials.set_api_credentials()
+        active_rooms = RoomModel.query.filter_by(state="active")
         recurring_events = []
-        for room in rooms:
-            events = []
+        for room in active_rooms:
+            calendar_events = {'items': []}
             try:
-                events = service.events().list(
+                calendar_events = service.events().list(
                     calendarId=room.calendar_id, timeMax=end_date,
                     timeMin=start_date, singleEvents=True,
                     orderBy='startTime').execute()
             except Exception:
                 continue
-            for event in events['items']:
+            for event in calendar_events['items']:
                 recurring_event_id = event.get("recurringEventId")
                 if not event.get("attendees"):
                     continue
@@ -68,81 +77,153 @@ class UpdateRecurringEvent():
                 room_response_status = event.get(
                     "attendees")[room_index]["responseStatus"]
                 if recurring_event_id and room_response_status != "declined":
-                    recurring_event = {
-                        "start_date": event["start"]["dateTime"],
-                        "end_date": event["end"]["dateTime"],
-                        "room_name": room.name,
-                        "event_summary": event.get("summary"),
-                        "date_of_event": start_date,
+                    recurring_events.append({
                         "event_id": event.get("id"),
                         "recurring_event_id": recurring_event_id,
                         "room_id": room.id,
-                        "calendar_id": room.calendar_id
-                    }
-                    recurring_events.append(recurring_event)
+                        "event_title": event.get("summary"),
+                        "start_time": event["start"]["dateTime"],
+                        "end_time": event["end"]["dateTime"],
+                        "number_of_participants": len(event["attendees"]),
+                        "checked_in": False,
+                        "cancelled": False
+                    })
         return recurring_events
 
-    def update_recurring_event_status(self):
+    def save_recurring_events(self, recurring_events):
+        """
+        Inserts the occurrences that are not stored yet in one statement
+        :param recurring_events: occurrences from get_all_recurring_events
+        """
+        if not recurring_events:
+            return
+        db_session.execute(
+            insert(events).values(recurring_events).on_conflict_do_nothing(
+                index_elements=[events.c.event_id, events.c.start_time]))
+        db_session.commit()
+
+    def find_unattended_series(self, now=None):
+        """
+        Finds the recurring series whose latest consecutive_misses past
+        occurrences in a room were all left unattended, ranking the
+        occurrences of every series with one window over
+        (recurring_event_id, start_time)
+        :param now: ISO timestamp occurrences must have started before
+        :return: list of dicts with the recurring_event_id, room_id,
+        calendar_id and last_start_time of every flagged series
+        """
+        now = now or datetime.utcnow().isoformat() + "Z"
+        ranked = select([
+            events.c.recurring_event_id,
+            events.c.room_id,
+            events.c.start_time,
+            events.c.checked_in,
+            func.row_number().over(
+                partition_by=[events.c.recurring_event_id, events.c.room_id],
+                order_by=events.c.start_time.desc()
+            ).label('position')
+        ]).where(and_(
+            events.c.recurring_event_id.isnot(None),
+            events.c.state == 'active',
+            events.c.start_time < now
+        )).alias('ranked')
+        latest_occurrences = select([
+            ranked.c.recurring_event_id,
+            ranked.c.room_id,
+            rooms.c.calendar_id,
+            func.max(ranked.c.start_time).label('last_start_time')
+        ]).select_from(
+            ranked.join(rooms, rooms.c.id == ranked.c.room_id)
+        ).where(
+            ranked.c.position <= self.consecutive_misses
+        ).group_by(
+            ranked.c.recurring_event_id, ranked.c.room_id, rooms.c.calendar_id
+        ).having(and_(
+            func.count() == self.consecutive_misses,
+            func.bool_or(ranked.c.checked_in).isnot(True)
+        )).order_by(ranked.c.recurring_event_id)
+        return [dict(row) for row in db_session.execute(latest_occurrences)]
+
+    def decline_series(self, service, series):
+        """
+        Declines a recurring series on behalf of its room and notifies
+        the attendees
+        :param service: the calendar api service
+        :param series: a series returned by find_unattended_series
+        """
+        calendar_id = series["calendar_id"]
+        recurring_event_id = series["recurring_event_id"]
+        event = service.events().get(
+            calendarId=calendar_id,
+            eventId=recurring_event_id
+        ).execute()
+        room_index = self.get_room_index_from_attendees(
+            event["attendees"],
+            calendar_id
+        )
+        event["attendees"][room_index]["responseStatus"] = "declined"
+        service.events().patch(
+            calendarId=calendar_id,
+            eventId=recurring_event_id,
+            body=event,
+            sendUpdates="all").execute()
+        if not notification.event_cancellation_notification(
+            event, series["room_id"], self.event_reject_reason
+        ):
+            print("Event", recurring_event_id, "cancelled but email not sent")
+
+    def archive_series(self, declined_series):
+        """
+        Archives the unattended occurrences of the declined series
+        in a single UPDATE
+        :param declined_series: series returned by find_unattended_series
+        """
+        if not declined_series:
+            return 0
+        conditions = [
+            and_(
+                events.c.recurring_event_id == series["recurring_event_id"],
+                events.c.room_id == series["room_id"]
+            ) for series in declined_series
+        ]
+        result = db_session.execute(events.update().where(and_(
+            events.c.state == 'active',
+            events.c.checked_in.isnot(True),
+            or_(*conditions)
+        )).values(state='archived'))
+        db_session.commit()
+        return result.rowcount
+
+    def update_recurring_event_status(self, dry_run=False):
         """
         checks for events to cancel and updates the relevant data
         to the events model
+        :param dry_run: only report the series that would be cancelled
+        :return: the series flagged for cancellation
         """
+        unattended_series = self.find_unattended_series()
+        if dry_run:
+            for series in unattended_series:
+                print(
+                    "Would cancel", series["recurring_event_id"],
+                    "in room", series["room_id"],
+                    "last missed on", series["last_start_time"])
+            return unattended_series
         print("cancelling events...")
-        query = RoomModel.query
-        now = datetime.utcnow().isoformat()+"Z"
+        service = Credentials().set_api_credentials()
+        declined_series = []
+        with email_batch():
+            for series in unattended_series:
+                try:
+                    self.decline_series(service, series)
+                except Exception as error:
+                    print(
+                        "Could not cancel", series["recurring_event_id"], error)
+                    continue
+                declined_series.append(series)
+        self.archive_series(declined_series)
+        now = datetime.utcnow().isoformat() + "Z"
         next_day = (datetime.utcnow() + relativedelta(hours=24)).isoformat()+"Z"
-        events = self.get_all_recurring_events(
-            query, now, next_day)
-        for event in events:
-            start_date = event["start_date"]
-            end_date = event["end_date"]
-            new_recurring_event = EventsModel(
-                event_id=event["event_id"],
-                recurring_event=event["recurring_event_id"],
-                room_id=event["room_id"],
-                event_title=event["event_summary"],
-                start_time=start_date,
-                end_time=end_date,
-                checked_in=False,
-                cancelled=False)
-            event_query = EventsModel.query
-            calendar_id = event["calendar_id"]
-            recurring_event_id = event["recurring_event_id"]
-            service = Credentials().set_api_credentials()
-            missed_checkins = event_query.filter(
-                EventsModel.recuring_event_id == event["recurring_event_id"] and
-                EventsModel.checked_in == "False")
-            if missed_checkins.count() >= 3:
-                event = service.events().get(
-                    calendarId=calendar_id,
-                    eventId=recurring_event_id
-                ).execute()
-                attendees = event["attendees"]
-                room_index = self.get_room_index_from_attendees(
-                    attendees,
-                    calendar_id
-                )
-                event["attendees"][room_index]["responseStatus"] = "declined"
-                service.events().patch(
-                    calendarId=calendar_id,
-                    eventId=recurring_event_id,
-                    body=event,
-                    sendUpdates="all").execute()
-                event_in_database = EventsModel.query.filter_by(
-                    id=event.get("id")
-                ).first()
-                room_id = event_in_database.room_id
-                event_reject_reason = "for 3 consecutive meetings"
-                if not event_cancellation_notification(
-                    event, room_id, event_reject_reason
-                ):
-                    raise GraphQLError("Event cancelled but email not sent")
-                for missed_checkin in missed_checkins:
-                    missed_checkin.state = "archived"
-                    missed_checkin.save()
-            else:
-                event_exists = event_query.filter_by(
-                    event_id=event["event_id"]
-                )
-                if not event_exists.count():
-                    new_recurring_event.save()
+        self.save_recurring_events(
+            self.get_all_recurring_events(service, now, next_day))
+        return unattended_series
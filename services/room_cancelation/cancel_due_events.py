@@ -0,0 +1,39 @@
+import logging
+
+from api.room.models import Room as RoomModel
+from helpers.calendar.credentials import get_single_calendar_event
+from helpers.database import db_session
+from helpers.email.email import notification
+from helpers.email.email_setup import email_batch
+from helpers.event_deadlines.event_deadlines import cancel_due_events
+import celery
+
+logger = logging.getLogger(__name__)
+
+
+@celery.task(name='event_deadlines.cancel_due_events')
+def auto_cancel_due_events():
+    """
+        This method cancels the meetings whose check-in deadline
+        passed without a check-in and notifies their attendees.
+        Only the due deadlines are read, the events table is not polled
+        """
+    try:
+        cancelled = cancel_due_events()
+        with email_batch():
+            for event in cancelled:
+                try:
+                    room = RoomModel.query.get(event.room_id)
+                    calendar_event = get_single_calendar_event(
+                        room.calendar_id, event.event_id)
+                    notification.event_cancellation_notification(
+                        calendar_event, event.room_id,
+                        'after {} minutes'.format(
+                            room.cancellation_duration or 10),
+                        room_name=room.name)
+                except Exception:
+                    logger.exception(
+                        'Could not notify attendees of %s', event.event_id)
+        return len(cancelled)
+    finally:
+        db_session.remove()
@@ -2,12 +2,15 @@ import os
 import sys
 import json
 import jwt
+import traceback
 
+from contextlib import ContextDecorator
 from flask_testing import TestCase
 from graphene.test import Client
 from datetime import datetime
 from alembic import command, config
 from unittest.mock import patch
+from sqlalchemy import event
 
 from app import create_app
 from schema import schema
@@ -24,10 +27,15 @@ from api.response.models import Response
 from api.tag.models import Tag
 from api.structure.models import Structure
 from api.office_structure.models import OfficeStructure
+from helpers.devices.device_activity import device_activity
+from helpers.room.recommendation import room_feature_index
+from helpers.query_cost.query_cost import query_cost_limiter
+from helpers.graphql_view.graphql_view import persisted_queries
 from fixtures.token.token_fixture import (
     ADMIN_TOKEN, USER_TOKEN, ADMIN_NIGERIA_TOKEN)
 
 sys.path.append(os.getcwd())
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 class BaseTestCase(TestCase):
@@ -210,6 +218,17 @@ class BaseTestCase(TestCase):
                 position=1,
             )
             structure.save()
+            floor_structure = Structure(
+                structure_id='7c3a1f02-4d6e-4b1a-9f3e-2a5d8c6b1e47',
+                level=2,
+                name='1st Floor',
+                parent_id='b05fc5f2-b4aa-4f48-a8fb-30bdcc3fc968',
+                parent_title='Epic tower',
+                tag='Floor',
+                location_id=2,
+                position=1,
+            )
+            floor_structure.save()
             parent_node = OfficeStructure(
                  id='C56A4180-65AA-42EC-A945-5FD21DEC0518',
                  name='Epic Tower',
@@ -242,6 +261,10 @@ class BaseTestCase(TestCase):
         app = self.create_app()
         with app.app_context():
             command.stamp(self.alembic_configuration, 'base')
+            device_activity.clear()
+            room_feature_index.clear()
+            query_cost_limiter.clear()
+            persisted_queries.clear()
             db_session.remove()
             Base.metadata.drop_all(bind=engine)
 
@@ -394,3 +417,57 @@ def change_user_role_to_super_admin(func):
         db_session().commit()
         return func(self)
     return func_wrapper
+
+
+def query_origin():
+    """
+    Returns the last frame of the project code, outside the tests, that
+    led to the current statement
+    """
+    for frame in reversed(traceback.extract_stack()):
+        path = os.path.relpath(frame.filename, PROJECT_ROOT)
+        if not path.startswith(('..', 'tests', '<')) and \
+                'site-packages' not in path:
+            return '{}:{} in {}'.format(path, frame.lineno, frame.name)
+    return 'unknown'
+
+
+class QueryBudget(ContextDecorator):
+    """
+    Fails the test when the block runs more than max_queries SQL
+    statements, listing each of them with the code that issued it
+    """
+
+    def __init__(self, max_queries):
+        self.max_queries = max_queries
+        self.statements = []
+
+    def record(self, conn, cursor, statement, parameters, context,
+               executemany):
+        self.statements.append((statement, query_origin()))
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(engine, 'before_cursor_execute', self.record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(engine, 'before_cursor_execute', self.record)
+        if exc_info[0] is None and len(self.statements) > self.max_queries:
+            raise AssertionError(
+                '{} queries run, the budget is {}:\n{}'.format(
+                    len(self.statements), self.max_queries, '\n'.join(
+                        '{}. {}\n   {}'.format(
+                            number, origin, ' '.join(statement.split()))
+                        for number, (statement, origin) in enumerate(
+                            self.statements, 1))))
+        return False
+
+
+def assert_max_queries(max_queries):
+    """
+    Context manager and decorator limiting the SQL statements run, e.g.
+        with assert_max_queries(5):
+            CommonTestCases.admin_token_assert_equal(self, query, response)
+    """
+    return QueryBudget(max_queries)
@@ -0,0 +1,85 @@
+import json
+
+from tests.base import BaseTestCase
+from api.location.models import Location as LocationModel
+from api.room.models import Room as RoomModel
+from fixtures.channels.channel_fixtures import (
+    channels_since_version_query,
+    channels_since_version_response
+)
+
+
+class TestChannelFeed(BaseTestCase):
+    """
+    Test that channel pollers only receive what changed
+    """
+    def change_channels(self):
+        room = RoomModel.query.get(1)
+        room.firebase_token = 'new-token'
+        room.save()
+        room = RoomModel.query.get(2)
+        room.state = 'archived'
+        room.save()
+
+    def test_query_channels_since_version(self):
+        self.change_channels()
+        response = self.client.execute(channels_since_version_query)
+        self.assertEqual(response, channels_since_version_response)
+
+    def test_unchanged_version_returns_nothing(self):
+        response = self.client.execute(
+            channels_since_version_query.replace('2', '4'))
+        self.assertEqual(response['data']['allChannels'], {
+            'channels': [], 'removedChannels': [], 'version': 4})
+
+    def test_unchanged_channels_are_not_modified(self):
+        response = self.app_test.get('/channels')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['version'], 2)
+        self.assertEqual(len(json.loads(response.data)['channels']), 2)
+        etag = response.headers['ETag']
+        response = self.app_test.get(
+            '/channels', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.change_channels()
+        response = self.app_test.get(
+            '/channels', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['version'], 4)
+
+    def test_channels_since_version_over_rest(self):
+        self.change_channels()
+        response = self.app_test.get('/channels?since_version=2')
+        self.assertEqual(json.loads(response.data), {
+            'version': 4,
+            'channels': [{
+                'calendar_id': 'andela.com_3630363835303531343031'
+                '@resource.calendar.google.com',
+                'firebase_token': 'new-token'
+            }],
+            'removed_channels': [
+                'andela.com_3730313534393638323232'
+                '@resource.calendar.google.com'
+            ]
+        })
+
+    def test_archiving_location_removes_its_channels(self):
+        etag = self.app_test.get('/channels').headers['ETag']
+        location = LocationModel.query.get(1)
+        location.state = 'archived'
+        location.save()
+        response = self.app_test.get(
+            '/channels', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        response = self.app_test.get('/channels?since_version=2')
+        self.assertEqual(json.loads(response.data), {
+            'version': 4,
+            'channels': [],
+            'removed_channels': [
+                'andela.com_3630363835303531343031'
+                '@resource.calendar.google.com',
+                'andela.com_3730313534393638323232'
+                '@resource.calendar.google.com'
+            ]
+        })
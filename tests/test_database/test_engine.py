@@ -0,0 +1,79 @@
+from unittest.mock import patch
+
+from config import TestingConfig
+from fixtures.graphql_view.persisted_query_fixtures import rooms_query
+from fixtures.token.token_fixture import ADMIN_TOKEN
+from helpers.database import (
+    db_session, engine, engine_options, pool_stats, set_statement_timeout
+)
+from helpers.metrics.metrics import render_metrics
+from tests.base import BaseTestCase
+
+postgres_uri = 'postgresql://postgres@localhost:5432/converge'
+
+
+class TestEngine(BaseTestCase):
+
+    def show_statement_timeout(self):
+        return db_session.execute('SHOW statement_timeout').scalar()
+
+    def test_postgres_engines_are_pooled_with_timeouts(self):
+        options = engine_options(postgres_uri, TestingConfig)
+        self.assertEqual(options['pool_size'], TestingConfig.DB_POOL_SIZE)
+        self.assertEqual(
+            options['max_overflow'], TestingConfig.DB_MAX_OVERFLOW)
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertEqual(
+            options['connect_args']['options'],
+            '-c idle_in_transaction_session_timeout={} '
+            '-c statement_timeout={}'.format(
+                TestingConfig.DB_IDLE_IN_TRANSACTION_TIMEOUT,
+                TestingConfig.DB_STATEMENT_TIMEOUT))
+
+    def test_sqlite_engines_keep_the_default_pool(self):
+        self.assertEqual(engine_options('sqlite://', TestingConfig),
+                         {'convert_unicode': True})
+
+    def test_transactions_take_the_timeout_of_their_operation(self):
+        if engine.dialect.name != 'postgresql':
+            self.skipTest('statement timeouts are set on Postgres only')
+        default = self.show_statement_timeout()
+        db_session.rollback()
+        with self.app_test.application.test_request_context() as context:
+            context.request.environ['mrm.statement_timeout'] = 1500
+            self.assertEqual(self.show_statement_timeout(), '1500ms')
+            set_statement_timeout(db_session.connection(), None)
+            self.assertEqual(self.show_statement_timeout(), default)
+            db_session.rollback()
+
+    def test_operations_are_given_their_timeouts(self):
+        with patch.dict(self.app_test.application.config,
+                        DB_OPERATION_STATEMENT_TIMEOUTS={'allRooms': 1500}), \
+                patch('helpers.graphql_view.graphql_view'
+                      '.set_statement_timeout') as set_timeout:
+            response = self.app_test.post(
+                '/mrm?query=' + rooms_query,
+                headers={'Authorization': 'Bearer ' + ADMIN_TOKEN})
+        self.assert200(response)
+        self.assertEqual(set_timeout.call_args[0][1], 1500)
+
+    def test_operations_take_the_smallest_timeout_of_their_fields(self):
+        timeouts = {'allRooms': 1500, 'allLocations': 1000, 'rooms': 10}
+        query = 'query rooms { allRooms { rooms { name } } ' \
+            'allLocations { name } }'
+        with patch.dict(self.app_test.application.config,
+                        DB_OPERATION_STATEMENT_TIMEOUTS=timeouts), \
+                patch('helpers.graphql_view.graphql_view'
+                      '.set_statement_timeout') as set_timeout:
+            response = self.app_test.post(
+                '/mrm?query=' + query,
+                headers={'Authorization': 'Bearer ' + ADMIN_TOKEN})
+        self.assert200(response)
+        self.assertEqual(set_timeout.call_args[0][1], 1000)
+
+    def test_pool_stats_are_rendered_as_gauges(self):
+        stats = pool_stats()
+        if stats is None:
+            self.skipTest('the test database is not pooled')
+        self.assertIn('mrm_db_pool_checked_out {}'.format(
+            stats['checked_out']), render_metrics(stats))
@@ -0,0 +1,99 @@
+import json
+from collections import Counter
+from unittest.mock import patch
+
+import psycopg2
+from sqlalchemy import event
+
+from api.tag.models import Tag
+from config import TestingConfig
+from fixtures.database.replica_fixtures import (
+    create_tag_mutation,
+    rooms_query,
+    unreachable_replica_url
+)
+from fixtures.token.token_fixture import ADMIN_TOKEN
+from helpers.database import (
+    ReplicaSet, database_uri, db_session, engine, read_only
+)
+from helpers.graphql_view.recent_writes import RecentWrites
+from tests.base import BaseTestCase
+
+
+class TestReplicas(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.statements = Counter()
+        self.replicas = ReplicaSet([database_uri], TestingConfig)
+        self.replica = self.replicas.engines[0]
+        event.listen(self.replica, 'before_cursor_execute', self.count)
+        self.addCleanup(self.replica.dispose)
+        for patcher in (
+                patch('helpers.database.replicas', self.replicas),
+                patch('helpers.graphql_view.graphql_view.recent_writes',
+                      RecentWrites(ttl=10))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def count(self, conn, cursor, statement, *args):
+        if statement != 'SELECT 1':
+            self.statements['replica'] += 1
+
+    def post(self, query):
+        response = self.app_test.post(
+            '/mrm?query=' + query,
+            headers={'Authorization': 'Bearer ' + ADMIN_TOKEN})
+        self.assertNotIn('errors', json.loads(response.data))
+        return response
+
+    def test_queries_read_from_a_replica(self):
+        self.post(rooms_query)
+        self.assertGreater(self.statements['replica'], 0)
+
+    def test_tokens_read_their_writes_after_a_mutation(self):
+        self.post(create_tag_mutation)
+        self.statements.clear()
+        self.post(rooms_query)
+        self.assertEqual(self.statements['replica'], 0)
+
+    def test_reads_fail_over_to_the_primary(self):
+        replicas = ReplicaSet([unreachable_replica_url], TestingConfig)
+        with patch('helpers.database.replicas', replicas), \
+                patch('helpers.database.logger') as logger:
+            self.post(rooms_query)
+            self.post(rooms_query)
+        self.assertIsNone(replicas.choose())
+        self.assertEqual(logger.warning.call_count, 1)
+
+    def test_reads_fail_over_when_the_chosen_replica_stops(self):
+        self.post(rooms_query)
+        self.replica.dispose()
+        self.statements.clear()
+        with patch.object(self.replica.dialect, 'connect',
+                          side_effect=psycopg2.OperationalError(
+                              'could not connect to server')), \
+                patch('helpers.database.logger') as logger:
+            self.post(rooms_query)
+            self.post(rooms_query)
+        self.assertEqual(self.statements['replica'], 0)
+        self.assertFalse(self.replicas.available(self.replica))
+        self.assertEqual(logger.warning.call_count, 1)
+
+    def test_sessions_read_from_the_primary_once_they_wrote(self):
+        with self.app_test.application.test_request_context(), read_only():
+            db_session.remove()
+            self.assertIs(db_session.get_bind(Tag), self.replica)
+            db_session.add(Tag(
+                name='Replicated', color='blue', description='Block'))
+            db_session.flush()
+            self.assertIs(db_session.get_bind(Tag), engine)
+            db_session.rollback()
+
+    def test_recent_writes_expire(self):
+        recent_writes = RecentWrites(ttl=0)
+        recent_writes.add(ADMIN_TOKEN)
+        self.assertFalse(recent_writes.contains(ADMIN_TOKEN))
+        recent_writes.ttl = 10
+        recent_writes.add(ADMIN_TOKEN)
+        self.assertTrue(recent_writes.contains(ADMIN_TOKEN))
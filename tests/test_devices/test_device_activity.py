@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from tests.base import BaseTestCase, CommonTestCases
+from api.devices.models import Devices as DevicesModel
+from fixtures.devices.devices_fixtures import query_device
+from fixtures.events.event_checkin_fixtures import (
+    event_checkin_mutation,
+    event_checkin_response
+)
+from helpers.database import engine, db_session
+from helpers.devices.device_activity import device_activity
+
+
+class TestDeviceActivity(BaseTestCase):
+    """
+    Test that device heartbeats are buffered and written behind
+    """
+    def stored_activity(self):
+        db_session.expire_all()
+        device = DevicesModel.query.get(1)
+        return device.last_seen, device.last_activity
+
+    def test_check_in_buffers_device_activity(self):
+        CommonTestCases.user_token_assert_equal(
+            self,
+            event_checkin_mutation,
+            event_checkin_response
+        )
+        self.assertEqual(
+            self.stored_activity(),
+            (datetime(2018, 6, 8, 11, 17, 58, 785136), None))
+        self.assertEqual(
+            device_activity.pending_activity([1]),
+            {1: (datetime(2018, 7, 10, 9, 0), 'check in')})
+
+    def test_reads_merge_unflushed_activity(self):
+        device_activity.record(1, '2019-01-02T10:00:00Z', 'check in')
+        CommonTestCases.admin_token_assert_in(
+            self,
+            query_device,
+            '"lastSeen":"2019-01-02T10:00:00"'
+        )
+
+    def test_flush_writes_latest_activity_in_one_update(self):
+        device_activity.record(1, '2019-01-02T10:00:00Z', 'check in')
+        device_activity.record(1, '2019-01-02T10:40:00Z', 'end meeting')
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', record_statement)
+        try:
+            self.assertEqual(device_activity.flush(), 1)
+        finally:
+            event.remove(engine, 'before_cursor_execute', record_statement)
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(
+            self.stored_activity(),
+            (datetime(2019, 1, 2, 10, 40), 'end meeting'))
+        self.assertEqual(device_activity.pending_activity([1]), {})
@@ -0,0 +1,90 @@
+from datetime import datetime
+
+from sqlalchemy import event
+
+from tests.base import BaseTestCase, CommonTestCases
+from api.devices.models import (
+    Devices as DevicesModel,
+    DeviceHealthTransition
+)
+from fixtures.devices.devices_fixtures import (
+    device_health_summary_query,
+    device_health_summary_response,
+    device_health_summary_recovered_response,
+    device_health_summary_invalid_location_query
+)
+from helpers.database import db_session, engine
+from helpers.devices.device_activity import device_activity
+from helpers.devices.device_health import (
+    classify_device_health,
+    device_health_counts,
+    unhealthy_devices
+)
+
+
+class TestDeviceHealth(BaseTestCase):
+    """
+    Test that devices are classified by the age of their heartbeats
+    """
+    def transitions(self):
+        return [
+            (transition.previous_status.value, transition.status.value)
+            for transition in DeviceHealthTransition.query.order_by(
+                DeviceHealthTransition.id)
+        ]
+
+    def test_classification_records_transitions_once(self):
+        self.assertEqual(classify_device_health(), 1)
+        self.assertEqual(classify_device_health(), 0)
+        self.assertEqual(self.transitions(), [('online', 'offline')])
+
+    def test_health_summary_lists_unhealthy_devices(self):
+        classify_device_health()
+        CommonTestCases.admin_token_assert_equal(
+            self,
+            device_health_summary_query,
+            device_health_summary_response
+        )
+
+    def test_heartbeat_brings_device_back_online(self):
+        classify_device_health()
+        device_activity.record(1, datetime.utcnow(), 'check in')
+        CommonTestCases.admin_token_assert_equal(
+            self,
+            device_health_summary_query,
+            device_health_summary_recovered_response
+        )
+        device_activity.flush()
+        db_session.expire_all()
+        self.assertEqual(
+            DevicesModel.query.get(1).health_status.value, 'online')
+        self.assertEqual(
+            self.transitions(),
+            [('online', 'offline'), ('offline', 'online')])
+
+    def test_health_summary_of_invalid_location(self):
+        CommonTestCases.admin_token_assert_in(
+            self,
+            device_health_summary_invalid_location_query,
+            "Location not found"
+        )
+
+    def test_location_filters_use_the_location_index(self):
+        statements = []
+
+        def record_statement(conn, cursor, statement, parameters, *args):
+            statements.append((statement, parameters))
+        event.listen(engine, 'before_cursor_execute', record_statement)
+        try:
+            device_health_counts('Kampala')
+            unhealthy_devices('Kampala')
+        finally:
+            event.remove(engine, 'before_cursor_execute', record_statement)
+        connection = db_session.connection()
+        connection.execute('SET LOCAL enable_seqscan = off')
+        for statement, parameters in statements:
+            plan = [row[0] for row in connection.execute(
+                'EXPLAIN ' + statement, parameters)]
+            self.assertTrue(any(
+                'ix_devices_lower_location' in line for line in plan))
+        db_session.rollback()
@@ -0,0 +1,87 @@
+from unittest.mock import patch, MagicMock
+
+from sqlalchemy import event
+
+from tests.base import BaseTestCase
+from api.events.models import Events as EventsModel
+from helpers.database import engine
+from services.room_cancelation.auto_cancel_event import UpdateRecurringEvent
+
+CALENDAR_ID = 'andela.com_3630363835303531343031@resource.calendar.google.com'
+
+
+class TestAutoCancelEvent(BaseTestCase):
+    """
+    Test that recurring series missed consecutively are cancelled
+    """
+    def add_occurrences(self, recurring_event_id, checked_in):
+        for day, attended in enumerate(checked_in, start=1):
+            EventsModel(
+                event_id='{}_{}'.format(recurring_event_id, day),
+                recurring_event_id=recurring_event_id,
+                room_id=1,
+                event_title='Standup',
+                start_time='2019-01-0{}T09:00:00Z'.format(day),
+                end_time='2019-01-0{}T09:15:00Z'.format(day),
+                number_of_participants=3,
+                checked_in=attended,
+                cancelled=False
+            ).save()
+
+    def setUp(self):
+        super().setUp()
+        self.add_occurrences('missed', [True, False, False, False])
+        self.add_occurrences('attended', [False, False, True])
+        self.add_occurrences('recovered', [False, False, False, True])
+
+    def test_finds_only_consecutively_missed_series(self):
+        series = UpdateRecurringEvent().find_unattended_series()
+        self.assertEqual(series, [{
+            'recurring_event_id': 'missed',
+            'room_id': 1,
+            'calendar_id': CALENDAR_ID,
+            'last_start_time': '2019-01-04T09:00:00Z'
+        }])
+
+    @patch('services.room_cancelation.auto_cancel_event.Credentials')
+    def test_dry_run_reports_candidates_only(self, mock_credentials):
+        series = UpdateRecurringEvent().update_recurring_event_status(
+            dry_run=True)
+        self.assertEqual(
+            [candidate['recurring_event_id'] for candidate in series],
+            ['missed'])
+        mock_credentials.assert_not_called()
+        self.assertEqual(EventsModel.query.filter_by(
+            recurring_event_id='missed', state='archived').count(), 0)
+
+    @patch('services.room_cancelation.auto_cancel_event.notification')
+    @patch('services.room_cancelation.auto_cancel_event.Credentials')
+    def test_declines_and_archives_flagged_series(
+            self, mock_credentials, mock_notification):
+        service = MagicMock()
+        service.events().get().execute.return_value = {
+            'summary': 'Standup',
+            'attendees': [{'email': CALENDAR_ID, 'responseStatus': 'accepted'}]
+        }
+        service.events().list().execute.return_value = {'items': []}
+        mock_credentials().set_api_credentials.return_value = service
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            if statement.startswith('UPDATE events'):
+                statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', record_statement)
+        try:
+            UpdateRecurringEvent().update_recurring_event_status()
+        finally:
+            event.remove(engine, 'before_cursor_execute', record_statement)
+        patch_call = service.events().patch.call_args
+        self.assertEqual(patch_call[1]['eventId'], 'missed')
+        self.assertEqual(
+            patch_call[1]['body']['attendees'][0]['responseStatus'],
+            'declined')
+        self.assertEqual(len(statements), 1)
+        archived = EventsModel.query.filter_by(state='archived')
+        self.assertEqual(
+            sorted(occurrence.event_id for occurrence in archived),
+            ['missed_2', 'missed_3', 'missed_4'])
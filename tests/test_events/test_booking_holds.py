@@ -0,0 +1,97 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from graphql import GraphQLError
+
+from api.events.models import BookingHold
+from api.room.models import Room as RoomModel
+from helpers.calendar.events import CalendarEvents
+from helpers.database import db_session
+from helpers.event_booking.event_booking import book_room, hold_room
+from tests.base import BaseTestCase, CommonTestCases
+from fixtures.events.book_event_fixtures import book_event_mutation
+
+START = datetime(2029, 11, 6, 8, tzinfo=timezone.utc)
+END = START + timedelta(hours=1)
+
+
+class TestBookingHolds(BaseTestCase):
+
+    def test_concurrent_bookings_hold_the_room_once(self):
+        barrier = threading.Barrier(8)
+        booked = []
+        rejected = []
+
+        def book(number):
+            barrier.wait()
+            try:
+                booked.append(book_room(
+                    1, START + timedelta(minutes=number), END,
+                    lambda: {'id': 'event_{}'.format(number)}))
+            except GraphQLError:
+                rejected.append(number)
+            finally:
+                db_session.remove()
+
+        threads = [threading.Thread(target=book, args=(number,))
+                   for number in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(booked), 1)
+        self.assertEqual(len(rejected), 7)
+        hold = BookingHold.query.one()
+        self.assertTrue(hold.confirmed)
+        self.assertEqual(hold.event_id, booked[0]['id'])
+        self.assertEqual(hold.expires_at, hold.time_range.upper)
+
+    def test_hold_rejects_synced_event_overlap(self):
+        start = datetime(2018, 7, 11, 9, 30, tzinfo=timezone.utc)
+        with self.assertRaises(GraphQLError):
+            hold_room(1, start, start + timedelta(hours=1))
+        self.assertTrue(hold_room(2, start, start + timedelta(hours=1)))
+
+    def test_adjacent_periods_can_be_held(self):
+        hold_room(1, START, END)
+        self.assertTrue(hold_room(1, END, END + timedelta(hours=1)))
+
+    def test_failed_calendar_write_releases_hold(self):
+        def create_event():
+            raise ValueError('calendar unavailable')
+
+        with self.assertRaises(ValueError):
+            book_room(1, START, END, create_event)
+        self.assertEqual(BookingHold.query.count(), 0)
+        self.assertEqual(
+            book_room(1, START, END, lambda: {'id': 'event'}), {'id': 'event'})
+
+    def test_lapsed_hold_does_not_block(self):
+        hold_id = hold_room(1, START, END)
+        BookingHold.query.filter_by(id=hold_id).update({
+            'expires_at': datetime.now(timezone.utc) - timedelta(seconds=1)})
+        db_session.commit()
+        self.assertNotEqual(hold_room(1, START, END), hold_id)
+        self.assertEqual(BookingHold.query.count(), 1)
+
+    @patch('api.events.schema.credentials')
+    def test_book_event_rejects_double_booking(self, mock_credentials):
+        service = mock_credentials.set_api_credentials.return_value
+        service.events().insert().execute.return_value = {'id': 'event'}
+        CommonTestCases.user_token_assert_in(
+            self, book_event_mutation, 'Event created successfully')
+        CommonTestCases.user_token_assert_in(
+            self, book_event_mutation, 'Room is already booked for that time')
+        self.assertEqual(service.events().insert().execute.call_count, 1)
+
+    @patch('helpers.calendar.events.get_google_calendar_events')
+    def test_sync_releases_holds_of_seen_events(self, mock_events):
+        book_room(1, START, END, lambda: {'id': 'cancelled_event'})
+        book_room(1, END, END + timedelta(hours=1), lambda: {'id': 'event'})
+        mock_events.return_value = {'items': [
+            {'id': 'cancelled_event', 'status': 'cancelled'}]}
+        CalendarEvents().sync_single_room_events(RoomModel.query.get(1))
+        self.assertEqual(
+            [hold.event_id for hold in BookingHold.query], ['event'])
+        self.assertTrue(hold_room(1, START, END))
@@ -1,7 +1,13 @@
 import sys
 import os
+import threading
 from unittest.mock import patch
+from graphql import GraphQLError
+from sqlalchemy import event
 from tests.base import BaseTestCase, CommonTestCases
+from api.events.models import Events as EventsModel
+from helpers.database import engine, db_session
+from helpers.event_checkin.event_checkin import check_in_event
 from fixtures.events.event_checkin_fixtures import (
     event_checkin_mutation,
     event_2_checkin_mutation,
@@ -148,3 +154,95 @@ class TestEventCheckin(BaseTestCase):
             checkin_mutation_for_event_existing_in_db,
             response_for_event_existing_in_db_checkin
         )
+
+    def test_checkin_room_with_no_device_saves_nothing(self):
+        """
+        Test that a check in that fails on the device update does not
+        leave the event behind
+        """
+        CommonTestCases.user_token_assert_in(
+            self,
+            event_2_checkin_mutation,
+            "Room device not found"
+        )
+        self.assertEqual(
+            EventsModel.query.filter_by(event_id="test_id6").count(), 0)
+
+    def test_checkin_runs_two_statements_in_one_transaction(self):
+        """
+        Test that the event and device writes share a single transaction
+        """
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        def record_commit(conn):
+            statements.append('COMMIT')
+
+        def record_begin(conn):
+            statements.append('BEGIN')
+        event.listen(engine, 'before_cursor_execute', record_statement)
+        event.listen(engine, 'commit', record_commit)
+        event.listen(engine, 'begin', record_begin)
+        try:
+            CommonTestCases.user_token_assert_equal(
+                self,
+                event_checkin_mutation,
+                event_checkin_response
+            )
+        finally:
+            event.remove(engine, 'before_cursor_execute', record_statement)
+            event.remove(engine, 'commit', record_commit)
+            event.remove(engine, 'begin', record_begin)
+        self.assertEqual(statements[0], 'BEGIN')
+        self.assertTrue(statements[1].startswith('INSERT INTO events'))
+        self.assertIn('ON CONFLICT (event_id, start_time) DO UPDATE',
+                      statements[1])
+        self.assertIn('RETURNING', statements[1])
+        self.assertTrue(statements[2].startswith(
+            'SELECT min(devices.id)'))
+        self.assertEqual(statements[3], 'COMMIT')
+        self.assertEqual(statements.count('COMMIT'), 1)
+        # after the commit only the response is read back
+        self.assertTrue(all(
+            statement in ('BEGIN', 'ROLLBACK') or
+            statement.startswith('SELECT')
+            for statement in statements[4:]))
+
+    def test_concurrent_checkins_record_one_event(self):
+        """
+        Test that two tablets checking into the same event at once
+        create a single event and only one check in succeeds
+        """
+        arguments = {
+            'calendar_id': 'andela.com_3630363835303531343031@resource.calendar.google.com',  # noqa: E501
+            'event_id': 'test_id7',
+            'event_title': 'Onboarding',
+            'start_time': '2018-07-12T09:00:00Z',
+            'end_time': '2018-07-12T09:45:00Z',
+            'number_of_participants': 4,
+            'check_in_time': '2018-07-12T09:00:00Z'
+        }
+        barrier = threading.Barrier(2)
+        outcomes = []
+
+        def tap_check_in():
+            barrier.wait()
+            try:
+                check_in_event(**arguments)
+                outcomes.append('checked in')
+            except GraphQLError as error:
+                outcomes.append(error.message)
+            finally:
+                db_session.remove()
+
+        tablets = [threading.Thread(target=tap_check_in) for _ in range(2)]
+        for tablet in tablets:
+            tablet.start()
+        for tablet in tablets:
+            tablet.join()
+        self.assertEqual(
+            sorted(outcomes), ['Event already checked in', 'checked in'])
+        self.assertEqual(
+            EventsModel.query.filter_by(event_id='test_id7').count(), 1)
@@ -0,0 +1,142 @@
+import random
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy import event as sqlalchemy_event
+
+from tests.base import BaseTestCase
+from api.events.models import Events as EventsModel
+from api.room.models import Room as RoomModel
+from helpers.calendar.events import CalendarEvents
+from helpers.database import db_session, engine
+from helpers.event_deadlines.event_deadlines import (
+    CheckInDeadlines,
+    cancel_due_events,
+    check_in_deadline,
+    checkin_deadlines,
+    schedule_upcoming_events
+)
+
+
+class TestCheckInDeadlines(BaseTestCase):
+    """
+    Test that unattended meetings are cancelled when their deadline passes
+    """
+    def assert_pops_deadlines_in_order(self, deadlines, event_ids):
+        generator = random.Random(7)
+        # deadlines in milliseconds, so that equal deadlines compare equal
+        # in every backend
+        expected = {
+            event_id: generator.randrange(1000000) for event_id in event_ids
+        }
+        for page in range(0, len(event_ids), 1000):
+            deadlines.schedule_many({
+                event_id: expected[event_id] / 1000
+                for event_id in event_ids[page:page + 1000]
+            })
+        for event_id in event_ids[::10]:
+            expected[event_id] += 500000
+        deadlines.schedule_many({
+            event_id: expected[event_id] / 1000
+            for event_id in event_ids[::10]
+        })
+        for event_id in event_ids[5::10]:
+            del expected[event_id]
+        deadlines.unschedule_many(event_ids[5::10])
+        due = []
+        while True:
+            popped = deadlines.pop_due(now=600, limit=5000)
+            if not popped:
+                break
+            due.extend(popped)
+        self.assertEqual(
+            due,
+            sorted((event_id for event_id, deadline in expected.items()
+                    if deadline <= 600000), key=expected.get))
+        self.assertEqual(len(deadlines), len(expected) - len(due))
+
+    def test_pops_tens_of_thousands_of_deadlines_in_order(self):
+        self.assert_pops_deadlines_in_order(
+            CheckInDeadlines(in_process=True), list(range(50000)))
+
+    def test_pops_tens_of_thousands_of_shared_deadlines_in_order(self):
+        event_ids = [row.id for row in db_session.execute('''
+            INSERT INTO events (id, event_id, room_id, event_title,
+                start_time, end_time, number_of_participants, state)
+            SELECT nextval('events_id_seq'), 'scale_' || n, 1, 'Standup',
+                '2018-07-11T09:00:00Z', '2018-07-11T09:15:00Z', 2, 'active'
+            FROM generate_series(1, 50000) AS n
+            RETURNING id''')]
+        db_session.commit()
+        self.assert_pops_deadlines_in_order(CheckInDeadlines(), event_ids)
+
+    def test_deadlines_are_shared_without_redis(self):
+        CheckInDeadlines().schedule(1, 50)
+        CheckInDeadlines().schedule(1, 5)
+        worker = CheckInDeadlines()
+        self.assertEqual(len(worker), 1)
+        self.assertEqual(worker.pop_due(now=10), [1])
+        self.assertEqual(len(checkin_deadlines), 0)
+
+    def test_cancels_unattended_event_once(self):
+        checkin_deadlines.schedule(1, 0)
+        cancelled = cancel_due_events(now=1)
+        self.assertEqual(
+            [(event.id, event.event_id) for event in cancelled],
+            [(1, 'test_id5')])
+        db_session.expire_all()
+        event = EventsModel.query.get(1)
+        self.assertTrue(event.cancelled)
+        self.assertTrue(event.auto_cancelled)
+        checkin_deadlines.schedule(1, 0)
+        self.assertEqual(cancel_due_events(now=1), [])
+
+    def test_checked_in_event_is_not_cancelled(self):
+        event = EventsModel.query.get(1)
+        event.checked_in = True
+        event.save()
+        checkin_deadlines.schedule(1, 0)
+        self.assertEqual(cancel_due_events(now=1), [])
+        self.assertFalse(EventsModel.query.get(1).cancelled)
+
+    def test_schedules_upcoming_events_only(self):
+        start_time = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+        EventsModel(
+            event_id='upcoming',
+            room_id=1,
+            event_title='Planning',
+            start_time=start_time + 'Z',
+            end_time=start_time + 'Z',
+            number_of_participants=2,
+            checked_in=False,
+            cancelled=False
+        ).save()
+        self.assertEqual(schedule_upcoming_events(), 1)
+        deadline = check_in_deadline(start_time, 10)
+        self.assertEqual(checkin_deadlines.pop_due(now=deadline - 1), [])
+        self.assertEqual(checkin_deadlines.pop_due(now=deadline), [2])
+
+    @patch('helpers.calendar.events.get_google_calendar_events')
+    def test_sync_schedules_a_page_in_one_write(self, mock_events):
+        start_time = (datetime.utcnow() + timedelta(hours=1)).isoformat()
+        mock_events.return_value = {'items': [{
+            'id': 'synced_{}'.format(number),
+            'summary': 'Planning',
+            'start': {'dateTime': start_time + 'Z'},
+            'end': {'dateTime': start_time + 'Z'}
+        } for number in range(3)]}
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+        sqlalchemy_event.listen(
+            engine, 'before_cursor_execute', record_statement)
+        try:
+            CalendarEvents().sync_single_room_events(RoomModel.query.get(1))
+        finally:
+            sqlalchemy_event.remove(
+                engine, 'before_cursor_execute', record_statement)
+        self.assertEqual(len([
+            statement for statement in statements
+            if 'INTO checkin_deadlines' in statement]), 1)
+        self.assertEqual(len(checkin_deadlines), 3)
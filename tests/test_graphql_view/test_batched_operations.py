@@ -0,0 +1,76 @@
+import json
+from unittest.mock import patch
+
+from sqlalchemy import event
+
+from fixtures.token.token_fixture import ADMIN_TOKEN
+from helpers.database import engine
+from tests.base import BaseTestCase
+from fixtures.graphql_view.batch_fixtures import (
+    batch_size_response,
+    invalid_batch_response
+)
+from fixtures.graphql_view.dashboard_fixtures import (
+    dashboard_query,
+    dashboard_response
+)
+from fixtures.graphql_view.persisted_query_fixtures import (
+    rooms_query,
+    rooms_response
+)
+
+
+class TestBatchedOperations(BaseTestCase):
+
+    def post(self, body):
+        response = self.app_test.post(
+            '/mrm', data=json.dumps(body), content_type='application/json',
+            headers={'Authorization': 'Bearer ' + ADMIN_TOKEN})
+        return response.status_code, json.loads(response.data)
+
+    def count_user_lookups(self, body):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            if 'FROM users' in statement:
+                statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            self.post(body)
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        return len(statements)
+
+    def test_batch_responses_match_single_operations(self):
+        status_code, responses = self.post([
+            {'query': rooms_query}, {'query': dashboard_query}])
+        self.assertEqual(status_code, 200)
+        self.assertEqual(responses, [rooms_response, dashboard_response])
+        self.assertEqual(self.post({'query': rooms_query}),
+                         (200, rooms_response))
+
+    def test_batch_shares_user_lookups(self):
+        single = self.count_user_lookups({'query': dashboard_query})
+        batch = self.count_user_lookups([{'query': dashboard_query}] * 3)
+        self.assertEqual(batch, single)
+
+    def test_batch_of_queries_runs_in_parallel_mode(self):
+        with patch.dict(self.app_test.application.config,
+                        GRAPHQL_PARALLEL_EXECUTION=True):
+            status_code, responses = self.post([
+                {'query': dashboard_query}, {'query': rooms_query},
+                {'query': dashboard_query}])
+        self.assertEqual(status_code, 200)
+        self.assertEqual(
+            responses,
+            [dashboard_response, rooms_response, dashboard_response])
+
+    def test_invalid_batches_are_rejected(self):
+        with patch.dict(self.app_test.application.config,
+                        GRAPHQL_MAX_BATCH_SIZE=2):
+            self.assertEqual(self.post([]), (400, batch_size_response))
+            self.assertEqual(self.post([{'query': rooms_query}] * 3),
+                             (400, batch_size_response))
+        self.assertEqual(self.post([rooms_query]),
+                         (400, invalid_batch_response))
@@ -0,0 +1,100 @@
+import json
+from unittest.mock import patch
+
+from helpers.graphql_view.document_cache import DocumentCache, query_hash
+from helpers.graphql_view.graphql_view import (
+    document_cache, persisted_queries
+)
+from schema import schema
+from tests.base import BaseTestCase, CommonTestCases
+from fixtures.token.token_fixture import USER_TOKEN
+from fixtures.graphql_view.persisted_query_fixtures import (
+    rooms_query,
+    rooms_query_hash,
+    rooms_response,
+    invalid_field_query,
+    persisted_query_not_found_response
+)
+
+
+def persisted_query(sha256_hash):
+    return {'persistedQuery': {'version': 1, 'sha256Hash': sha256_hash}}
+
+
+class TestDocumentCache(BaseTestCase):
+
+    def post(self, token=USER_TOKEN, **body):
+        headers = {'Authorization': 'Bearer ' + token} if token else {}
+        response = self.app_test.post(
+            '/mrm', data=json.dumps(body), content_type='application/json',
+            headers=headers)
+        return json.loads(response.data)
+
+    def test_documents_are_parsed_once(self):
+        document_cache.clear()
+        for _ in range(3):
+            CommonTestCases.user_token_assert_equal(
+                self, rooms_query, rooms_response)
+        self.assertEqual((document_cache.misses, document_cache.hits), (1, 2))
+
+    def test_validation_errors_are_cached(self):
+        cache = DocumentCache()
+        first = cache.get(schema, invalid_field_query)
+        self.assertIs(cache.get(schema, invalid_field_query), first)
+        self.assertIn('Cannot query field "colour"', first[1][0].message)
+        document, errors = cache.get(schema, 'query {')
+        self.assertIsNone(document)
+        self.assertIn('Syntax Error', errors[0].message)
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = DocumentCache(maxsize=2)
+        cache.get(schema, '{ a: allRooms { rooms { name } } }')
+        cache.get(schema, '{ b: allRooms { rooms { name } } }')
+        cache.get(schema, '{ a: allRooms { rooms { name } } }')
+        cache.get(schema, '{ c: allRooms { rooms { name } } }')
+        cache.get(schema, '{ a: allRooms { rooms { name } } }')
+        self.assertEqual((cache.misses, cache.hits), (3, 2))
+
+    def test_persisted_query_is_registered_then_sent_by_hash(self):
+        self.assertEqual(
+            self.post(extensions=persisted_query(rooms_query_hash)),
+            persisted_query_not_found_response)
+        self.assertEqual(
+            self.post(query=rooms_query,
+                      extensions=persisted_query(rooms_query_hash)),
+            rooms_response)
+        self.assertEqual(
+            self.post(extensions=persisted_query(rooms_query_hash)),
+            rooms_response)
+
+    def test_persisted_query_by_get(self):
+        self.post(query=rooms_query,
+                  extensions=persisted_query(rooms_query_hash))
+        response = self.app_test.get('/mrm', query_string={
+            'extensions': json.dumps(persisted_query(rooms_query_hash))})
+        self.assertEqual(json.loads(response.data), rooms_response)
+
+    def test_persisted_query_hash_must_match(self):
+        response = self.post(
+            query=rooms_query, extensions=persisted_query('0' * 64))
+        self.assertEqual(
+            response['errors'][0]['message'],
+            'provided sha does not match query')
+
+    def test_only_valid_queries_with_a_token_are_persisted(self):
+        self.post(query=invalid_field_query,
+                  extensions=persisted_query(query_hash(invalid_field_query)))
+        self.post(token=None, query=rooms_query,
+                  extensions=persisted_query(rooms_query_hash))
+        self.assertIsNone(persisted_queries.get(rooms_query_hash))
+        self.assertIsNone(persisted_queries.get(
+            query_hash(invalid_field_query)))
+
+    def test_large_queries_are_not_persisted(self):
+        with patch.object(persisted_queries, 'max_size', 10):
+            response = self.post(
+                query=rooms_query,
+                extensions=persisted_query(rooms_query_hash))
+        self.assertEqual(
+            response['errors'][0]['message'], 'Persisted query is too large')
+        self.assertIsNone(persisted_queries.get(rooms_query_hash))
@@ -0,0 +1,87 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import graphene
+from httplib2 import Http
+
+from helpers.calendar.credentials import BoundedHttp
+from helpers.graphql_view.executor import ParallelFieldExecutor
+from tests.base import BaseTestCase, CommonTestCases
+from fixtures.graphql_view.dashboard_fixtures import (
+    dashboard_query,
+    dashboard_response
+)
+
+
+class Slow(graphene.ObjectType):
+    thread = graphene.String()
+
+    def resolve_thread(self, info):
+        return threading.current_thread().name
+
+
+class SlowQuery(graphene.ObjectType):
+    first = graphene.Field(Slow)
+    second = graphene.Field(Slow)
+
+    def resolve_first(self, info):
+        time.sleep(0.2)
+        return Slow()
+
+    def resolve_second(self, info):
+        time.sleep(0.2)
+        return Slow()
+
+
+class TestParallelExecution(BaseTestCase):
+
+    def test_dashboard_fields_resolve_in_parallel_mode(self):
+        with patch.dict(
+                self.app_test.application.config,
+                GRAPHQL_PARALLEL_EXECUTION=True):
+            CommonTestCases.admin_token_assert_equal(
+                self, dashboard_query, dashboard_response)
+        CommonTestCases.admin_token_assert_equal(
+            self, dashboard_query, dashboard_response)
+
+    def test_selected_fields_run_concurrently(self):
+        schema = graphene.Schema(query=SlowQuery)
+        executor = ParallelFieldExecutor(
+            ThreadPoolExecutor(max_workers=2),
+            fields={'SlowQuery.first', 'SlowQuery.second'})
+        started = time.perf_counter()
+        with self.app.test_request_context():
+            result = schema.execute(
+                '{ first { thread } second { thread } }', executor=executor)
+        self.assertLess(time.perf_counter() - started, 0.35)
+        self.assertEqual(result.data['first']['thread'],
+                         threading.current_thread().name)
+        self.assertEqual(result.data['second']['thread'],
+                         threading.current_thread().name)
+
+    def test_google_requests_in_flight_are_bounded(self):
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def request(self, *args, **kwargs):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.pop()
+
+        semaphore = threading.BoundedSemaphore(2)
+        with patch.object(Http, 'request', request), \
+                patch('helpers.calendar.credentials.google_calls', semaphore):
+            threads = [threading.Thread(target=BoundedHttp().request,
+                                        args=('https://www.googleapis.com',))
+                       for _ in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(max(peak), 2)
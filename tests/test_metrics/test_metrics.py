@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+from httplib2 import Http
+
+from api.room.models import Room
+from fixtures.token.token_fixture import ADMIN_TOKEN
+from helpers.calendar.credentials import BoundedHttp
+from helpers.metrics.metrics import (
+    Histogram,
+    external_call_seconds,
+    request_queries,
+    track_request
+)
+from tests.base import BaseTestCase, change_user_role_to_super_admin
+from fixtures.graphql_view.persisted_query_fixtures import rooms_query
+
+histogram_text = '''# HELP mrm_test_seconds Test durations
+# TYPE mrm_test_seconds histogram
+mrm_test_seconds_bucket{field="Query.a",le="0.1"} 1
+mrm_test_seconds_bucket{field="Query.a",le="1"} 2
+mrm_test_seconds_bucket{field="Query.a",le="+Inf"} 3
+mrm_test_seconds_sum{field="Query.a"} 5.55
+mrm_test_seconds_count{field="Query.a"} 3'''
+
+
+class TestMetrics(BaseTestCase):
+
+    def post(self, query):
+        return self.app_test.post(
+            '/mrm?query=' + query,
+            headers={'Authorization': 'Bearer ' + ADMIN_TOKEN})
+
+    def test_histograms_render_in_prometheus_text_format(self):
+        histogram = Histogram(
+            'mrm_test_seconds', 'Test durations', 'field', (0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe('Query.a', value)
+        self.assertEqual(histogram.render(), histogram_text)
+
+    @change_user_role_to_super_admin
+    def test_metrics_report_operations_and_resolvers(self):
+        self.post(rooms_query)
+        response = self.app_test.get(
+            '/metrics', headers={'Authorization': 'Bearer ' + ADMIN_TOKEN})
+        self.assert200(response)
+        metrics = response.data.decode()
+        self.assertIn('mrm_request_seconds_count{operation="allRooms"}',
+                      metrics)
+        self.assertIn('mrm_request_queries_count{operation="allRooms"}',
+                      metrics)
+        self.assertIn('mrm_resolver_seconds_count{field="Query.allRooms"}',
+                      metrics)
+
+    def test_operation_names_do_not_label_metrics(self):
+        self.post('query RandomName123 { allRooms { rooms { name } } }')
+        self.assertNotIn('RandomName123', request_queries.render())
+        self.assertIn('operation="allRooms"', request_queries.render())
+
+    def test_queries_are_counted_per_request(self):
+        count = request_queries.series.get('none', {}).get('count', 0)
+        with self.app_test.application.test_request_context():
+            with track_request(10, 5) as stats:
+                Room.query.all()
+                Room.query.filter_by(name='Entebbe').first()
+        self.assertEqual(len(stats.queries), 2)
+        self.assertTrue(all('FROM rooms' in statement
+                            for statement, _ in stats.queries))
+        self.assertEqual(request_queries.series['none']['count'], count + 1)
+
+    def test_slow_requests_are_logged_with_their_queries(self):
+        with patch.dict(self.app_test.application.config,
+                        SLOW_REQUEST_SECONDS=0), \
+                patch('helpers.metrics.metrics.logger') as logger:
+            self.post(rooms_query)
+        message, *args = logger.warning.call_args[0]
+        self.assertIn('Slow request allRooms', message % tuple(args))
+        self.assertIn('FROM rooms', message % tuple(args))
+
+    def test_google_calls_are_timed(self):
+        series = external_call_seconds.series
+        count = series.get('google_calendar', {}).get('count', 0)
+        with patch.object(Http, 'request'):
+            BoundedHttp().request('https://www.googleapis.com')
+        self.assertEqual(series['google_calendar']['count'], count + 1)
@@ -0,0 +1,78 @@
+import threading
+import time
+from unittest.mock import patch
+
+from fixtures.graphql_view.persisted_query_fixtures import rooms_query
+from fixtures.token.token_fixture import ADMIN_TOKEN
+from helpers.profiling.profiling import SamplingProfiler, profiles
+from tests.base import BaseTestCase, change_user_role_to_super_admin
+
+
+def wait_for_meeting(ready, done):
+    ready.set()
+    done.wait()
+
+
+class TestProfiling(BaseTestCase):
+
+    def post(self, path, **headers):
+        headers['Authorization'] = 'Bearer ' + ADMIN_TOKEN
+        return self.app_test.post(path, headers=headers)
+
+    def get_profile(self, profile_id):
+        return self.app_test.get(
+            '/profiles/' + profile_id,
+            headers={'Authorization': 'Bearer ' + ADMIN_TOKEN})
+
+    def test_profiler_collapses_the_sampled_stacks(self):
+        ready, done = threading.Event(), threading.Event()
+        thread = threading.Thread(
+            target=wait_for_meeting, args=(ready, done))
+        thread.start()
+        ready.wait()
+        profiler = SamplingProfiler(0.001)
+        profiler.add_thread(thread.ident)
+        profiler.start()
+        time.sleep(0.05)
+        profiler.stop()
+        done.set()
+        thread.join()
+        lines = profiler.collapsed().splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertIn('test_profiling:wait_for_meeting;threading:wait', stack)
+        self.assertEqual(int(count), profiler.samples)
+
+    @change_user_role_to_super_admin
+    def test_super_admins_can_profile_requests(self):
+        with patch.dict(self.app_test.application.config,
+                        PROFILE_SAMPLE_INTERVAL=0.0001):
+            response = self.post(
+                '/mrm?query=' + rooms_query, **{'X-Mrm-Profile': '1'})
+        self.assert200(response)
+        profile_id = response.headers['X-Mrm-Profile-Id']
+        profile = self.get_profile(profile_id)
+        self.assert200(profile)
+        self.assertEqual(profile.data.decode(), profiles.get(profile_id))
+
+    @change_user_role_to_super_admin
+    def test_graphiql_can_be_profiled(self):
+        response = self.app_test.get('/mrm?profile=1', headers={
+            'Authorization': 'Bearer ' + ADMIN_TOKEN, 'Accept': 'text/html'})
+        self.assert200(response)
+        self.assertIn(b'graphiql', response.data.lower())
+        self.assertIn('X-Mrm-Profile-Id', response.headers)
+
+    @change_user_role_to_super_admin
+    def test_requests_are_not_profiled_by_default(self):
+        response = self.post('/mrm?query=' + rooms_query)
+        self.assertNotIn('X-Mrm-Profile-Id', response.headers)
+
+    def test_only_super_admins_can_profile_requests(self):
+        response = self.post('/mrm?profile=true&query=' + rooms_query)
+        self.assert200(response)
+        self.assertNotIn('X-Mrm-Profile-Id', response.headers)
+
+    @change_user_role_to_super_admin
+    def test_unknown_profiles_are_not_found(self):
+        self.assert404(self.get_profile('unknown'))
@@ -0,0 +1,66 @@
+from helpers.room.subscriber import active_channels
+from tests.base import BaseTestCase, CommonTestCases, assert_max_queries
+from fixtures.analytics.query_all_analytics_fixtures import (
+    all_analytics_query,
+    all_analytics_query_response
+)
+from fixtures.events.event_checkin_fixtures import (
+    event_checkin_mutation,
+    event_checkin_response
+)
+from fixtures.graphql_view.persisted_query_fixtures import (
+    rooms_query,
+    rooms_response
+)
+from fixtures.response.room_response_fixture import (
+    all_resolved_room_response_query,
+    all_resolved_room_response_data
+)
+from fixtures.response.user_response_fixtures import (
+    create_rate_query,
+    create_rate_response
+)
+
+
+class TestQueryBudgets(BaseTestCase):
+
+    def test_all_rooms_budget(self):
+        with assert_max_queries(1):
+            CommonTestCases.user_token_assert_equal(
+                self, rooms_query, rooms_response)
+
+    def test_all_analytics_budget(self):
+        with assert_max_queries(7):
+            CommonTestCases.admin_token_assert_equal(
+                self, all_analytics_query, all_analytics_query_response)
+
+    def test_all_room_responses_budget(self):
+        # The user, the active rooms, then a count and the responses of
+        # each of the 2 rooms
+        with assert_max_queries(6):
+            CommonTestCases.admin_token_assert_equal(
+                self, all_resolved_room_response_query,
+                all_resolved_room_response_data)
+
+    def test_event_checkin_budget(self):
+        with assert_max_queries(4):
+            CommonTestCases.user_token_assert_equal(
+                self, event_checkin_mutation, event_checkin_response)
+
+    def test_create_response_budget(self):
+        with assert_max_queries(4):
+            CommonTestCases.user_token_assert_equal(
+                self, create_rate_query, create_rate_response)
+
+    def test_exceeded_budget_lists_statements_and_origins(self):
+        with self.assertRaises(AssertionError) as error:
+            with assert_max_queries(0):
+                active_channels()
+        message = str(error.exception)
+        self.assertIn('1 queries run, the budget is 0', message)
+        self.assertIn('helpers/room/subscriber.py', message)
+        self.assertIn('FROM rooms', message)
+
+    @assert_max_queries(1)
+    def test_budget_decorates_tests(self):
+        active_channels()
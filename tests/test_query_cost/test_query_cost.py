@@ -0,0 +1,112 @@
+import json
+from unittest.mock import patch
+
+from graphql import parse
+from graphql.utils.introspection_query import introspection_query
+
+from helpers.query_cost.query_cost import (
+    QueryCost, QueryCostLimiter, query_cost_limiter
+)
+from schema import schema
+from tests.base import BaseTestCase, CommonTestCases
+from fixtures.token.token_fixture import ADMIN_TOKEN, USER_TOKEN
+from fixtures.query_cost.query_cost_fixtures import (
+    nested_rooms_query,
+    deep_rooms_query,
+    year_long_analytics_query,
+    rooms_fragment_query,
+    paged_rooms_query
+)
+
+
+def analyse(query, variables=None):
+    return QueryCost(schema).analyse(parse(query), variables=variables)
+
+
+class TestQueryCost(BaseTestCase):
+
+    def post_batch(self, token, per_page, count):
+        response = self.app_test.post(
+            '/mrm', data=json.dumps([{
+                'query': paged_rooms_query,
+                'variables': {'perPage': per_page}
+            }] * count), content_type='application/json',
+            headers={'Authorization': 'Bearer ' + token})
+        return [result.get('errors') for result in json.loads(response.data)]
+
+    def test_list_fields_are_charged_per_item(self):
+        self.assertEqual(analyse(rooms_fragment_query), (4, 56))
+        self.assertEqual(analyse(nested_rooms_query), (7, 4421))
+
+    def test_page_size_variable_is_used(self):
+        query = '''query ($perPage: Int) {
+            allRooms(perPage: $perPage) { rooms { name } } }'''
+        self.assertEqual(analyse(query, {'perPage': 100}), (3, 101))
+
+    def test_analytics_are_charged_per_month(self):
+        self.assertEqual(analyse(year_long_analytics_query), (3, 2411))
+
+    def test_introspection_is_free(self):
+        self.assertEqual(analyse(introspection_query), (0, 0))
+
+    def test_user_over_cost_limit_is_rejected(self):
+        CommonTestCases.user_token_assert_in(
+            self,
+            nested_rooms_query,
+            'Query is too expensive: cost 4421 exceeds the limit of 2000'
+        )
+
+    def test_admin_has_larger_cost_limit(self):
+        CommonTestCases.admin_token_assert_in(
+            self,
+            nested_rooms_query,
+            '"allRooms":{"rooms":[{"events"'
+        )
+
+    def test_deep_query_is_rejected(self):
+        CommonTestCases.admin_token_assert_in(
+            self,
+            deep_rooms_query,
+            'Query is too deep: depth 11 exceeds the limit of 10'
+        )
+
+    def test_expensive_queries_are_rate_limited(self):
+        limits = {'Admin': {
+            'depth': 10, 'cost': 10000, 'expensive': 2000, 'rate': 5000}}
+        with patch.dict(self.app.config['QUERY_COST_LIMITS'], limits), \
+                patch.object(query_cost_limiter, 'window', 3600):
+            CommonTestCases.admin_token_assert_in(
+                self, year_long_analytics_query, '"allAnalytics"')
+            CommonTestCases.admin_token_assert_in(
+                self, year_long_analytics_query, '"allAnalytics"')
+            CommonTestCases.admin_token_assert_in(
+                self,
+                year_long_analytics_query,
+                'Too many expensive queries, retry in'
+            )
+            CommonTestCases.admin_token_assert_in(
+                self, rooms_fragment_query, '"allRooms"')
+
+    def test_limiter_budget_is_per_token(self):
+        limiter = QueryCostLimiter(window=60)
+        self.assertEqual(limiter.spend('a', 60, 100), 0)
+        self.assertGreater(limiter.spend('a', 60, 100), 0)
+        self.assertEqual(limiter.spend('b', 60, 100), 0)
+        self.assertEqual(limiter.spend('a', 40, 100), 0)
+
+    def test_batch_cost_is_held_to_the_limit(self):
+        errors = self.post_batch(USER_TOKEN, 1200, 2)
+        self.assertIsNone(errors[0])
+        self.assertEqual(
+            errors[1][0]['message'],
+            'Query is too expensive: cost 2402 exceeds the limit of 2000')
+
+    def test_batch_cost_is_charged_once_expensive(self):
+        limits = {'Admin': {
+            'depth': 10, 'cost': 10000, 'expensive': 300, 'rate': 1000}}
+        with patch.dict(self.app.config['QUERY_COST_LIMITS'], limits):
+            self.assertEqual(self.post_batch(ADMIN_TOKEN, 100, 4), [None] * 4)
+            self.assertEqual(sum(query_cost_limiter.spent.values()), 404)
+            errors = self.post_batch(ADMIN_TOKEN, 100, 7)
+        self.assertEqual(errors[:5], [None] * 5)
+        self.assertIn('Too many expensive queries', errors[5][0]['message'])
@@ -1,20 +1,43 @@
 from unittest.mock import patch
-from tests.base import BaseTestCase, CommonTestCases
+from tests.base import (
+    BaseTestCase, CommonTestCases, change_user_role_to_super_admin
+)
 from helpers.calendar.calendar import get_calendar_list_mock_data
+from api.events.models import Events as EventsModel
+from fixtures.token.token_fixture import ADMIN_TOKEN
 
 from fixtures.room.available_rooms_fixtures import (
     available_rooms_query,
+    available_rooms_check_calendar_query,
+    available_rooms_response,
     available_rooms_query_with_empty_input,
     available_rooms_query_when_startDate_is_bigger_than_endDate,
     available_rooms_query_when_startTime_is_bigger_than_endTime
 )
 
 
+CALENDAR_ID = 'andela.com_3730313534393638323232@resource.calendar.google.com'
+
+
 class AvailableRooms(BaseTestCase):
 
+    def book_room(self, room_id, start_time, end_time, cancelled=False):
+        EventsModel(
+            event_id='booking_{}_{}'.format(room_id, start_time),
+            room_id=room_id,
+            event_title='Booking',
+            start_time=start_time,
+            end_time=end_time,
+            number_of_participants=2,
+            checked_in=False,
+            cancelled=cancelled
+        ).save()
+
     @patch("api.room.schema_query.get_google_api_calendar_list", spec=True,
            return_value=get_calendar_list_mock_data())
     def test_available_rooms(self, mock_get_json):
+        self.book_room(1, '2018-11-08T09:00:00Z', '2018-11-08T10:00:00Z')
+        self.book_room(2, '2018-11-11T06:30:00Z', '2018-11-11T07:00:00Z')
         CommonTestCases.admin_token_assert_in(
             self,
             available_rooms_query,
@@ -41,3 +64,37 @@ class AvailableRooms(BaseTestCase):
             available_rooms_query_when_startTime_is_bigger_than_endTime,
             "Start time must be lower than end time"
         )
+
+    def test_available_rooms_from_synced_bookings(self):
+        self.book_room(1, '2018-11-08T09:00:00Z', '2018-11-08T10:00:00Z')
+        self.book_room(2, '2018-11-11T06:45:00Z', '2018-11-11T07:30:00Z')
+        self.book_room(
+            2, '2018-11-09T09:00:00Z', '2018-11-09T10:00:00Z', cancelled=True)
+        CommonTestCases.admin_token_assert_equal(
+            self,
+            available_rooms_query,
+            available_rooms_response
+        )
+
+    @patch('helpers.room.availability.credentials')
+    def test_check_calendar_for_candidate_rooms_only(self, mock_credentials):
+        service = mock_credentials.set_api_credentials.return_value
+        service.freebusy().query().execute.return_value = {
+            'calendars': {CALENDAR_ID: {'busy': [{}]}}}
+        self.book_room(1, '2018-11-08T09:00:00Z', '2018-11-08T10:00:00Z')
+        CommonTestCases.admin_token_assert_in(
+            self,
+            available_rooms_check_calendar_query,
+            "No available rooms at the moment"
+        )
+        items = service.freebusy().query.call_args[1]['body']['items']
+        self.assertEqual(items, [{'id': CALENDAR_ID}])
+
+    @change_user_role_to_super_admin
+    def test_unparseable_bookings_are_counted(self):
+        self.book_room(1, 'tomorrow morning', '2018-11-08T10:00:00Z')
+        self.book_room(2, '2018-11-09T10:00:00Z', '2018-11-09T09:00:00Z')
+        response = self.app_test.get(
+            '/metrics', headers={'Authorization': 'Bearer ' + ADMIN_TOKEN})
+        self.assertIn('mrm_events_without_time_range 2',
+                      response.data.decode())
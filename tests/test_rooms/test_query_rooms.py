@@ -1,7 +1,9 @@
 import json
 import os
 from unittest.mock import patch
+from sqlalchemy import event
 from tests.base import BaseTestCase, CommonTestCases
+from helpers.database import engine
 from helpers.calendar.calendar import get_calendar_list_mock_data
 from fixtures.room.create_room_fixtures import (
     rooms_query,
@@ -9,6 +11,8 @@ from fixtures.room.create_room_fixtures import (
 from fixtures.room.query_room_fixtures import (
     paginated_rooms_query,
     paginated_rooms_response,
+    paginated_rooms_without_total_query,
+    paginated_rooms_without_total_response,
     room_query_by_id,
     room_query_by_id_response,
     room_with_non_existant_id,
@@ -34,6 +38,31 @@ class QueryRooms(BaseTestCase):
             paginated_rooms_response
         )
 
+    def test_paginate_room_query_fetches_total_with_page(self):
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            if 'FROM rooms' in statement:
+                statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', record_statement)
+        try:
+            CommonTestCases.admin_token_assert_equal(
+                self,
+                paginated_rooms_query,
+                paginated_rooms_response
+            )
+        finally:
+            event.remove(engine, 'before_cursor_execute', record_statement)
+        self.assertEqual(len(statements), 1)
+        self.assertIn('count(*) OVER ()', statements[0])
+
+    def test_paginate_room_query_without_total(self):
+        CommonTestCases.admin_token_assert_equal(
+            self,
+            paginated_rooms_without_total_query,
+            paginated_rooms_without_total_response
+        )
+
     @patch("api.room.schema_query.get_google_api_calendar_list", spec=True,
            return_value=get_calendar_list_mock_data())
     @patch.dict(os.environ, {"APP_SETTINGS": "production"})
@@ -0,0 +1,106 @@
+from api.room.models import Room, RoomResource
+from helpers.room.recommendation import (
+    RoomFeatures, rank_rooms, room_feature_index
+)
+from tests.base import BaseTestCase, CommonTestCases
+from fixtures.room.recommend_rooms_fixtures import (
+    recommend_rooms_query,
+    recommend_rooms_response,
+    recommend_rooms_with_resources_query,
+    recommend_rooms_with_resources_response,
+    recommend_rooms_with_labels_query,
+    recommend_booked_rooms_query,
+    recommend_rooms_for_many_query,
+    recommend_rooms_invalid_period_query,
+    recommend_tana_response
+)
+
+
+class TestRecommendRooms(BaseTestCase):
+
+    def test_recommend_best_fit_rooms_first(self):
+        CommonTestCases.admin_token_assert_equal(
+            self,
+            recommend_rooms_query,
+            recommend_rooms_response
+        )
+
+    def test_index_picks_up_resource_changes(self):
+        CommonTestCases.admin_token_assert_in(
+            self,
+            recommend_rooms_with_resources_query,
+            "No rooms match the request"
+        )
+        RoomResource(room_id=2, resource_id=1, quantity=2,
+                     name='Markers').save()
+        CommonTestCases.admin_token_assert_equal(
+            self,
+            recommend_rooms_with_resources_query,
+            recommend_rooms_with_resources_response
+        )
+
+    def test_index_picks_up_room_changes(self):
+        rooms = room_feature_index.rooms(1)
+        self.assertEqual(rooms[1].capacity, 6)
+        room = Room.query.get(1)
+        room.capacity = 3
+        room.save()
+        self.assertEqual(room_feature_index.rooms(1)[1].capacity, 3)
+        room.state = 'archived'
+        room.save()
+        self.assertNotIn(1, room_feature_index.rooms(1))
+
+    def test_refresh_leaves_returned_rooms_unchanged(self):
+        rooms = room_feature_index.rooms(1)
+        room_ids = list(rooms)
+        room = Room.query.get(1)
+        room.state = 'archived'
+        room.save()
+        self.assertNotIn(1, room_feature_index.rooms(1))
+        self.assertEqual(list(rooms), room_ids)
+        self.assertEqual(rooms[1].capacity, 6)
+
+    def test_recommend_rooms_with_labels(self):
+        CommonTestCases.admin_token_assert_equal(
+            self,
+            recommend_rooms_with_labels_query,
+            recommend_tana_response
+        )
+
+    def test_booked_rooms_are_not_recommended(self):
+        CommonTestCases.admin_token_assert_equal(
+            self,
+            recommend_booked_rooms_query,
+            recommend_tana_response
+        )
+
+    def test_no_room_fits(self):
+        CommonTestCases.admin_token_assert_in(
+            self,
+            recommend_rooms_for_many_query,
+            "No rooms match the request"
+        )
+
+    def test_invalid_period(self):
+        CommonTestCases.admin_token_assert_in(
+            self,
+            recommend_rooms_invalid_period_query,
+            "Start time must be lower than end time"
+        )
+
+    def test_rank_rooms(self):
+        rooms = [
+            RoomFeatures(1, 'Big', None, 20, frozenset(['tv']), frozenset()),
+            RoomFeatures(2, 'Small', None, 4, frozenset(), frozenset()),
+            RoomFeatures(3, 'Fit', None, 6, frozenset(['tv', 'markers']),
+                         frozenset(['quiet'])),
+            RoomFeatures(4, 'Also fit', None, 6, frozenset(['tv']),
+                         frozenset(['quiet'])),
+        ]
+        self.assertEqual(
+            [room.room_id for room in rank_rooms(rooms, 5, ['TV '])],
+            [4, 3, 1])
+        self.assertEqual(
+            [room.room_id for room in rank_rooms(
+                rooms, 5, ['tv'], ['quiet'], excluded={4}, limit=1)],
+            [3])
@@ -1,7 +1,12 @@
 import sys
 import os
 
+from sqlalchemy import event
+
 from tests.base import BaseTestCase, CommonTestCases
+from helpers.database import engine, db_session
+from helpers.room_filter.room_filter import room_filter
+from api.room.models import Room as RoomModel
 from fixtures.room.filter_room_fixtures import (
     filter_rooms_by_capacity,
     filter_rooms_by_capacity_response,
@@ -17,7 +22,17 @@ from fixtures.room.filter_room_fixtures import (
     filter_rooms_by_room_labels_response,
     filter_rooms_by_location_room_labels,
     filter_rooms_by_resource,
-    filter_rooms_by_location_resource
+    filter_rooms_by_location_resource,
+    filter_rooms_by_any_room_label,
+    filter_rooms_by_any_room_label_response,
+    filter_rooms_by_partial_room_label,
+    filter_rooms_by_combined_arguments,
+    filter_rooms_by_combined_arguments_response,
+    filter_rooms_by_structure,
+    filter_rooms_by_structure_response,
+    filter_rooms_by_office,
+    filter_rooms_by_unknown_office,
+    filter_rooms_by_unknown_office_response
 )
 from fixtures.room.assign_resource_fixture import (
     assign_resource_mutation,
@@ -101,3 +116,76 @@ class RoomsFilter(BaseTestCase):
             filter_rooms_by_location_resource,
             filter_rooms_by_room_labels_response
         )
+
+    def test_filter_room_by_any_room_label(self):
+        CommonTestCases.user_token_assert_equal(
+            self,
+            filter_rooms_by_any_room_label,
+            filter_rooms_by_any_room_label_response
+        )
+
+    def test_filter_room_by_partial_room_label_matches_nothing(self):
+        CommonTestCases.user_token_assert_equal(
+            self,
+            filter_rooms_by_partial_room_label,
+            filter_rooms_by_non_existent_room_label_response
+        )
+
+    def test_filter_room_by_combined_arguments_runs_one_query(self):
+        statements = []
+
+        def record_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', record_statement)
+        try:
+            CommonTestCases.user_token_assert_equal(
+                self,
+                filter_rooms_by_combined_arguments,
+                filter_rooms_by_combined_arguments_response
+            )
+        finally:
+            event.remove(engine, 'before_cursor_execute', record_statement)
+        self.assertEqual(len(statements), 1)
+        self.assertIn('EXISTS', statements[0])
+
+    def test_filter_room_by_structure_subtree(self):
+        room = RoomModel.query.get(1)
+        room.structure_id = '7c3a1f02-4d6e-4b1a-9f3e-2a5d8c6b1e47'
+        room.save()
+        CommonTestCases.user_token_assert_equal(
+            self,
+            filter_rooms_by_structure,
+            filter_rooms_by_structure_response
+        )
+
+    def test_filter_room_by_office(self):
+        room = RoomModel.query.get(1)
+        room.structure_id = '7c3a1f02-4d6e-4b1a-9f3e-2a5d8c6b1e47'
+        room.save()
+        CommonTestCases.user_token_assert_equal(
+            self,
+            filter_rooms_by_office,
+            filter_rooms_by_structure_response
+        )
+
+    def test_filter_room_by_unknown_office_returns_no_rooms(self):
+        CommonTestCases.user_token_assert_equal(
+            self,
+            filter_rooms_by_unknown_office,
+            filter_rooms_by_unknown_office_response
+        )
+
+    def test_room_filter_plan_scans_rooms_once(self):
+        query = room_filter(db_session.query(RoomModel.id), {
+            'location': 'Kampala',
+            'resources': 'Markers',
+            'devices': 'Samsung',
+            'tags': 'Block-B',
+            'min_capacity': 2
+        })
+        statement = str(query.statement.compile(
+            dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+        self.assertNotIn('JOIN', statement)
+        plan = [row[0] for row in db_session.execute('EXPLAIN ' + statement)]
+        room_scans = [line for line in plan if ' on rooms' in line]
+        self.assertEqual(len(room_scans), 1)
@@ -0,0 +1,107 @@
+import smtplib
+from unittest.mock import patch, MagicMock
+
+from tests.base import BaseTestCase
+from benchmarks.smtp_sink import SMTPSink
+from helpers.email.email import notification
+from helpers.email.email_setup import (
+    SendEmail,
+    build_message,
+    deliver_emails,
+    email_batch
+)
+
+CANCELLATION = {
+    'email': ['patrick.walukagga@andela.com'],
+    'subject': 'Your room reservation was rejected',
+    'template': 'event_cancellation.html',
+    'room_name': 'Entebbe',
+    'event_title': 'Onboarding',
+    'event_reject_reason': 'after 10 minutes'
+}
+
+
+class TestEmailDelivery(BaseTestCase):
+    """
+    Test that emails are queued as templates and sent in batches
+    """
+    def setUp(self):
+        super().setUp()
+        self.sink = SMTPSink().start()
+        self.mail = self.app.extensions['mail']
+        self.mail.server, self.mail.port = self.sink.server_address
+        self.mail.suppress = False
+        self.mail.default_sender = 'converge@andela.com'
+
+    def tearDown(self):
+        self.sink.stop()
+        super().tearDown()
+
+    def payloads(self, count):
+        return [
+            SendEmail(
+                CANCELLATION['subject'], CANCELLATION['email'],
+                CANCELLATION['template'], room_name='Entebbe',
+                event_title='Meeting {}'.format(number)).payload
+            for number in range(count)
+        ]
+
+    @patch('helpers.email.email_setup.SendEmail.send_async_email.apply_async')
+    def test_queues_template_and_context(self, apply_async):
+        self.assertTrue(
+            notification.send_email_notification(**CANCELLATION))
+        payload = apply_async.call_args[1]['args'][0][0]
+        self.assertEqual(payload['template'], 'event_cancellation.html')
+        self.assertEqual(payload['context'], {
+            'room_name': 'Entebbe',
+            'event_title': 'Onboarding',
+            'event_reject_reason': 'after 10 minutes'
+        })
+
+    @patch('helpers.email.email_setup.SendEmail.send_async_email.apply_async')
+    def test_batch_queues_emails_together(self, apply_async):
+        with email_batch():
+            for _ in range(3):
+                notification.send_email_notification(**CANCELLATION)
+            apply_async.assert_not_called()
+        self.assertEqual(apply_async.call_count, 1)
+        self.assertEqual(len(apply_async.call_args[1]['args'][0]), 3)
+
+    def test_batch_is_sent_over_one_connection(self):
+        self.assertEqual(deliver_emails(self.payloads(50)), 50)
+        self.assertEqual(self.sink.messages, 50)
+        self.assertEqual(self.sink.connections, 1)
+
+    @patch('helpers.email.email_setup.Config.MAIL_RETRY_BACKOFF', 0)
+    def test_reconnects_and_resumes_after_failure(self):
+        broken_connection = MagicMock()
+        broken_connection.send.side_effect = [
+            None, smtplib.SMTPServerDisconnected('dropped')]
+        connect = self.mail.connect
+        with patch.object(
+                self.mail, 'connect',
+                side_effect=[broken_connection, connect()]):
+            self.assertEqual(deliver_emails(self.payloads(5)), 5)
+        self.assertEqual(broken_connection.send.call_count, 2)
+        self.assertEqual(self.sink.messages, 4)
+
+    def test_rejected_message_does_not_stop_the_batch(self):
+        payloads = self.payloads(3)
+        connection = MagicMock()
+        connection.send.side_effect = [
+            None, smtplib.SMTPDataError(554, b'rejected'), None]
+        with patch.object(self.mail, 'connect', return_value=connection), \
+                patch('helpers.email.email_setup.logger') as logger:
+            self.assertEqual(deliver_emails(payloads), 2)
+        self.assertEqual(connection.send.call_count, 3)
+        self.assertEqual(
+            connection.send.call_args_list[2][0][0].html,
+            build_message(payloads[2]).html)
+        logger.exception.assert_called_once()
+
+    def test_unrenderable_message_is_skipped(self):
+        payloads = self.payloads(3)
+        payloads[1]['template'] = 'missing.html'
+        self.assertEqual(deliver_emails(payloads), 2)
+        self.assertEqual(self.sink.messages, 2)
+        self.assertEqual(self.sink.connections, 1)
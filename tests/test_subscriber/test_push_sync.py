@@ -0,0 +1,151 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qs
+
+from tests.base import BaseTestCase
+from api.room.models import Room as RoomModel
+from helpers.room.subscriber import (
+    PushService, active_channels, reconcile_push_channels
+)
+
+CALENDAR_ID = 'andela.com_3630363835303531343031@resource.calendar.google.com'
+OTHER_CALENDAR_ID = \
+    'andela.com_3730313534393638323232@resource.calendar.google.com'
+
+
+class StubPushHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, status, body=None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def handle_request(self):
+        server = self.server
+        server.requests.append((self.command, urlparse(self.path).path))
+        if server.failures:
+            server.failures -= 1
+            return self.respond(503)
+        url = urlparse(self.path)
+        if url.path == '/channels' and not server.serves_channels:
+            return self.respond(404)
+        params = {key: values[0] for key, values in parse_qs(
+            url.query).items()}
+        if url.path in ('/add_room', '/token'):
+            server.channels[params['calendar_id']] = params.get(
+                'firebase_token')
+        elif url.path == '/delete_room':
+            server.channels.pop(params['calendar_id'], None)
+        elif url.path == '/channels' and self.command == 'GET':
+            return self.respond(200, [
+                {'calendar_id': calendar_id, 'firebase_token': token}
+                for calendar_id, token in server.channels.items()
+            ])
+        elif url.path == '/channels':
+            length = int(self.headers['Content-Length'])
+            batch = json.loads(self.rfile.read(length))
+            server.batches.append(batch)
+            for channel in batch['channels']:
+                server.channels[channel['calendar_id']] = channel[
+                    'firebase_token']
+            for calendar_id in batch['removed']:
+                server.channels.pop(calendar_id, None)
+        self.respond(200, {})
+
+    do_GET = do_POST = do_DELETE = handle_request
+
+
+class StubPushServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubPushHandler)
+        self.channels = {}
+        self.requests = []
+        self.batches = []
+        self.failures = 0
+        self.connections = 0
+        self.serves_channels = True
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+class TestPushSync(BaseTestCase):
+    """
+    Test that the push service is kept in sync with the room channels
+    """
+    def setUp(self):
+        super().setUp()
+        self.server = StubPushServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.push_service = PushService(
+            url='http://127.0.0.1:{}'.format(self.server.server_address[1]),
+            backoff=0, batch_size=2)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def test_calls_share_one_connection(self):
+        self.push_service.add_room(CALENDAR_ID, 'token-1')
+        self.push_service.update_room_token(CALENDAR_ID, 'token-2')
+        self.push_service.remove_room(OTHER_CALENDAR_ID)
+        self.assertEqual(self.server.channels, {CALENDAR_ID: 'token-2'})
+        self.assertEqual(self.server.connections, 1)
+
+    def test_retries_failed_calls(self):
+        self.server.failures = 2
+        self.push_service.add_room(CALENDAR_ID, 'token-1')
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.server.channels, {CALENDAR_ID: 'token-1'})
+
+    def test_reconcile_sends_only_differences(self):
+        room = RoomModel.query.get(1)
+        room.firebase_token = 'token-1'
+        room.save()
+        self.server.channels = {
+            CALENDAR_ID: 'stale-token',
+            OTHER_CALENDAR_ID: None,
+            'archived-room': 'token-3',
+            'deleted-room': 'token-4'
+        }
+        channels, removed = self.push_service.reconcile(active_channels())
+        self.assertEqual(channels, {CALENDAR_ID: 'token-1'})
+        self.assertEqual(removed, ['archived-room', 'deleted-room'])
+        self.assertEqual(self.server.channels, active_channels())
+        self.assertEqual(len(self.server.batches), 2)
+        self.assertEqual(self.push_service.reconcile(active_channels()),
+                         ({}, []))
+
+    @patch('helpers.room.subscriber.Config.PUSH_CHANNEL_RECONCILIATION',
+           False)
+    def test_reconciliation_can_be_disabled(self):
+        with patch('helpers.room.subscriber.push_service', self.push_service):
+            self.assertEqual(reconcile_push_channels(), 0)
+        self.assertEqual(self.server.requests, [])
+
+    def test_reconciles_by_default(self):
+        with patch('helpers.room.subscriber.push_service', self.push_service):
+            self.assertEqual(
+                reconcile_push_channels(), len(active_channels()))
+        self.assertEqual(self.server.channels, active_channels())
+
+    @patch('helpers.room.subscriber.logger')
+    def test_missing_channels_endpoint_is_reported_once(self, logger):
+        self.server.serves_channels = False
+        with patch('helpers.room.subscriber.push_service', self.push_service):
+            self.assertEqual(reconcile_push_channels(), 0)
+            self.assertEqual(reconcile_push_channels(), 0)
+        self.assertEqual(self.server.requests, [('GET', '/channels')] * 2)
+        self.assertEqual(logger.warning.call_count, 1)
@@ -3,9 +3,10 @@ from tests.base import BaseTestCase
 from helpers.room.subscriber import (add_room, remove_room, update_room_token)
 
 
+@patch('helpers.room.subscriber.Config.MRM_PUSH_URL', 'http://push')
 class TestSubscriberTasks(BaseTestCase):
 
-    @patch('helpers.room.subscriber.requests.get')
+    @patch('helpers.room.subscriber.push_service.session.request')
     def test_add_room(self, mock_get_request):
         """
         Test to verify that a request is made when
@@ -14,7 +15,7 @@ class TestSubscriberTasks(BaseTestCase):
         add_room('calendar_id', 'firebase_token')
         mock_get_request.assert_called_once()
 
-    @patch('helpers.room.subscriber.requests.delete')
+    @patch('helpers.room.subscriber.push_service.session.request')
     def test_remove_room(self, mock_delete_request):
         """
         Test to verify that a request is made when
@@ -23,7 +24,7 @@ class TestSubscriberTasks(BaseTestCase):
         remove_room('calendar_id')
         mock_delete_request.assert_called_once()
 
-    @patch('helpers.room.subscriber.requests.get')
+    @patch('helpers.room.subscriber.push_service.session.request')
     def test_update_room_token(self, mock_get_request):
         """
         Test to verify that a request is made when
@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from app import create_app
+from config import TestingConfig
+from fixtures.token.token_fixture import ADMIN_TOKEN
+from fixtures.traffic.traffic_fixtures import (
+    anonymised_variables,
+    recorded_body,
+    request_variables,
+    room_name_operation,
+    rooms_operation,
+    traffic_secret
+)
+from helpers.traffic.recorder import anonymise, pseudonym
+from tests.base import BaseTestCase
+
+
+class TestTrafficRecorder(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        descriptor, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(descriptor)
+        self.addCleanup(os.remove, self.path)
+
+    def record(self, body, **config):
+        with patch.multiple(TestingConfig, TRAFFIC_RECORD_PATH=self.path,
+                            TRAFFIC_RECORD_SECRET=traffic_secret, **config):
+            client = create_app('testing').test_client()
+        response = client.post(
+            '/mrm', data=json.dumps(body), content_type='application/json',
+            headers={'Authorization': 'Bearer ' + ADMIN_TOKEN})
+        with open(self.path) as traffic:
+            return response, [json.loads(line) for line in traffic]
+
+    def test_requests_are_recorded_anonymised(self):
+        response, records = self.record(rooms_operation)
+        self.assert200(response)
+        self.assertEqual(len(records), 1)
+        record = records[0]
+        self.assertEqual(record['operation'], 'allRooms')
+        self.assertEqual(record['body'], recorded_body)
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(len(record['user']), 12)
+        self.assertNotIn(ADMIN_TOKEN, json.dumps(record))
+
+    def test_batches_are_recorded_as_one_request(self):
+        _, records = self.record([rooms_operation, rooms_operation])
+        self.assertEqual(records[0]['operation'], 'batch')
+        self.assertEqual(records[0]['body'], [recorded_body] * 2)
+
+    def test_requests_outside_the_sample_are_not_recorded(self):
+        _, records = self.record(
+            rooms_operation, TRAFFIC_RECORD_SAMPLE_RATE=0)
+        self.assertEqual(records, [])
+
+    def test_names_and_titles_are_not_recorded(self):
+        self.record(room_name_operation)
+        with open(self.path) as traffic:
+            recorded = traffic.read()
+        self.assertNotIn('Jane Doe', recorded)
+        self.assertIn('Nov 6 2019', recorded)
+
+    def test_pseudonyms_are_keyed(self):
+        email = 'peter.walugembe@andela.com'
+        self.assertEqual(pseudonym(email, traffic_secret),
+                         pseudonym(email, traffic_secret))
+        self.assertNotEqual(pseudonym(email, traffic_secret),
+                            pseudonym(email, 'other-secret'))
+
+    def test_anonymise_keeps_room_calendar_ids(self):
+        self.assertEqual(anonymise(request_variables, traffic_secret),
+                         anonymised_variables)
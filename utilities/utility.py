@@ -44,9 +44,11 @@ def listen_for_after_flush_event(target, child, parent_id):
             session.query(
                 child_object
             ).filter(
-                id_of_parent == target.id
+                id_of_parent == target.id,
+                child_object.state != target.state
             ).update(
-                {child_object.state: target.state}
+                {child_object.state: target.state},
+                synchronize_session='fetch'
             )
         pass
 
@@ -110,11 +110,15 @@ def validate_room_labels(**kwargs):
     label = re.search("[{}:]", str(room_labels))
     if label:
         raise AttributeError("Room label is not a valid string type")
-    for label in room_labels:
-        structure = StructureModel.query.filter_by(name=label).first()
-        if structure is None:
-            raise GraphQLError("Structure does not exist")
-        break
+    if not room_labels:
+        return
+    existing_labels = {
+        structure.name for structure in StructureModel.query.with_entities(
+            StructureModel.name).filter(
+                StructureModel.name.in_(room_labels))
+    }
+    if set(room_labels) - existing_labels:
+        raise GraphQLError("Structure does not exist")
 
 
 def validate_structure_id(**kwargs):